@@ -1,1749 +1,2984 @@
-import tkinter as tk
-from tkinter import messagebox, simpledialog, filedialog, colorchooser
-from PIL import Image, ImageTk
-import json
-import math
-import xml.etree.ElementTree as ET # <-- NOVA IMPORTAÇÃO
-from xml.dom import minidom        # <-- NOVA IMPORTAÇÃO
-import csv # <-- NOVA LINHA v11
-
-# --- Classes ---
-class Estado:
-    def __init__(self, nome, x, y, canvas):
-        self.nome = nome
-        self.x = x
-        self.y = y
-        self.raio = 30
-        self.canvas = canvas
-        self.inicial = False
-        self.aceitacao = False
-        self.simbolo_saida = "" # <-- NOVA LINHA
-        self.id_circulo = canvas.create_oval(
-            x - self.raio, y - self.raio, x + self.raio, y + self.raio,
-            fill="lightblue", outline="black", width=2, tags=("estado", nome)
-        )
-        self.id_texto = canvas.create_text(
-            x, y, text=nome, font=("Arial", 12, "bold"), tags=("texto", nome)
-        )
-
-    def mover(self, dx, dy):
-        self.canvas.move(self.nome, dx, dy)
-        self.x += dx
-        self.y += dy
-
-    def set_inicial(self):
-        self.inicial = True
-        self.canvas.create_line(
-            self.x - 50, self.y, self.x - self.raio, self.y,
-            arrow=tk.LAST, width=2, fill="green", tags=("seta_inicial", self.nome)
-        )
-
-    def set_aceitacao(self, eh_aceitacao):
-        if self.aceitacao == eh_aceitacao: return
-        self.aceitacao = eh_aceitacao
-        for item in self.canvas.find_withtag("aceitacao"):
-            if self.nome in self.canvas.gettags(item):
-                self.canvas.delete(item)
-        if self.aceitacao:
-            self.canvas.create_oval(
-                self.x - self.raio + 5, self.y - self.raio + 5,
-                self.x + self.raio - 5, self.y + self.raio - 5,
-                outline="black", width=2, tags=("aceitacao", self.nome)
-            )
-
-    def toggle_aceitacao(self):
-        self.set_aceitacao(not self.aceitacao)
-
-    def destruir(self):
-        self.canvas.delete(self.nome)
-
-    def atualizar_texto(self):
-        """Atualiza o texto do estado no canvas para incluir a saída (se aplicável)."""
-        texto_display = self.nome
-        # Em modo Moore, se houver símbolo de saída, exibe "nome/saida"
-        if tipo_automato_atual == "Moore" and self.simbolo_saida:
-            texto_display = f"{self.nome}/{self.simbolo_saida}"
-        self.canvas.itemconfig(self.id_texto, text=texto_display)
-
-    def selecionar(self):
-        self.canvas.itemconfig(self.id_circulo, outline="green", width=3)
-    def desselecionar(self):
-        self.canvas.itemconfig(self.id_circulo, outline="black", width=2)
-
-    # Dentro da class Estado
-    # Dentro da class Estado
-    def redesenhar(self):
-        """Redesenha todos os componentes visuais do estado no canvas."""
-        # Recria o círculo e o texto
-        self.id_circulo = self.canvas.create_oval(
-            self.x - self.raio, self.y - self.raio, self.x + self.raio, self.y + self.raio,
-            fill=self.canvas.itemcget(self.id_circulo, "fill"), # Mantém a cor atual
-            outline="black", width=2, tags=("estado", self.nome)
-        )
-        self.id_texto = self.canvas.create_text(
-            self.x, self.y, text=self.nome, font=("Arial", 12, "bold"), tags=("texto", self.nome)
-        )
-        
-        # Recria a marcação de inicial, se necessário
-        if self.inicial:
-            # Apaga qualquer seta antiga para evitar duplicatas
-            for item in self.canvas.find_withtag(f"seta_inicial_{self.nome}"): self.canvas.delete(item)
-            self.set_inicial() # Recria a seta
-            
-        # Recria a marcação de aceitação, se necessário
-        if self.aceitacao:
-            # Chama o método set_aceitacao diretamente, que é mais seguro
-            self.set_aceitacao(True)
-
-
-class Transicao:
-    # Dentro da class Transicao
-    def __init__(self, origem, destino, canvas, simbolos_entrada="ε", simbolo_saida="", offset_x=0, offset_y=0):
-        self.origem = origem
-        self.destino = destino
-        self.canvas = canvas
-        
-        if isinstance(simbolos_entrada, str):
-            self.simbolos_entrada = [s.strip() for s in simbolos_entrada.split(',')]
-        else:
-            self.simbolos_entrada = simbolos_entrada
-            
-        self.simbolo_saida = simbolo_saida
-        
-        # --- NOVIDADE AQUI: Memória para o AP ---
-        self.para_desempilhar = "ε" 
-        self.para_empilhar = "ε"
-        # --- FIM DA NOVIDADE ---
-
-        self.tag_unica = f"trans_{id(self)}"
-        self.offset_x = offset_x
-        self.offset_y = offset_y
-        self.is_loop = (self.origem == self.destino)
-        self.atualizar_posicao()
-
-    # Dentro da class Transicao
-    def _get_rotulo_texto(self):
-        global tipo_automato_atual
-        texto_entrada = ",".join(self.simbolos_entrada)
-
-        if tipo_automato_atual == "AP":
-            # Formato do Autômato com Pilha: a, b → c
-            return f"{texto_entrada},{self.para_desempilhar} → {self.para_empilhar}"
-        elif tipo_automato_atual == "Mealy" and self.simbolo_saida:
-            # Formato da Máquina de Mealy: a/1
-            return f"{texto_entrada}/{self.simbolo_saida}"
-        else:
-            # Formato padrão para AFD, AFN, Moore
-            return texto_entrada
-
-    def atualizar_posicao(self):
-        self.canvas.delete(self.tag_unica)
-        if self.is_loop:
-            self._desenhar_loop()
-        else:
-            self._desenhar_linha_reta()
-        self.canvas.tag_raise("estado")
-        self.canvas.tag_raise("texto")
-        self.canvas.tag_raise("aceitacao")
-
-    def _desenhar_linha_reta(self):
-        x_o, y_o, x_d, y_d = self.origem.x, self.origem.y, self.destino.x, self.destino.y
-        raio = self.origem.raio
-        dist = math.dist((x_o, y_o), (x_d, y_d))
-        if dist == 0: return
-        vetor_x, vetor_y = (x_d - x_o) / dist, (y_d - y_o) / dist
-        p_ini_x, p_ini_y = x_o + vetor_x * raio, y_o + vetor_y * raio
-        p_fim_x, p_fim_y = x_d - vetor_x * raio, y_d - vetor_y * raio
-        coords_linha = (p_ini_x + self.offset_x, p_ini_y + self.offset_y, p_fim_x + self.offset_x, p_fim_y + self.offset_y)
-        coords_texto = (((x_o + x_d) / 2) + self.offset_x, ((y_o + y_d) / 2 - 15) + self.offset_y)
-        self.canvas.create_line(coords_linha, arrow=tk.LAST, fill="black", width=2, tags=(self.tag_unica, "transicao"))
-        self.canvas.create_text(coords_texto, text=self._get_rotulo_texto(), font=("Arial", 10, "italic"), tags=(self.tag_unica, "rotulo"))
-
-    def _desenhar_loop(self):
-        x, y = self.origem.x, self.origem.y
-        raio_estado, raio_loop = self.origem.raio, 20
-        bounding_box = (x - raio_loop, y - (2 * raio_estado), x + raio_loop, y)
-        
-        # Garante que o arco tenha a tag_unica
-        self.canvas.create_arc(bounding_box, start=210, extent=-240, style=tk.ARC, 
-                               outline="black", width=2, tags=(self.tag_unica, "transicao"))
-        
-        angulo_final_rad = math.radians(-30)
-        centro_arco_x, centro_arco_y = x, y - raio_estado
-        ponta_x = centro_arco_x + raio_loop * math.cos(angulo_final_rad)
-        ponta_y = centro_arco_y - raio_loop * math.sin(angulo_final_rad)
-        ponta1, ponta2, ponta3 = (ponta_x, ponta_y), (ponta_x - 10, ponta_y - 2), (ponta_x - 2, ponta_y + 8)
-        
-        # Garante que o polígono da seta tenha a tag_unica
-        self.canvas.create_polygon(ponta1, ponta2, ponta3, fill="black", tags=(self.tag_unica, "transicao"))
-        
-        coords_texto = (x, y - raio_estado - raio_loop - 20)
-        
-        # Garante que o texto do rótulo tenha a tag_unica
-        self.canvas.create_text(coords_texto, text=self._get_rotulo_texto(), font=("Arial", 10, "italic"), tags=(self.tag_unica, "rotulo"))
-
-    def atualizar_simbolo(self, novo_rotulo_completo):
-        global tipo_automato_atual
-        
-        if tipo_automato_atual == "AP":
-            try:
-                parte_antes, parte_depois = novo_rotulo_completo.split('→')
-                partes_antes = parte_antes.split(',')
-                
-                self.simbolos_entrada = [partes_antes[0].strip() or "ε"]
-                self.para_desempilhar = partes_antes[1].strip() if len(partes_antes) > 1 else "ε"
-                self.para_empilhar = parte_depois.strip() or "ε"
-            except ValueError:
-                messagebox.showerror("Erro de Formato", "Formato inválido. Use: entrada, desempilha → empilha")
-        else: # Para Mealy, AFD, AFN, etc.
-            partes = novo_rotulo_completo.split('/', 1)
-            simbolos_entrada_str = partes[0].strip()
-            self.simbolo_saida = partes[1].strip() if len(partes) > 1 else self.simbolo_saida
-            if not simbolos_entrada_str:
-                self.simbolos_entrada = ["ε"]
-            else:
-                self.simbolos_entrada = [s.strip() for s in simbolos_entrada_str.split(',')]
-
-        self.atualizar_posicao()
-
-    # Dentro da class Transicao
-    def destruir(self):
-        """Versão de depuração para encontrar o 'loop fantasma'."""
-        print("-" * 20)
-        print(f"--> Iniciando 'destruir' para a transição com tag: {self.tag_unica}")
-        
-        # Procura por todos os itens no canvas que têm essa tag
-        itens_encontrados = self.canvas.find_withtag(self.tag_unica)
-        
-        if not itens_encontrados:
-            print("!!! ALERTA: Nenhum componente visual foi encontrado com esta tag!")
-        else:
-            print(f"    Encontrados {len(itens_encontrados)} componentes visuais para apagar:")
-            for item_id in itens_encontrados:
-                # Para cada item, mostra suas tags
-                print(f"    - ID do item: {item_id}, Tags: {self.canvas.gettags(item_id)}")
-        
-        # Executa o comando de apagar
-        self.canvas.delete(self.tag_unica)
-        print(f"<-- Comando de exclusão para '{self.tag_unica}' executado.")
-        print("-" * 20)
-        
-    def selecionar(self):
-        self.canvas.itemconfig(self.tag_unica, fill="green")
-
-    def desselecionar(self):
-        self.atualizar_posicao()
-
-# --- Classes de Comando (para Undo/Redo) ---]
-class Comando:
-    """Classe base para todas as ações que podem ser desfeitas."""
-    def executar(self):
-        raise NotImplementedError
-    def desfazer(self):
-        raise NotImplementedError
-
-class ComandoCriarEstado(Comando):
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.estado_criado = None
-        self.nome_original = None # NOVO: Para lembrar o nome
-
-    def executar(self):
-        global contador_estados
-        
-        # Se estamos refazendo, usa o nome original. Senão, cria um novo nome.
-        if self.nome_original:
-            nome_estado = self.nome_original
-        else:
-            nome_estado = f"q{contador_estados}"
-            self.nome_original = nome_estado # Guarda o nome para o futuro
-            contador_estados += 1
-
-        self.estado_criado = Estado(nome_estado, self.x, self.y, canvas)
-        estados[nome_estado] = self.estado_criado
-        
-        # Lógica para definir como inicial (pode ser aprimorada no futuro)
-        is_initial = not any(est.inicial for est in estados.values() if est != self.estado_criado)
-        if is_initial:
-            self.estado_criado.set_inicial()
-
-        print(f"Comando Executado: Criar Estado {nome_estado}")
-        return True
-
-    def desfazer(self):
-        # Não precisamos mais mexer no contador global aqui
-        if self.estado_criado:
-            nome_estado = self.estado_criado.nome
-            self.estado_criado.destruir()
-            del estados[nome_estado]
-            print(f"Comando Desfeito: Apagar Estado {nome_estado}")
-
-class ComandoApagarTransicao(Comando):
-    def __init__(self, transicao_a_apagar):
-        # A "ordem" precisa saber qual transição ela é responsável por apagar.
-        self.transicao_apagada = transicao_a_apagar
-
-    def executar(self):
-        """Ação de apagar: remove a transição da lista e da tela."""
-        if self.transicao_apagada in transicoes:
-            self.transicao_apagada.destruir()
-            transicoes.remove(self.transicao_apagada)
-            print(f"Comando Executado: Apagar Transição")
-            return True
-        return False # Não executou se a transição já não existia
-
-    def desfazer(self):
-        """Ação de desfazer: coloca a transição de volta na lista e a redesenha."""
-        if self.transicao_apagada not in transicoes:
-            transicoes.append(self.transicao_apagada)
-            self.transicao_apagada.atualizar_posicao() # Redesenha a transição
-            print(f"Comando Desfeito: Restaurar Transição")
-
-class ComandoCriarTransicao(Comando):
-    def __init__(self, origem, destino):
-        self.origem = origem
-        self.destino = destino
-        self.transicao_criada = None
-        self.transicao_gemea = None
-        self.offset_original_gemea = (0, 0)
-
-    def executar(self):
-        # Cria a nova transição
-        self.transicao_criada = Transicao(self.origem, self.destino, canvas)
-        transicoes.append(self.transicao_criada)
-
-        # Procura por uma transição gêmea
-        self.transicao_gemea = next((t for t in transicoes if t.origem == self.destino and t.destino == self.origem), None)
-
-        if self.transicao_gemea:
-            # Guarda o estado original da gêmea antes de modificá-la
-            self.offset_original_gemea = (self.transicao_gemea.offset_x, self.transicao_gemea.offset_y)
-            
-            # Aplica o desvio em ambas
-            dist = math.dist((self.origem.x, self.origem.y), (self.destino.x, self.destino.y))
-            if dist == 0: dist = 1
-            vetor_x = (self.destino.x - self.origem.x) / dist
-            vetor_y = (self.destino.y - self.origem.y) / dist
-            vetor_perp_x, vetor_perp_y = -vetor_y, vetor_x
-            offset_dist = 15
-
-            self.transicao_criada.offset_x = vetor_perp_x * offset_dist
-            self.transicao_criada.offset_y = vetor_perp_y * offset_dist
-            self.transicao_criada.atualizar_posicao()
-
-            self.transicao_gemea.offset_x = -vetor_perp_x * offset_dist
-            self.transicao_gemea.offset_y = -vetor_perp_y * offset_dist
-            self.transicao_gemea.atualizar_posicao()
-        
-        print("Comando Executado: Criar Transição")
-        return True
-
-    def desfazer(self):
-        # Apaga a transição que foi criada
-        self.transicao_criada.destruir()
-        transicoes.remove(self.transicao_criada)
-
-        # Se uma transição gêmea foi modificada, restaura ela ao seu estado original
-        if self.transicao_gemea:
-            self.transicao_gemea.offset_x, self.transicao_gemea.offset_y = self.offset_original_gemea
-            self.transicao_gemea.atualizar_posicao()
-            
-        print("Comando Desfeito: Criar Transição")
-
-class ComandoToggleAceitacao(Comando):
-    def __init__(self, estados_para_alternar):
-        # Esta classe é inteligente, ela aceita uma lista ou conjunto de estados
-        self.estados_afetados = list(estados_para_alternar)
-
-    def executar(self):
-        for estado in self.estados_afetados:
-            estado.toggle_aceitacao()
-        print(f"Comando Executado: Alternar aceitação para {len(self.estados_afetados)} estado(s).")
-        return True
-
-    def desfazer(self):
-        # A ação de desfazer um 'toggle' é simplesmente fazer o 'toggle' de novo!
-        for estado in self.estados_afetados:
-            estado.toggle_aceitacao()
-        print(f"Comando Desfeito: Alternar aceitação para {len(self.estados_afetados)} estado(s).")
-
-class ComandoAlterarCor(Comando):
-    def __init__(self, estados_para_alterar):
-        self.estados_afetados = list(estados_para_alterar)
-        self.cores_antigas = {}
-        self.nova_cor = None
-
-    def executar(self):
-        # Primeiro, abre a caixa de diálogo para escolher a cor
-        cor_escolhida = colorchooser.askcolor(title="Escolha a nova cor")
-        if not cor_escolhida or not cor_escolhida[1]:
-            return False # Usuário cancelou, a ação não foi executada
-
-        self.nova_cor = cor_escolhida[1] # Guarda o código hexadecimal (ex: "#ffffff")
-        
-        # Antes de mudar, guarda as cores antigas de cada estado
-        for estado in self.estados_afetados:
-            cor_antiga = canvas.itemcget(estado.id_circulo, "fill")
-            self.cores_antigas[estado] = cor_antiga
-        
-        # Aplica a nova cor a todos os estados
-        for estado in self.estados_afetados:
-            canvas.itemconfig(estado.id_circulo, fill=self.nova_cor)
-
-        print(f"Comando Executado: Mudar cor para {len(self.estados_afetados)} estado(s).")
-        return True
-
-    def desfazer(self):
-        # Restaura a cor antiga de cada estado, uma por uma
-        for estado in self.estados_afetados:
-            cor_original = self.cores_antigas.get(estado)
-            if cor_original:
-                canvas.itemconfig(estado.id_circulo, fill=cor_original)
-        print(f"Comando Desfeito: Restaurar cor para {len(self.estados_afetados)} estado(s).")
-
-class ComandoRenomearEstado(Comando):
-    def __init__(self, estado_para_renomear):
-        self.estado = estado_para_renomear
-        self.nome_antigo = None
-        self.nome_novo = None
-
-    def _aplicar_rename(self, de, para):
-        """Função auxiliar para aplicar a renomeação (em qualquer direção)."""
-        # Atualiza tags
-        ids_componentes = canvas.find_withtag(de)
-        for item_id in ids_componentes:
-            tags_atuais = list(canvas.gettags(item_id))
-            novas_tags = [para if t == de else t for t in tags_atuais]
-            canvas.itemconfig(item_id, tags=tuple(novas_tags))
-        # Atualiza texto
-        canvas.itemconfig(self.estado.id_texto, text=para)
-        # Atualiza objeto e dicionário
-        self.estado.nome = para
-        estados[para] = estados.pop(de)
-
-    def executar(self):
-        self.nome_antigo = self.estado.nome
-        novo_nome = simpledialog.askstring("Renomear Estado", f"Digite o novo nome para '{self.nome_antigo}':", initialvalue=self.nome_antigo)
-        
-        if novo_nome and novo_nome != self.nome_antigo:
-            if novo_nome in estados:
-                messagebox.showwarning("Erro", "O nome inserido já existe.")
-                return False
-            
-            self.nome_novo = novo_nome
-            self._aplicar_rename(self.nome_antigo, self.nome_novo)
-            print(f"Comando Executado: Renomear {self.nome_antigo} -> {self.nome_novo}")
-            return True
-        return False
-
-    def desfazer(self):
-        if self.nome_antigo and self.nome_novo:
-            self._aplicar_rename(self.nome_novo, self.nome_antigo)
-            print(f"Comando Desfeito: Renomear {self.nome_novo} -> {self.nome_antigo}")
-
-class ComandoEditarTransicao(Comando):
-    def __init__(self, transicao):
-        self.transicao = transicao
-        # Guarda o estado completo antes da edição
-        self.estado_antigo = {}
-        self.novo_rotulo_str = None
-
-    def executar(self):
-        # 1. Guarda o estado antigo completo para o Desfazer
-        self.estado_antigo = {
-            "simbolos_entrada": list(self.transicao.simbolos_entrada),
-            "simbolo_saida": self.transicao.simbolo_saida,
-            "para_desempilhar": self.transicao.para_desempilhar,
-            "para_empilhar": self.transicao.para_empilhar
-        }
-
-        # 2. Abre a caixa de diálogo correta com base no modo
-        valor_inicial = self.transicao._get_rotulo_texto()
-        
-        if tipo_automato_atual == "AP":
-            self.novo_rotulo_str = simpledialog.askstring(
-                "Editar Transição (AP)",
-                "Formato: entrada, desempilha → empilha\n(Use ε ou deixe em branco para vazio)",
-                initialvalue=valor_inicial
-            )
-        elif tipo_automato_atual == "Mealy":
-            self.novo_rotulo_str = simpledialog.askstring("Editar Transição (Mealy)", "Formato: entrada / saida", initialvalue=valor_inicial)
-        else: # AFD, AFN, AFNe, Moore
-            self.novo_rotulo_str = simpledialog.askstring(f"Editar Símbolos ({tipo_automato_atual})", "Símbolos de entrada (separados por vírgula):", initialvalue=valor_inicial)
-
-        # Se o usuário não cancelou...
-        if self.novo_rotulo_str is not None:
-            # 3. Manda a transição se atualizar com a nova informação
-            # (A função 'atualizar_simbolo' agora precisa ser mais inteligente)
-            self.transicao.atualizar_simbolo(self.novo_rotulo_str)
-            print("Comando Executado: Editar Transição")
-            return True
-        return False # Usuário cancelou
-
-    def desfazer(self):
-        # Restaura todos os valores antigos
-        self.transicao.simbolos_entrada = self.estado_antigo["simbolos_entrada"]
-        self.transicao.simbolo_saida = self.estado_antigo["simbolo_saida"]
-        self.transicao.para_desempilhar = self.estado_antigo["para_desempilhar"]
-        self.transicao.para_empilhar = self.estado_antigo["para_empilhar"]
-        self.transicao.atualizar_posicao() # Redesenha com os valores antigos
-        print("Comando Desfeito: Reverter Edição de Transição")
-
-    def desfazer(self):
-        # Restaura os valores antigos
-        self.transicao.simbolos_entrada = self.simbolos_antigos
-        self.transicao.simbolo_saida = self.simbolo_saida_antigo
-        self.transicao.atualizar_posicao() # Redesenha com os valores antigos
-        print("Comando Desfeito: Reverter Edição de Transição")
-
-class ComandoMover(Comando):
-    def __init__(self, itens_para_mover, dx, dy):
-        self.itens_movidos = set(itens_para_mover)
-        self.dx = dx
-        self.dy = dy
-
-    def executar(self):
-        for item in self.itens_movidos:
-            item.mover(self.dx, self.dy)
-            atualizar_transicoes_conectadas(item)
-        print(f"Comando Executado: Mover {len(self.itens_movidos)} item(ns)")
-        return True
-
-    def desfazer(self):
-        for item in self.itens_movidos:
-            item.mover(-self.dx, -self.dy)
-            atualizar_transicoes_conectadas(item)
-        print(f"Comando Desfeito: Mover {len(self.itens_movidos)} item(ns)")
-
-class ComandoApagar(Comando):
-    def __init__(self, itens_para_apagar):
-        # Guarda os itens que o usuário mandou apagar
-        self.itens_apagados_diretamente = set(itens_para_apagar)
-        # Guarda as transições que serão apagadas como consequência
-        self.transicoes_em_cascata = set()
-
-    def executar(self):
-        estados_a_apagar = {item for item in self.itens_apagados_diretamente if isinstance(item, Estado)}
-        
-        # Encontra e guarda as transições conectadas aos estados que serão apagados
-        for t in transicoes:
-            if t.origem in estados_a_apagar or t.destino in estados_a_apagar:
-                if t not in self.itens_apagados_diretamente:
-                    self.transicoes_em_cascata.add(t)
-
-        # Junta todas as transições que devem sumir
-        todas_transicoes_a_apagar = self.itens_apagados_diretamente.union(self.transicoes_em_cascata)
-
-        # Executa a exclusão
-        for item in todas_transicoes_a_apagar:
-            if isinstance(item, Transicao) and item in transicoes:
-                item.destruir()
-                transicoes.remove(item)
-        
-        for estado in estados_a_apagar:
-            if estado.nome in estados:
-                estado.destruir()
-                del estados[estado.nome]
-        
-        itens_selecionados.clear()
-        print(f"Comando Executado: Apagar itens.")
-        return True
-
-    def desfazer(self):
-        # Restaura os estados primeiro
-        estados_a_restaurar = {item for item in self.itens_apagados_diretamente if isinstance(item, Estado)}
-        for estado in estados_a_restaurar:
-            estados[estado.nome] = estado
-            estado.redesenhar() # Usa o novo método para recriar na tela!
-        
-        # Restaura todas as transições depois
-        todas_transicoes_a_restaurar = self.itens_apagados_diretamente.union(self.transicoes_em_cascata)
-        for t in todas_transicoes_a_restaurar:
-            if isinstance(t, Transicao):
-                if t not in transicoes:
-                    transicoes.append(t)
-                t.atualizar_posicao()
-        
-        print(f"Comando Desfeito: Restaurar itens apagados.")
-
-
-
-# --- Variáveis Globais ---
-contador_estados = 0 # Contador para nomes automáticos de estados
-estados = {} # Dicionário de estados, chave é o nome do estado
-transicoes = [] 
-objeto_arrastado = {"id": None, "x_inicial": 0, "y_inicial": 0} # Estado ou "grupo"
-modo_atual = "arrastar" # Modos: arrastar, transicao, apagar, selecao
-transicao_info = {"origem": None} # Informação temporária para criação de transições
-caminho_arquivo_atual = None # Caminho do arquivo atualmente aberto
-tipo_automato_atual = "AFNe" # Padrão inicial
-itens_selecionados = set() # Conjunto de estados selecionados
-caixa_selecao = None # ID do retângulo de seleção
-historico_acoes = []      # Pilha de Undo
-historico_refazer = []    # Pilha de Redo
-comando_em_andamento = None # NOVO v12: Guarda um comando enquanto ele está sendo executado
-ponto_inicial_arraste = None # NOVO v12: Guarda o ponto inicial do arraste
-pilha_simulacao = [] # NOVO v13: Guarda o conteúdo da pilha durante a simulação
-
-
-# --- Funções "Detetive" ---
-def encontrar_estado_clicado(event):
-    itens_proximos = canvas.find_closest(event.x, event.y)
-    if not itens_proximos: return None
-    tags_do_item = canvas.gettags(itens_proximos[0])
-    tags_de_sistema = {"estado", "texto", "seta_inicial", "aceitacao"}
-    tag_nome = next((tag for tag in tags_do_item if tag not in tags_de_sistema), None)
-    return estados.get(tag_nome)
-
-
-# --- Funções de Interação e UI ---
-def iniciar_movimento(event):
-    global ponto_inicial_arraste, caixa_selecao, comando_em_andamento
-    
-    # Prioridade 1: Apagar
-    if modo_atual == "apagar":
-        gerenciar_clique_apagar(event)
-        return
-
-    # Prioridade 2: Editar transição
-    itens_proximos = canvas.find_closest(event.x, event.y)
-    if itens_proximos:
-        tags = canvas.gettags(itens_proximos[0])
-        if "transicao" in tags or "rotulo" in tags:
-            editar_rotulo_transicao(itens_proximos[0])
-            return
-
-    # --- LÓGICA CORRIGIDA ---
-    # Agora, a lógica de cada modo é totalmente independente
-
-    if modo_atual == "arrastar":
-        # Só define o ponto inicial se estivermos neste modo
-        ponto_inicial_arraste = (event.x, event.y)
-        estado_clicado = encontrar_estado_clicado(event)
-        if estado_clicado and math.dist((event.x, event.y), (estado_clicado.x, estado_clicado.y)) <= estado_clicado.raio:
-            objeto_arrastado["id"] = estado_clicado
-        else:
-            objeto_arrastado["id"] = None
-            
-    elif modo_atual == "selecao":
-        # Só define o ponto inicial se estivermos neste modo
-        ponto_inicial_arraste = (event.x, event.y)
-        estado_clicado = encontrar_estado_clicado(event)
-        if estado_clicado and estado_clicado in itens_selecionados:
-            objeto_arrastado["id"] = "grupo"
-        else:
-            limpar_selecao()
-            caixa_selecao = canvas.create_rectangle(event.x, event.y, event.x, event.y, outline="blue", dash=(3, 5))
-    
-    elif modo_atual == "transicao":
-        # Este modo NÃO define o ponto_inicial_arraste, pois é um clique, não um arraste.
-        gerenciar_clique_transicao(event)
-
-def arrastar_objeto(event):
-    global comando_em_andamento
-    if ponto_inicial_arraste is None: return
-
-    # Se um comando de movimento já foi iniciado (pela lógica de Desfazer/Refazer)
-    if isinstance(comando_em_andamento, ComandoMover):
-        dx_total = event.x - ponto_inicial_arraste[0]
-        dy_total = event.y - ponto_inicial_arraste[1]
-        
-        # Para o 'desfazer' funcionar corretamente, precisamos mover a partir da posição original
-        # Desfazemos o último movimento antes de aplicar o novo movimento total
-        comando_em_andamento.desfazer() 
-        comando_em_andamento.dx, comando_em_andamento.dy = dx_total, dy_total
-        comando_em_andamento.executar()
-        return
-
-    # Lógica de arraste visual (antes de criar o comando)
-    dx = event.x - objeto_arrastado.get("x_prev", event.x)
-    dy = event.y - objeto_arrastado.get("y_prev", event.y)
-
-    if modo_atual == "arrastar" and isinstance(objeto_arrastado.get("id"), Estado):
-        estado = objeto_arrastado["id"]
-        estado.mover(dx, dy)
-        atualizar_transicoes_conectadas(estado)
-    elif modo_atual == "selecao" and objeto_arrastado.get("id") == "grupo":
-        for estado in itens_selecionados:
-            estado.mover(dx, dy)
-            atualizar_transicoes_conectadas(estado)
-    elif modo_atual == "selecao" and caixa_selecao:
-        canvas.coords(caixa_selecao, ponto_inicial_arraste[0], ponto_inicial_arraste[1], event.x, event.y)
-
-    objeto_arrastado["x_prev"], objeto_arrastado["y_prev"] = event.x, event.y
-
-
-def finalizar_arraste(event):
-    global caixa_selecao, ponto_inicial_arraste
-    
-    if ponto_inicial_arraste is None:
-        return
-
-    dx = event.x - ponto_inicial_arraste[0]
-    dy = event.y - ponto_inicial_arraste[1]
-    
-    # Se o movimento foi significativo, cria um ComandoMover
-    if (abs(dx) > 3 or abs(dy) > 3):
-        itens_movidos = set()
-        if modo_atual == "arrastar" and isinstance(objeto_arrastado.get("id"), Estado):
-            itens_movidos = {objeto_arrastado["id"]}
-        elif modo_atual == "selecao" and objeto_arrastado.get("id") == "grupo":
-            itens_movidos = itens_selecionados
-        
-        if itens_movidos:
-            comando = ComandoMover(itens_movidos, dx, dy)
-            executar_comando(comando)
-            status_acao.config(text=f"{len(itens_movidos)} item(ns) movido(s).")
-    
-    # Se NÃO houve arraste (foi um clique simples) no modo arrastar
-    elif modo_atual == "arrastar" and objeto_arrastado.get("id") is None:
-         comando = ComandoCriarEstado(event.x, event.y)
-         executar_comando(comando)
-         status_acao.config(text=f"Estado {comando.estado_criado.nome} criado.")
-
-    # Finaliza o DESENHO da caixa de seleção
-    if modo_atual == "selecao" and caixa_selecao:
-        coords_caixa = canvas.coords(caixa_selecao)
-        ids_na_caixa = canvas.find_enclosed(*coords_caixa)
-        for item_id in ids_na_caixa:
-            tags = canvas.gettags(item_id)
-            if "estado" in tags:
-                nome_estado = next((t for t in tags if not t.startswith("trans_") and t not in ["estado", "texto", "rotulo", "aceitacao"]), None)
-                if nome_estado and estados.get(nome_estado) not in itens_selecionados:
-                    estado = estados[nome_estado]
-                    estado.selecionar()
-                    itens_selecionados.add(estado)
-        canvas.delete(caixa_selecao)
-        caixa_selecao = None
-
-    # Limpeza final
-    objeto_arrastado.clear()
-    ponto_inicial_arraste = None
-
-def gerenciar_clique_arrastar(event):
-    """
-    Gerencia o clique no modo arrastar. Se o clique for em um estado,
-    prepara para arrastar. Se for no fundo, usa o sistema de COMANDOS
-    para criar um novo estado (permitindo o Undo/Redo).
-    """
-    estado_clicado = encontrar_estado_clicado(event)
-    
-    # Se o clique foi dentro de um estado existente, prepara para arrastar
-    if estado_clicado:
-        dist = math.dist((event.x, event.y), (estado_clicado.x, estado_clicado.y))
-        if dist <= estado_clicado.raio:
-            objeto_arrastado["id"] = estado_clicado
-            objeto_arrastado["x_inicial"], objeto_arrastado["y_inicial"] = event.x, event.y
-            return # Ação de arrastar definida, termina a função aqui
-
-    # Se a função chegou até aqui, significa que o clique foi no fundo do canvas.
-    # Em vez de chamar a função antiga, usamos o novo sistema de Comandos:
-    
-    # 1. Cria a "ordem de serviço" para criar um estado
-    comando = ComandoCriarEstado(event.x, event.y)
-    
-    # 2. Executa o comando e o adiciona ao histórico
-    executar_comando(comando)
-    
-    # 3. Atualiza o status para o usuário
-    status_acao.config(text=f"Estado {comando.estado_criado.nome} criado.")
-
-def gerenciar_clique_transicao(event):
-    global transicao_info
-    estado_clicado = encontrar_estado_clicado(event)
-
-    if not estado_clicado:
-        cancelar_criacao_transicao(event) # Reutiliza a função de cancelar
-        return
-
-    if transicao_info["origem"] is None:
-        transicao_info["origem"] = estado_clicado
-        canvas.itemconfig(estado_clicado.id_circulo, fill="yellow")
-        status_acao.config(text=f"Origem: {estado_clicado.nome}. Clique no destino ou botão do meio para cancelar.")
-    else:
-        estado_origem = transicao_info["origem"]
-        estado_destino = estado_clicado
-
-        comando = ComandoCriarTransicao(estado_origem, estado_destino)
-        executar_comando(comando)
-        
-        # Limpa e reseta a UI
-        canvas.itemconfig(estado_origem.id_circulo, fill="lightblue")
-        transicao_info["origem"] = None
-        status_acao.config(text="Transição criada! Clique nela para editar.")
-
-def editar_rotulo_transicao(id_item_clicado):
-    tags_do_item = canvas.gettags(id_item_clicado) # Obtém todas as tags do item clicado
-    tag_alvo = next((tag for tag in tags_do_item if tag.startswith("trans_")), None)
-    if not tag_alvo: return
-    transicao_alvo = next((t for t in transicoes if t.tag_unica == tag_alvo), None)
-    if not transicao_alvo: return
-
-    # Em vez de ter a lógica aqui, criamos e executamos o comando
-    comando = ComandoEditarTransicao(transicao_alvo)
-    executar_comando(comando)
-
-def gerenciar_clique_apagar(event):
-    """
-    Gerencia cliques no modo apagar. Usa o sistema de Comandos para
-    ações que podem ser desfeitas.
-    """
-    # Encontra o item clicado, seja estado ou transição
-    estado_clicado = encontrar_estado_clicado(event)
-    
-    # --- LÓGICA PARA APAGAR ESTADO ---
-    if estado_clicado:
-        # Se o estado faz parte de uma seleção, o comando é para o grupo
-        if estado_clicado in itens_selecionados:
-            comando = ComandoApagar(itens_selecionados)
-        else: # Senão, é só para o estado clicado
-            comando = ComandoApagar({estado_clicado})
-        
-        executar_comando(comando)
-        status_acao.config(text="Item(ns) apagado(s).")
-        return
-
-    # --- LÓGICA PARA APAGAR TRANSIÇÃO (PREENCHIDA) ---
-    itens_proximos = canvas.find_closest(event.x, event.y)
-    if not itens_proximos: return
-    id_item_clicado = itens_proximos[0]
-    tags = canvas.gettags(id_item_clicado)
-    
-    tag_alvo = next((t for t in tags if t.startswith("trans_")), None) # Encontrou uma transição?
-    if tag_alvo:
-        transicao_para_apagar = next((t for t in transicoes if t.tag_unica == tag_alvo), None) # Encontrou a transição
-        
-        if transicao_para_apagar: # Se encontrou, cria e executa o comando
-            comando = ComandoApagar({transicao_para_apagar})
-            executar_comando(comando)
-            status_acao.config(text="Transição apagada.")
-
-def toggle_aceitacao_event(event):
-    # Se estamos no meio da criação de uma transição, ignora o clique duplo
-    # Impede a ação se estivermos no modo Mealy
-    if tipo_automato_atual == "Mealy":
-        return
-    
-    estado_clicado = encontrar_estado_clicado(event)
-    if estado_clicado:
-        estado_clicado.toggle_aceitacao()
-
-def atualizar_transicoes_conectadas(estado_movido):
-    for transicao in transicoes:
-        if transicao.origem == estado_movido or transicao.destino == estado_movido:
-            transicao.atualizar_posicao()
-
-def mostrar_menu_contexto(event):
-    estado_clicado = encontrar_estado_clicado(event)
-    if not estado_clicado: return
-
-    menu_contexto = tk.Menu(janela, tearoff=0)
-    acao_em_grupo = estado_clicado in itens_selecionados and len(itens_selecionados) > 1
-
-    if acao_em_grupo:
-        # --- MENU PARA AÇÕES EM GRUPO ---
-        if tipo_automato_atual not in ["Mealy", "Moore"]:
-            menu_contexto.add_command(label=f"Marcar/Desmarcar Aceitação ({len(itens_selecionados)} itens)", command=lambda: executar_comando(ComandoToggleAceitacao(itens_selecionados)))
-        menu_contexto.add_command(label="Renomear Estados...", state="disabled")
-        menu_contexto.add_command(label=f"Alterar Cor ({len(itens_selecionados)} itens)...", command=lambda: executar_comando(ComandoAlterarCor(itens_selecionados)))
-        menu_contexto.add_separator()
-        menu_contexto.add_command(label=f"Apagar {len(itens_selecionados)} Estados Selecionados", command=apagar_selecao)
-    else:
-        # --- MENU PARA AÇÃO INDIVIDUAL ---
-        if tipo_automato_atual not in ["Mealy", "Moore"]:
-            menu_contexto.add_command(label="Marcar/Desmarcar como Aceitação", command=lambda: executar_comando(ComandoToggleAceitacao({estado_clicado})))
-        if tipo_automato_atual == "Moore":
-            menu_contexto.add_command(label="Definir Saída do Estado...", command=lambda: definir_saida_estado(estado_clicado))
-        
-        menu_contexto.add_command(label="Renomear Estado...", command=lambda: executar_comando(ComandoRenomearEstado(estado_clicado)))
-        menu_contexto.add_command(label="Alterar Cor...", command=lambda: executar_comando(ComandoAlterarCor({estado_clicado})))
-        menu_contexto.add_separator()
-        menu_contexto.add_command(label="Apagar Estado", command=lambda: apagar_estado(estado_clicado))
-
-    menu_contexto.post(event.x_root, event.y_root)
-
-def atualizar_status_modo():
-    """Atualiza o texto do painel de status da esquerda com o modo e tipo atuais."""
-    # Capitalize() deixa a primeira letra maiúscula (ex: 'arrastar' -> 'Arrastar')
-    texto_modo = modo_atual.capitalize().replace("Arrastar", "Criar/Arrastar")
-    status_modo.config(text=f"Tipo: {tipo_automato_atual}  |  Modo: {texto_modo}")
-
-def atualizar_display_pilha():
-    """Atualiza a label na UI para mostrar o conteúdo atual da pilha."""
-    # Mostra o topo da pilha à esquerda
-    conteudo_formatado = "[" + " | ".join(reversed(pilha_simulacao)) + "]"
-    label_pilha.config(text=conteudo_formatado)
-
-def apagar_estado(estado_para_apagar):
-    """
-    Função dedicada para apagar um estado e suas transições,
-    com diálogo de confirmação.
-    """
-    if not estado_para_apagar: return
-
-    confirmar = messagebox.askyesno(
-        "Apagar Estado",
-        f"Tem certeza que deseja apagar o estado '{estado_para_apagar.nome}'?\n"
-        f"Todas as transições conectadas a ele também serão apagadas."
-    )
-
-    if confirmar:
-        # 1. Encontra e apaga as transições conectadas
-        transicoes_a_remover = [
-            t for t in transicoes
-            if t.origem == estado_para_apagar or t.destino == estado_para_apagar
-        ]
-        
-        for t in transicoes_a_remover:
-            t.destruir()
-            transicoes.remove(t)
-
-        # 2. Apaga o estado em si
-        nome_estado = estado_para_apagar.nome
-        estado_para_apagar.destruir()
-        del estados[nome_estado]
-        status_acao.config(text=f"Estado {nome_estado} apagado.")
-    else:
-        status_acao.config(text="Ação de apagar cancelada.")
-
-def cancelar_criacao_transicao(event):
-    """
-    Cancela a criação de uma transição que está em andamento.
-    Chamada pelo clique do botão do meio do mouse.
-    """
-    global transicao_info
-    # Verifica se há um estado de origem já selecionado
-    if transicao_info["origem"]:
-        # Restaura a cor original do estado de origem
-        canvas.itemconfig(transicao_info["origem"].id_circulo, fill="lightblue")
-        
-        # Limpa a variável de controle, efetivamente cancelando a ação
-        transicao_info["origem"] = None
-        
-        # Atualiza a interface para informar o usuário
-        status_acao.config(text="Criação de transição cancelada.")
-        print("Criação de transição cancelada.")
-
-def gerenciar_atalhos_teclado(event):
-    """Gerencia os atalhos de teclado para ações rápidas."""
-    # event.keysym nos dá o nome da tecla que foi pressionada
-    if event.keysym == "F1":
-        ativar_modo_arrastar()
-    elif event.keysym == "F2":
-        ativar_modo_transicao()
-    elif event.keysym == "F3":
-        ativar_modo_selecao()
-    elif event.keysym == "F4":
-        ativar_modo_apagar()
-    elif event.keysym == "Delete" and itens_selecionados:
-        apagar_selecao()
-
-def gerenciar_clique_duplo(event):
-    """
-    Gerencia o evento de clique duplo, usando o sistema de Comandos.
-    """
-    if modo_atual == "transicao":
-        estado_clicado = encontrar_estado_clicado(event)
-        if estado_clicado:
-            # --- MUDANÇA AQUI ---
-            # Em vez de criar diretamente, usamos o sistema de Comandos
-            comando = ComandoCriarTransicao(estado_clicado, estado_clicado)
-            executar_comando(comando)
-            
-            if transicao_info["origem"]:
-                canvas.itemconfig(transicao_info["origem"].id_circulo, fill="lightblue")
-                transicao_info["origem"] = None
-            status_acao.config(text=f"Laço criado para o estado {estado_clicado.nome}.")
-            
-    else: # Para qualquer outro modo
-        # A ação de toggle também já usa o sistema de Comandos, então está correto
-        estado_clicado = encontrar_estado_clicado(event)
-        if estado_clicado:
-            comando = ComandoToggleAceitacao({estado_clicado})
-            executar_comando(comando)
-
-def executar_comando(comando, vindo_do_refazer=False):
-    if comando.executar():
-        historico_acoes.append(comando)
-        if not vindo_do_refazer:
-            historico_refazer.clear()
-
-def desfazer_acao(event=None):
-    if not historico_acoes:
-        status_acao.config(text="Nada para desfazer.")
-        return
-    
-    comando = historico_acoes.pop()
-    comando.desfazer()
-    historico_refazer.append(comando)
-
-    # 🔧 Correção para loops visuais que não desaparecem
-    for item_id in canvas.find_all():
-        if canvas.type(item_id) == "arc":  # loops são desenhados como 'arc'
-            tags = canvas.gettags(item_id)
-            # Se a tag não pertence a nenhuma transição ativa, remove
-            if not any(t.tag_unica in tags for t in transicoes):
-                canvas.delete(item_id)
-                
-    status_acao.config(text="Ação desfeita.")
-
-
-def refazer_acao(event=None):
-    if not historico_refazer:
-        status_acao.config(text="Nada para refazer.")
-        return
-
-    comando = historico_refazer.pop()
-    # Avisa ao executor que esta ação está vindo do refazer
-    executar_comando(comando, vindo_do_refazer=True) 
-    status_acao.config(text="Ação refeita.")
-
-
-
-# --- Funções de Modo e Tipo ---
-def ativar_modo_arrastar():
-    global modo_atual
-    limpar_selecao() # Limpa a seleção ao entrar neste modo
-    modo_atual = "arrastar"
-    atualizar_status_modo()
-    print("Modo alterado para: arrastar")
-
-def ativar_modo_transicao():
-    global modo_atual
-    limpar_selecao() # Limpa a seleção ao entrar neste modo
-    modo_atual = "transicao"
-    atualizar_status_modo()
-    print("Modo alterado para: transicao")
-
-def ativar_modo_apagar():
-    global modo_atual
-    limpar_selecao() # Limpa a seleção ao entrar neste modo
-    modo_atual = "apagar"
-    atualizar_status_modo()
-    print("Modo alterado para: apagar")
-
-def ativar_modo_selecao():
-    global modo_atual
-    modo_atual = "selecao"
-    atualizar_status_modo() # Atualiza o painel de status
-    print("Modo alterado para: selecao")
-def limpar_selecao():
-    """
-    Desseleciona todos os itens visualmente e limpa o conjunto de
-    itens selecionados na memória.
-    """
-    if itens_selecionados:
-        for item in itens_selecionados:
-            item.desselecionar()
-        itens_selecionados.clear()
-        print("Seleção limpa.")
-def apagar_selecao():
-    """
-    Verifica se há itens selecionados e, após confirmação, apaga todos
-    os estados selecionados e suas transições conectadas.
-    """
-    # Se não há nada selecionado, não faz nada
-    if not itens_selecionados:
-        return
-
-    # Pede confirmação ao usuário, informando quantos itens serão apagados
-    confirmar = messagebox.askyesno(
-        "Apagar Seleção",
-        f"Tem certeza que deseja apagar os {len(itens_selecionados)} estados selecionados?\n"
-        "Todas as transições conectadas a eles também serão apagadas."
-    )
-
-    if confirmar:
-        estados_para_apagar = set(itens_selecionados)
-        transicoes_para_apagar = set()
-
-        # Encontra todas as transições conectadas aos estados selecionados
-        for t in transicoes:
-            if t.origem in estados_para_apagar or t.destino in estados_para_apagar:
-                transicoes_para_apagar.add(t)
-        
-        # Apaga as transições encontradas
-        for t in transicoes_para_apagar:
-            t.destruir()
-            if t in transicoes:
-                transicoes.remove(t)
-
-        # Apaga os estados selecionados
-        for estado in estados_para_apagar:
-            nome_estado = estado.nome
-            estado.destruir()
-            if nome_estado in estados:
-                del estados[nome_estado]
-        
-        # Limpa a memória de seleção
-        itens_selecionados.clear()
-        status_acao.config(text=f"{len(estados_para_apagar)} estados foram apagados.")
-def atalho_apagar_selecao(event):
-    """Função adaptadora para o atalho da tecla Delete."""
-    apagar_selecao()
-
-def definir_tipo_automato(novo_tipo):
-    global tipo_automato_atual
-    confirmar = messagebox.askyesno(
-        "Mudar Tipo de Autômato",
-        f"Você tem certeza que deseja mudar para {novo_tipo}?\n"
-        "Todo o trabalho não salvo no autômato atual será perdido."
-    )
-    if confirmar:
-        novo_automato()
-        tipo_automato_atual = novo_tipo
-        atualizar_status_modo() # <-- USA A NOVA FUNÇÃO
-        status_acao.config(text=f"Tipo alterado para {novo_tipo}.") # Mensagem de ação
-        print(f"Tipo de autômato definido para: {tipo_automato_atual}")
-
-def definir_saida_estado(estado):
-    """Abre uma caixa de diálogo para definir o símbolo de saída de um estado (Moore)."""
-    nova_saida = simpledialog.askstring(
-        "Definir Saída de Estado (Moore)",
-        f"Digite o símbolo de saída para o estado '{estado.nome}':",
-        initialvalue=estado.simbolo_saida
-    )
-    if nova_saida is not None: # Permite definir uma saída vazia
-        estado.simbolo_saida = nova_saida
-        estado.atualizar_texto() # Chama o novo método para atualizar a tela
-
-
-
-# --- Funções de Animação e Simulação ---
-def animar_token(token_id, origem, destino, callback_ao_finalizar, passo_atual=0, total_passos=30):
-    coords_origem = canvas.coords(origem.id_circulo)
-    x_o, y_o = (coords_origem[0] + coords_origem[2]) / 2, (coords_origem[1] + coords_origem[3]) / 2
-    coords_destino = canvas.coords(destino.id_circulo)
-    x_d, y_d = (coords_destino[0] + coords_destino[2]) / 2, (coords_destino[1] + coords_destino[3]) / 2
-    deslocamento_x, deslocamento_y = x_d - x_o, y_d - y_o
-    pos_x = x_o + (deslocamento_x * passo_atual) / total_passos
-    pos_y = y_o + (deslocamento_y * passo_atual) / total_passos
-    raio_token = 5
-    canvas.coords(token_id, pos_x - raio_token, pos_y - raio_token, pos_x + raio_token, pos_y + raio_token)
-    if passo_atual < total_passos:
-        canvas.after(20, animar_token, token_id, origem, destino, callback_ao_finalizar, passo_atual + 1, total_passos)
-    else:
-        canvas.delete(token_id)
-        if callback_ao_finalizar:
-            callback_ao_finalizar()
-
-def calcular_fecho_epsilon(estados_origem):
-    fecho = set(estados_origem)
-    pilha = list(estados_origem)
-    while pilha:
-        estado_atual = pilha.pop()
-        for t in transicoes:
-            if t.origem == estado_atual and "ε" in t.simbolos_entrada:
-                if t.destino not in fecho:
-                    fecho.add(t.destino)
-                    pilha.append(t.destino)
-    return fecho
-
-def validar_automato_como_AFD():
-    for estado in estados.values():
-        simbolos_vistos = set()
-        for t in transicoes:
-            if t.origem == estado:
-                if "ε" in t.simbolos_entrada:
-                    return (False, f"O estado '{estado.nome}' possui uma transição épsilon (ε).")
-                interseccao = simbolos_vistos.intersection(t.simbolos_entrada)
-                if interseccao:
-                    return (False, f"Não-determinismo no estado '{estado.nome}' para o símbolo '{list(interseccao)[0]}'.")
-                simbolos_vistos.update(t.simbolos_entrada)
-    return (True, "")
-
-def simular_palavra():
-    global tipo_automato_atual
-    palavra = input_entry.get()
-    resultado.config(text="Simulando...")
-    sequencia_saida.config(text="Saída: ")
-    
-    estado_inicial = next((est for est in estados.values() if est.inicial), None)
-    if not estado_inicial:
-        # ...
-        return
-    
-    # Cria a lista de histórico vazia para a simulação
-    historico = []
-        
-    if tipo_automato_atual == "AFD":
-        # ...
-        simular_passo_a_passo_AFD(palavra, estado_inicial)
-
-    elif tipo_automato_atual in ["AFNe", "AFN"]:
-        estados_atuais = calcular_fecho_epsilon({estado_inicial})
-        # A simulação de AFNe não gera relatório de saída, então não passamos o histórico
-        simular_passo_a_passo_AFNe(palavra, estados_atuais, "")
-
-    elif tipo_automato_atual == "Mealy":
-        # Inicia a simulação passando o histórico vazio
-        simular_passo_a_passo_Mealy(palavra, estado_inicial, "", historico)
-
-    elif tipo_automato_atual == "Moore":
-        saida_inicial = estado_inicial.simbolo_saida
-        sequencia_saida.config(text=f"Saída: {saida_inicial}")
-        # Adiciona o passo 0 (inicial) ao histórico de Moore
-        passo_zero = {
-            "Passo": 0, "Estado Atual": estado_inicial.nome, "Lendo Símbolo": "",
-            "Saída Gerada": saida_inicial, "Próximo Estado": estado_inicial.nome
-        }
-        historico.append(passo_zero)
-        # Inicia a simulação passando o histórico com o primeiro passo
-        simular_passo_a_passo_Moore(palavra, estado_inicial, saida_inicial, historico)
-
-def simular_passo_a_passo_AFD(palavra_restante, estado_atual):
-    canvas.itemconfig(estado_atual.id_circulo, outline="blue", width=3)
-    if not palavra_restante:
-        aceita = estado_atual.aceitacao
-        resultado.config(text="Palavra aceita ✅" if aceita else "Palavra rejeitada ❌", fg="green" if aceita else "red")
-        janela.after(2000, lambda: canvas.itemconfig(estado_atual.id_circulo, outline="black", width=2))
-        return
-    simbolo_atual, proxima_palavra = palavra_restante[0], palavra_restante[1:]
-    transicao_encontrada = next((t for t in transicoes if t.origem == estado_atual and simbolo_atual in t.simbolos_entrada), None)
-    if not transicao_encontrada:
-        resultado.config(text=f"Rejeitada ❌ (preso no símbolo '{simbolo_atual}')", fg="red")
-        janela.after(2000, lambda: canvas.itemconfig(estado_atual.id_circulo, outline="black", width=2))
-        return
-    estado_destino = transicao_encontrada.destino
-    raio_token = 5
-    token = canvas.create_oval(estado_atual.x - raio_token, estado_atual.y - raio_token, estado_atual.x + raio_token, estado_atual.y + raio_token, fill="red", outline="black")
-    proximo_passo = lambda: simular_passo_a_passo_AFD(proxima_palavra, estado_destino)
-    animar_token(token, estado_atual, estado_destino, proximo_passo)
-
-def simular_passo_a_passo_AFNe(palavra_restante, estados_atuais, saida_acumulada):
-    for estado in estados.values(): canvas.itemconfig(estado.id_circulo, outline="black", width=2)
-    for estado in estados_atuais: canvas.itemconfig(estado.id_circulo, outline="blue", width=3)
-    if not palavra_restante:
-        aceita = any(estado.aceitacao for estado in estados_atuais)
-        resultado.config(text="Palavra aceita ✅" if aceita else "Palavra rejeitada ❌", fg="green" if aceita else "red")
-        sequencia_saida.config(text=f"Saída Final: {saida_acumulada}")
-        janela.after(1000, lambda: [canvas.itemconfig(e.id_circulo, outline="black", width=2) for e in estados.values()])
-        return
-    simbolo_atual, proxima_palavra = palavra_restante[0], palavra_restante[1:]
-    proximos_estados_brutos, saida_passo = set(), ""
-    transicoes_usadas = []
-    for estado_origem in estados_atuais:
-        for t in transicoes:
-            if t.origem == estado_origem and simbolo_atual in t.simbolos_entrada:
-                proximos_estados_brutos.add(t.destino)
-                if t.simbolo_saida: saida_passo += t.simbolo_saida
-                if t not in transicoes_usadas: transicoes_usadas.append(t)
-    if not proximos_estados_brutos:
-        resultado.config(text=f"Rejeitada ❌ (preso no símbolo '{simbolo_atual}')", fg="red")
-        janela.after(1000, lambda: [canvas.itemconfig(e.id_circulo, outline="black", width=2) for e in estados.values()])
-        return
-    proximos_estados_finais = calcular_fecho_epsilon(proximos_estados_brutos)
-    nova_saida_acumulada = saida_acumulada + saida_passo
-    for t in transicoes_usadas: canvas.itemconfig(t.tag_unica, fill="red")
-    nomes_atuais = ", ".join(sorted([e.nome for e in proximos_estados_finais]))
-    status_acao.config(text=f"Lendo '{simbolo_atual}'... Próximos estados: [{nomes_atuais}]")
-    sequencia_saida.config(text=f"Saída: {nova_saida_acumulada}")
-    def ir_para_proximo_passo():
-        for t in transicoes_usadas: canvas.itemconfig(t.tag_unica, fill="black")
-        simular_passo_a_passo_AFNe(proxima_palavra, proximos_estados_finais, nova_saida_acumulada)
-    janela.after(700, ir_para_proximo_passo)
-
-def simular_passo_a_passo_Mealy(palavra_restante, estado_atual, saida_acumulada, historico_passos):
-    """
-    Motor de simulação para Máquinas de Mealy, com realce de estados e transições.
-    """
-    # Limpa realces anteriores e realça o estado atual em azul
-    for est in estados.values(): canvas.itemconfig(est.id_circulo, outline="black", width=2)
-    canvas.itemconfig(estado_atual.id_circulo, outline="blue", width=3)
-
-    # Função de limpeza para o final
-    def limpar_realces_finais():
-        for est in estados.values():
-            canvas.itemconfig(est.id_circulo, outline="black", width=2)
-
-    # Fim da simulação
-    if not palavra_restante:
-        resultado.config(text="Simulação concluída!", fg="blue")
-        sequencia_saida.config(text=f"Saída Final: {saida_acumulada}")
-        janela.after(500, lambda: salvar_saida_em_arquivo(input_entry.get(), historico_passos))
-        janela.after(2000, limpar_realces_finais)
-        return
-
-    simbolo_atual = palavra_restante[0]
-    proxima_palavra = palavra_restante[1:]
-    
-    transicao_encontrada = next((t for t in transicoes if t.origem == estado_atual and simbolo_atual in t.simbolos_entrada), None)
-            
-    if not transicao_encontrada:
-        resultado.config(text=f"Rejeitada ❌ (transição inválida para '{simbolo_atual}')", fg="red")
-        janela.after(2000, limpar_realces_finais)
-        return
-
-    estado_destino = transicao_encontrada.destino
-    nova_saida_acumulada = saida_acumulada + transicao_encontrada.simbolo_saida
-    
-    # Registra o passo no histórico
-    passo_info = {
-        "Passo": len(historico_passos) + 1, "Estado Atual": estado_atual.nome,
-        "Lendo Símbolo": simbolo_atual, "Saída Gerada": transicao_encontrada.simbolo_saida,
-        "Próximo Estado": estado_destino.nome
-    }
-    historico_passos.append(passo_info)
-    
-    # Realça a transição usada
-    canvas.itemconfig(transicao_encontrada.tag_unica, fill="red")
-    
-    # ATUALIZA A UI A CADA PASSO
-    status_acao.config(text=f"Lendo '{simbolo_atual}', gerando '{transicao_encontrada.simbolo_saida}'...")
-    sequencia_saida.config(text=f"Saída: {nova_saida_acumulada}")
-    
-    def ir_para_proximo_passo():
-        canvas.itemconfig(transicao_encontrada.tag_unica, fill="black")
-        simular_passo_a_passo_Mealy(proxima_palavra, estado_destino, nova_saida_acumulada, historico_passos)
-
-    janela.after(800, ir_para_proximo_passo)
-
-def simular_passo_a_passo_Moore(palavra_restante, estado_atual, saida_acumulada, historico_passos):
-    # ... (o início e a limpeza continuam iguais)
-
-    if not palavra_restante:
-        # ... (configura o resultado final)
-        # Chama a nova função de salvar com o histórico completo
-        janela.after(500, lambda: salvar_saida_em_arquivo(input_entry.get(), historico_passos))
-        janela.after(2000, lambda: [canvas.itemconfig(e.id_circulo, outline="black", width=2) for e in estados.values()])
-        return
-
-    simbolo_atual = palavra_restante[0]
-    proxima_palavra = palavra_restante[1:]
-    
-    transicao_encontrada = next((t for t in transicoes if t.origem == estado_atual and simbolo_atual in t.simbolos_entrada), None)
-            
-    if not transicao_encontrada:
-        # ... (lógica de rejeição continua igual)
-        return
-
-    estado_destino = transicao_encontrada.destino
-    nova_saida_acumulada = saida_acumulada + estado_destino.simbolo_saida
-
-    # --- NOVIDADE AQUI: REGISTRA O PASSO ---
-    passo_info = {
-        "Passo": len(historico_passos) + 1,
-        "Estado Atual": estado_atual.nome,
-        "Lendo Símbolo": simbolo_atual,
-        "Saída Gerada": estado_destino.simbolo_saida, # Saída de Moore é do estado de destino
-        "Próximo Estado": estado_destino.nome
-    }
-    historico_passos.append(passo_info)
-    
-    # ... (realce e atualização da UI continuam iguais)
-    
-    def ir_para_proximo_passo():
-        # ...
-        # Passa o histórico atualizado para o próximo passo
-        simular_passo_a_passo_Moore(proxima_palavra, estado_destino, nova_saida_acumulada, historico_passos)
-
-    janela.after(800, ir_para_proximo_passo)
-
-
-
-# --- Funções de Arquivo ---
-def novo_automato():
-    global estados, transicoes, contador_estados, caminho_arquivo_atual
-    canvas.delete("all")
-    estados, transicoes = {}, []
-    contador_estados = 0
-    caminho_arquivo_atual = None
-    resultado.config(text="")
-    status_acao.config(text="Novo autômato criado. Clique no canvas para começar.")
-
-def _salvar_dados_no_arquivo(caminho):
-    dados = {
-        "estados": [{"nome": e.nome, "x": e.x, "y": e.y, "inicial": e.inicial, "aceitacao": e.aceitacao, "simbolo_saida": e.simbolo_saida} for e in estados.values()],
-        "transicoes": [{"origem": t.origem.nome, "destino": t.destino.nome, "simbolos_entrada": t.simbolos_entrada,
-                        "simbolo_saida": t.simbolo_saida, "offset_x": t.offset_x, "offset_y": t.offset_y} for t in transicoes]
-    }
-    with open(caminho, "w", encoding="utf-8") as f:
-        json.dump(dados, f, indent=4)
-    status_acao.config(text=f"Autômato salvo em {caminho.split('/')[-1]}")
-
-def salvar():
-    if caminho_arquivo_atual:
-        _salvar_dados_no_arquivo(caminho_arquivo_atual)
-    else:
-        salvar_como()
-
-def salvar_como():
-    global caminho_arquivo_atual
-    arquivo = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON files", "*.json"), ("JFLAP files", "*.jff")])
-    if arquivo:
-        caminho_arquivo_atual = arquivo
-        _salvar_dados_no_arquivo(caminho_arquivo_atual)
-    if caminho_arquivo_atual.lower().endswith('.jff'):
-            exportar_para_jflap_xml(caminho_arquivo_atual)
-    else: 
-            _salvar_dados_no_arquivo(caminho_arquivo_atual)
-
-def salvar_saida_em_arquivo(palavra_entrada, historico_passos):
-    """
-    Pergunta ao usuário se deseja salvar o histórico da simulação e, se sim,
-    abre um diálogo para salvar em um arquivo .csv formatado para o Excel.
-    """
-    if not historico_passos: return
-
-    string_saida = "".join([passo["Saída Gerada"] for passo in historico_passos])
-    
-    confirmar = messagebox.askyesno(
-        "Salvar Relatório de Simulação",
-        f"A simulação para a entrada '{palavra_entrada}' gerou a saída: '{string_saida}'\n\n"
-        "Deseja salvar um relatório detalhado (.csv)?"
-    )
-    
-    if confirmar:
-        nome_sugerido = f"relatorio_{palavra_entrada}.csv" if palavra_entrada else "relatorio.csv"
-        arquivo = filedialog.asksaveasfilename(
-            defaultextension=".csv",
-            filetypes=[("Arquivo CSV", "*.csv"), ("Todos os arquivos", "*.*")],
-            initialfile=nome_sugerido
-        )
-        
-        if arquivo:
-            try:
-                # --- CORREÇÕES APLICADAS AQUI ---
-                # Usamos 'utf-8-sig' para ajudar o Excel a entender os acentos
-                # E 'newline=""' que é uma boa prática para arquivos csv
-                with open(arquivo, "w", encoding="utf-8-sig", newline="") as f:
-                    # Usamos delimiter=';' para separar as colunas corretamente no Excel
-                    writer = csv.writer(f, delimiter=';')
-                    
-                    writer.writerow(["Palavra de Entrada", palavra_entrada])
-                    writer.writerow(["Palavra de Saída", string_saida])
-                    writer.writerow([])
-                    
-                    headers = historico_passos[0].keys()
-                    writer.writerow(headers)
-                    
-                    for passo in historico_passos:
-                        writer.writerow(passo.values())
-                        
-                status_acao.config(text=f"Relatório salvo em {arquivo.split('/')[-1]}")
-            except Exception as e:
-                messagebox.showerror("Erro ao Salvar", f"Não foi possível salvar o relatório:\n{e}")
-
-
-#--------------------------------------------------------
-
-def exportar_para_jflap_xml(caminho_arquivo):
-    
-    raiz = ET.Element('structure')
-    ET.SubElement(raiz, 'type').text = "fa"
-    automato = ET.SubElement(raiz, 'automaton')
-    estado_para_id = {estado: i for i, estado in enumerate(estados.values())}
-    for i, estado in enumerate(estados.values()):
-        e_xml = ET.SubElement(automato, 'state', id=str(i), name=estado.nome)
-        ET.SubElement(e_xml, 'x').text = str(float(estado.x))
-        ET.SubElement(e_xml, 'y').text = str(float(estado.y))
-        
-        if estado.inicial:
-            ET.SubElement(e_xml, 'initial')
-        if estado.aceitacao:
-            ET.SubElement(e_xml, 'final')
-
-    for transicao in transicoes:
-        t_xml = ET.SubElement(automato, 'transition')
-        
-        origem_id = estado_para_id.get(transicao.origem)
-        destino_id = estado_para_id.get(transicao.destino)
-        
-        if origem_id is None or destino_id is None: continue 
-        
-        ET.SubElement(t_xml, 'from').text = str(origem_id)
-        ET.SubElement(t_xml, 'to').text = str(destino_id)
-        
-        simbolo = transicao.simbolos_entrada[0] 
-        
-        read_tag = ET.SubElement(t_xml, 'read')
-        if simbolo.lower() != "ε":
-             read_tag.text = simbolo
-
-    xml_string = ET.tostring(raiz, encoding='utf-8')
-    reparsed = minidom.parseString(xml_string) 
-    with open(caminho_arquivo, "w", encoding="utf-8") as f:
-        f.write(reparsed.toprettyxml(indent="  "))
-  
-    status_acao.config(text=f"Exportado para JFLAP XML (JFF) em: {caminho_arquivo.split('/')[-1]}")
-#----------------------------------------------------
-
-def atalho_salvar(event):
-    """Função adaptadora para o atalho Ctrl+S. Ignora o evento e chama a função salvar."""
-    # O 'event' é recebido mas não precisamos usá-lo aqui.
-    salvar()
-    print("Atalho Ctrl+S acionado: arquivo salvo.")
-
-def abrir_automato():
-    global caminho_arquivo_atual
-    
-    # Aumentei a lista de filtros para ser mais robusta
-    arquivo = filedialog.askopenfilename(
-        filetypes=[
-            ("Todos os Arquivos de Autômato", "*.jff;*.json"),
-            ("JFLAP files", "*.jff"),
-            ("JSON files", "*.json")
-        ]
-    )
-    
-    if not arquivo: return
-    
-    caminho_arquivo_atual = arquivo
-    
-    # --- NOVO FLUXO: Decide O QUE chamar com base na extensão ---
-    if caminho_arquivo_atual.lower().endswith('.jff'):
-        # CHAMA O IMPORTADOR XML
-        if importar_de_jflap_xml(caminho_arquivo_atual):
-            status_acao.config(text=f"Autômato JFLAP carregado de {arquivo.split('/')[-1]}")
-    
-    elif caminho_arquivo_atual.lower().endswith('.json'):
-        # CHAMA O IMPORTADOR JSON
-        _carregar_dados_json(caminho_arquivo_atual)
-        status_acao.config(text=f"Autômato JSON carregado de {arquivo.split('/')[-1]}")
-
-    else:
-        messagebox.showwarning("Erro de Formato", "Formato de arquivo não reconhecido. Tente .jff ou .json.")
-    corrigir_desvios_carregados()
-    status_acao.config(text=f"Autômato carregado de {arquivo.split('/')[-1]}")
-
-#-----------------------------------------------
-
-def _carregar_dados_json(arquivo):
-    global estados, transicoes, contador_estados, caminho_arquivo_atual
-    
-    # O conteúdo que estava dentro de 'abrir_automato' para JSON deve vir para cá
-    with open(arquivo, "r", encoding="utf-8") as f:
-        dados = json.load(f)
-    
-    # Limpa e carrega como antes
-    novo_automato() 
-    
-    # Recria Estados (como você já faz)
-    for e_data in dados["estados"]:
-        estado = Estado(e_data["nome"], e_data["x"], e_data["y"], canvas)
-        estados[e_data["nome"]] = estado
-        if e_data.get("inicial"): estado.set_inicial()
-        if e_data.get("aceitacao"): estado.set_aceitacao(True)
-    
-    # Atualiza o contador (como você já faz)
-    if estados:
-        maior_num_estado = max([int(nome.replace('q', '')) for nome in estados.keys() if nome.startswith('q') and nome[1:].isdigit()]) + 1
-        contador_estados = maior_num_estado
-        
-    # Recria Transições (como você já faz)
-    for t_data in dados["transicoes"]:
-        origem, destino = estados.get(t_data["origem"]), estados.get(t_data["destino"])
-        if not origem or not destino: continue
-        transicoes.append(Transicao(origem, destino, canvas, 
-                                    t_data.get("simbolos_entrada", ["ε"]), 
-                                    t_data.get("simbolo_saida", ""), 
-                                    t_data.get("offset_x", 0), 
-                                    t_data.get("offset_y", 0)))
-        
-    corrigir_desvios_carregados()
-
-#--------------------------------------------------------------
-
-#--------------------------------------------------------------------------
-def importar_de_jflap_xml(caminho_arquivo):
-    global estados, transicoes, contador_estados
-    
-    try:
-        tree = ET.parse(caminho_arquivo)
-        raiz = tree.getroot()
-        
-        # Limpa o autômato atual
-        novo_automato() 
-
-        # 1. Mapeia ID (do XML) para Nome de Estado (para conexão de transição)
-        mapa_id_nome = {}
-        
-        # 2. Processa os Estados
-        for e_xml in raiz.findall('./automaton/state'):
-            e_id = e_xml.get('id')
-            nome = e_xml.get('name')
-            
-            x = int(float(e_xml.find('x').text)) if e_xml.find('x') is not None else 50
-            y = int(float(e_xml.find('y').text)) if e_xml.find('y') is not None else 50
-            
-            estado = Estado(nome, x, y, canvas) 
-            estados[nome] = estado
-            mapa_id_nome[e_id] = nome 
-            
-            if e_xml.find('initial') is not None:
-                estado.set_inicial()
-            if e_xml.find('final') is not None:
-                estado.set_aceitacao(True)
-                
-        # Atualiza o contador de estados
-        if estados:
-            max_num = max([int(n.replace('q', '')) for n in estados.keys() if n.startswith('q') and n[1:].isdigit()])
-            contador_estados = max_num + 1
-
-        # 3. Processa as Transições
-        for t_xml in raiz.findall('./automaton/transition'):
-            origem_id = t_xml.find('from').text
-            destino_id = t_xml.find('to').text
-            
-            origem_nome = mapa_id_nome.get(origem_id)
-            destino_nome = mapa_id_nome.get(destino_id)
-            
-            origem = estados.get(origem_nome)
-            destino = estados.get(destino_nome)
-            
-            # Símbolo: se a tag <read> tiver texto, é o símbolo. Senão, é epsilon ('ε').
-            read_element = t_xml.find('read')
-            simbolo = read_element.text if read_element is not None and read_element.text else 'ε'
-            
-            if origem and destino:
-                transicoes.append(Transicao(origem, destino, canvas, simbolos_entrada=simbolo))
-
-        # Corrige o desenho de transições reversas que se sobrepõem
-        corrigir_desvios_carregados()
-        
-        return True
-
-    except Exception as e:
-        messagebox.showerror("Erro de Importação JFLAP", f"Erro ao carregar o arquivo JFLAP: {e}")
-        return False
-    
-#----------------------------------------------------------
-
-def corrigir_desvios_carregados():
-    pares_verificados = set()
-    for t1 in transicoes:
-        for t2 in transicoes:
-            if t1 == t2 or tuple(sorted((id(t1), id(t2)))) in pares_verificados: continue
-            if t1.origem == t2.destino and t1.destino == t2.origem:
-                if t1.offset_x == 0 and t2.offset_x == 0: # Apenas corrige se ambos estiverem sem desvio
-                    estado_origem, estado_destino = t1.origem, t1.destino
-                    dist = math.dist((estado_origem.x, estado_origem.y), (estado_destino.x, estado_destino.y))
-                    if dist == 0: dist = 1
-                    vetor_x, vetor_y = (estado_destino.x - estado_origem.x) / dist, (estado_destino.y - estado_origem.y) / dist
-                    vetor_perp_x, vetor_perp_y = -vetor_y, vetor_x
-                    offset_dist = 15 # Distância do desvio
-                    t1.offset_x, t1.offset_y = vetor_perp_x * offset_dist, vetor_perp_y * offset_dist
-                    t1.atualizar_posicao()
-                    t2.offset_x, t2.offset_y = -vetor_perp_x * offset_dist, -vetor_perp_y * offset_dist
-                    t2.atualizar_posicao()
-                pares_verificados.add(tuple(sorted((id(t1), id(t2))))) # Marca como verificado 
-
-
-# --- UI Setup ---
-janela = tk.Tk()
-janela.title("Mini-JFLAP em Python v11")
-janela.geometry("900x700")
-
-
-# --- Menu ---
-menu_bar = tk.Menu(janela)
-menu_arquivo = tk.Menu(menu_bar, tearoff=0)
-menu_arquivo.add_command(label="Novo", command=novo_automato)
-menu_arquivo.add_command(label="Abrir", command=abrir_automato)
-menu_arquivo.add_command(label="Salvar", command=salvar)
-menu_arquivo.add_command(label="Salvar como...", command=salvar_como)
-menu_arquivo.add_separator()
-menu_arquivo.add_command(label="Sair", command=janela.quit)
-menu_bar.add_cascade(label="Arquivo", menu=menu_arquivo)
-# --- NOVO: Menu Tipo de Autômato ---
-menu_tipo = tk.Menu(menu_bar, tearoff=0)
-menu_tipo.add_command(label="Autômato Finito Determinístico (AFD)", command=lambda: definir_tipo_automato("AFD"))
-menu_tipo.add_command(label="Autômato Finito Não Determinístico (AFN)", command=lambda: definir_tipo_automato("AFN"))
-menu_tipo.add_command(label="Autômato Finito Não Determinístico com ε (AFNe)", command=lambda: definir_tipo_automato("AFNe"))
-menu_tipo.add_separator() # Separador visual
-menu_tipo.add_command(label="Máquina de Mealy", command=lambda: definir_tipo_automato("Mealy"))
-menu_tipo.add_command(label="Máquina de Moore", command=lambda: definir_tipo_automato("Moore"))
-menu_tipo.add_separator() # Separador visual
-menu_tipo.add_command(label="Autômato com Pilha (AP)", command=lambda: definir_tipo_automato("AP")) # v13
-menu_tipo.add_command(label="Máquina de Turing [EM BREVE]", state="disabled")
-menu_bar.add_cascade(label="Tipo de Autômato", menu=menu_tipo)
-janela.config(menu=menu_bar)
-
-
-
-# --- Toolbar ---
-toolbar = tk.Frame(janela, bd=1, relief=tk.RAISED)
-toolbar.pack(side=tk.TOP, fill=tk.X, padx=2, pady=2)
-icones = {}
-try:
-    # A linha de import original já nos dá o "Image"
-    nomes_icones = ["selecionar", "estado", "transicao", "apagar", "salvar", "desfazer", "refazer"] # <-- NOVOS ÍCONES v11 e v12
-    for nome in nomes_icones:
-        # A correção está aqui, usando Image.Resampling.LANCZOS
-        img = Image.open(f"icones/{nome}.png").resize((24, 24), Image.Resampling.LANCZOS)
-        icones[nome] = ImageTk.PhotoImage(img)
-    usar_icones = True
-except Exception as e:
-    print(f"Aviso: Ícones não carregados. Usando texto. (Erro: {e})")
-    usar_icones = False
-
-def criar_botao_toolbar(parent, nome_icone, texto, comando):
-    icone = icones.get(nome_icone)
-    if usar_icones and icone:
-        btn = tk.Button(parent, image=icone, relief=tk.FLAT, command=comando, width=30, height=30)
-    else:
-        btn = tk.Button(parent, text=texto, relief=tk.FLAT, command=comando)
-    btn.pack(side=tk.LEFT, padx=2, pady=2)
-    return btn
-
-btn_estado = criar_botao_toolbar(toolbar, "estado", "Estado", ativar_modo_arrastar)
-btn_transicao = criar_botao_toolbar(toolbar, "transicao", "Transição", ativar_modo_transicao)
-btn_selecionar = criar_botao_toolbar(toolbar, "selecionar", "Selecionar", ativar_modo_selecao) # <-- NOVO BOTÃO v11
-btn_apagar = criar_botao_toolbar(toolbar, "apagar", "Apagar", ativar_modo_apagar)
-tk.Frame(toolbar, height=30, width=2, bg="grey").pack(side=tk.LEFT, padx=5, pady=2)
-btn_desfazer = criar_botao_toolbar(toolbar, "desfazer", "Desfazer", desfazer_acao) # <-- NOVO BOTÃO v12
-btn_refazer = criar_botao_toolbar(toolbar, "refazer", "Refazer", refazer_acao) # <-- NOVO BOTÃO v12
-tk.Frame(toolbar, height=30, width=2, bg="grey").pack(side=tk.LEFT, padx=5, pady=2)
-btn_salvar = criar_botao_toolbar(toolbar, "salvar", "Salvar", salvar)
-
-
-
-# --- Canvas ---
-canvas = tk.Canvas(janela, bg="white", highlightthickness=1, highlightbackground="black") # Borda preta
-canvas.pack(fill="both", expand=True, padx=10, pady=10) # Expande para preencher o espaço disponível
-canvas.bind("<ButtonPress-1>", iniciar_movimento) # Clique com o botão esquerdo
-canvas.bind("<Double-Button-1>", gerenciar_clique_duplo) # Duplo clique com o botão esquerdo
-canvas.bind("<B1-Motion>", arrastar_objeto) # Arrasta com o botão esquerdo
-canvas.bind("<ButtonRelease-1>", finalizar_arraste) # Solta o botão esquerdo
-canvas.bind("<Button-2>", cancelar_criacao_transicao)  # Botão do meio para cancelar transição
-canvas.bind("<Button-3>", mostrar_menu_contexto) # Botão direito para menu de contexto
-janela.bind("<Key>", gerenciar_atalhos_teclado) # Atalhos de teclado
-janela.bind("<Control-s>", atalho_salvar) # Atalho Ctrl+S para salvar
-janela.bind("<Control-z>", desfazer_acao) # Atalho Ctrl+Z para desfazer
-janela.bind("<Control-y>", refazer_acao) # Atalho Ctrl+Y para refazer
-
-
-# --- Painel Inferior (Status Bar) ---
-status_bar = tk.Frame(janela, bd=1, relief=tk.SUNKEN)
-status_bar.pack(side=tk.BOTTOM, fill=tk.X)
-# NOVO: Label da esquerda para o status permanente (modo e tipo)
-status_modo = tk.Label(status_bar, text="", bd=1, relief=tk.FLAT, anchor=tk.W)
-status_modo.pack(side=tk.LEFT, padx=5, pady=2)
-# NOVO: Label da direita para as ações temporárias
-status_acao = tk.Label(status_bar, text="Bem-vindo!", bd=1, relief=tk.FLAT, anchor=tk.E)
-status_acao.pack(side=tk.RIGHT, padx=5, pady=2)
-
-# --- Painel de Simulação ---
-painel_simulacao = tk.Frame(janela)
-painel_simulacao.pack(side=tk.BOTTOM, fill="x", padx=10, pady=5)
-tk.Label(painel_simulacao, text="Palavra:", font=("Arial", 10)).pack(side=tk.LEFT, padx=5)
-input_entry = tk.Entry(painel_simulacao, width=40)
-input_entry.pack(side=tk.LEFT, padx=5)
-botao_simular = tk.Button(painel_simulacao, text="Simular", command=simular_palavra)
-botao_simular.pack(side=tk.LEFT, padx=5)
-resultado = tk.Label(painel_simulacao, text="", font=("Arial", 12, "bold"))
-resultado.pack(side=tk.LEFT, padx=10)
-sequencia_saida = tk.Label(painel_simulacao, text="Saída: ", font=("Arial", 12))  
-sequencia_saida.pack(side=tk.LEFT, padx=10)
-
-# --- NOVO: Painel de Visualização da Pilha ---
-painel_pilha = tk.Frame(janela, bd=1, relief=tk.SUNKEN)
-painel_pilha.pack(side=tk.BOTTOM, fill=tk.X, padx=10, pady=5)
-tk.Label(painel_pilha, text="Pilha:", font=("Arial", 10, "bold")).pack(side=tk.LEFT, padx=5)
-label_pilha = tk.Label(painel_pilha, text="[]", font=("Courier", 10), anchor=tk.W)
-label_pilha.pack(fill=tk.X, padx=5)
-
-
-ativar_modo_arrastar()
-janela.mainloop() # Inicia o loop principal da interface gráfica
+import time
+INICIO_PROGRAMA = time.perf_counter() # Antes dos outros imports, para o relatório de inicialização
+import tkinter as tk
+from tkinter import messagebox, simpledialog, filedialog
+import json
+import math
+import os
+# Módulos pesados são importados só onde são usados: csv (relatórios), colorchooser (mudar cor),
+# xml.etree (importar .jff), PIL (gerar o cache de ícones) e multiprocessing (lote em paralelo)
+from collections import deque
+# Núcleo sem interface (modelo, motores, formatos e lote); também usado por 'python -m lflap'
+from lflap.modelo import EstadoModelo, TransicaoModelo, novo_modelo
+from lflap.motores import (
+    CONFIG_AP_PADRAO, LIMITE_CACHE_DETERMINIZACAO, TabelasSimulacao, criar_simulador, fecho_de_conjunto,
+    compilar_fechos_epsilon, compilar_tabela_transicoes, compilar_indice_AFN, passo_conjuntos, simular_AP, descrever_limites_AP,
+    transduzir_fluxo,
+)
+from lflap.rastro import RastroSimulacao
+from lflap.formatos import (
+    TIPO_DO_JFLAP, escrever_jff, ler_jff, ler_json, salvar_binario, AutomatoBinario, FLAG_INICIAL, FLAG_ACEITACAO,
+)
+from lflap.lote import ler_blocos_de_palavras, simular_blocos_em_paralelo
+
+# --- Tempo de Inicialização ---
+etapas_inicializacao = [] # (nome, instante em perf_counter) de cada etapa concluída
+
+def marcar_etapa(nome):
+    etapas_inicializacao.append((nome, time.perf_counter()))
+
+def relatorio_inicializacao():
+    """Quanto tempo cada etapa levou, desde o início do programa (em ms)."""
+    linhas, anterior = ["Inicialização:"], INICIO_PROGRAMA
+    for nome, instante in etapas_inicializacao:
+        linhas.append(f"  {nome:<28}{(instante - anterior) * 1000:8.1f} ms")
+        anterior = instante
+    linhas.append(f"  {'total':<28}{(anterior - INICIO_PROGRAMA) * 1000:8.1f} ms")
+    return "\n".join(linhas)
+
+# --- Registro de Itens do Canvas ---
+objetos_por_item = {} # ID de item do canvas -> Estado ou Transicao que o desenhou
+
+def registrar_item_canvas(dono, item_id):
+    objetos_por_item[item_id] = dono
+    return item_id
+
+def esquecer_itens_canvas(itens):
+    for item_id in itens:
+        objetos_por_item.pop(item_id, None)
+
+def objeto_do_item(item_id):
+    """Estado ou Transicao dono do item do canvas (None para itens soltos, como a caixa de seleção)."""
+    return objetos_por_item.get(item_id)
+
+# --- Vista (zoom, deslocamento e recorte do que é desenhado) ---
+# O modelo (Estado.x/y, offsets) fica sempre em coordenadas do "mundo"; no canvas tudo é
+# multiplicado por zoom_atual. O deslocamento usa a rolagem nativa do canvas (scan_mark/scan_dragto).
+zoom_atual = 1.0
+ZOOM_MINIMO, ZOOM_MAXIMO = 0.05, 4.0
+ZOOM_SIMPLIFICADO = 0.5 # Abaixo deste zoom o desenho fica simplificado: sem rótulos nem pontas de seta
+MARGEM_VISTA = 100      # Pixels (da tela) desenhados além da área visível, para o arraste não "piscar"
+area_visivel = None     # (x1, y1, x2, y2) no mundo; None enquanto o canvas não foi medido (desenha tudo)
+desenho_adiado = False  # True durante carregamentos grandes: nada é desenhado até o atualizar_vista() do final
+
+def desenho_simplificado():
+    return zoom_atual < ZOOM_SIMPLIFICADO
+
+def na_tela(*coords):
+    """Converte coordenadas do mundo em coordenadas do canvas."""
+    return tuple(c * zoom_atual for c in coords)
+
+def retangulo_visivel(x1, y1, x2, y2):
+    """Indica se o retângulo (no mundo) cruza a área visível mais a margem."""
+    if desenho_adiado: return False
+    if area_visivel is None: return True
+    ax1, ay1, ax2, ay2 = area_visivel
+    return x1 <= ax2 and x2 >= ax1 and y1 <= ay2 and y2 >= ay1
+
+# --- Classes ---
+class Estado:
+    def __init__(self, nome, x, y, canvas):
+        self.nome = nome
+        self.x = x
+        self.y = y
+        self.raio = 30
+        self.canvas = canvas
+        self.inicial = False
+        self.aceitacao = False
+        self.simbolo_saida = "" # <-- NOVA LINHA
+        # Índices de adjacência (dicionários usados como conjuntos ordenados), mantidos por
+        # registrar_transicao/remover_transicao
+        self.transicoes_saida = {}
+        self.transicoes_entrada = {}
+        # Aparência do círculo; fica no modelo para sobreviver quando o estado sai da vista e volta
+        self.estilo_circulo = {"fill": "lightblue", "outline": "black", "width": 2}
+        self.id_circulo = None
+        self.id_texto = None
+        self.id_seta_inicial = None
+        self.id_anel = None
+        self.sincronizar_desenho()
+
+    def desenhado(self):
+        return self.id_circulo is not None
+
+    def visivel(self):
+        # Inclui a seta de estado inicial, que fica à esquerda do círculo
+        return retangulo_visivel(self.x - self.raio - 50, self.y - self.raio, self.x + self.raio, self.y + self.raio)
+
+    def sincronizar_desenho(self):
+        """Cria os itens se o estado entrou na vista, ou apaga se saiu."""
+        if self.visivel():
+            if not self.desenhado(): self.desenhar()
+        elif self.desenhado():
+            self.apagar_desenho()
+
+    def desenhar(self):
+        x, y, raio = self.x, self.y, self.raio
+        self.id_circulo = registrar_item_canvas(self, self.canvas.create_oval(
+            *na_tela(x - raio, y - raio, x + raio, y + raio), tags=("estado", self.nome), **self.estilo_circulo
+        ))
+        if not desenho_simplificado():
+            self.id_texto = registrar_item_canvas(self, self.canvas.create_text(
+                *na_tela(x, y), text=self.nome, font=("Arial", max(1, round(12 * zoom_atual)), "bold"), tags=("texto", self.nome)
+            ))
+            self.atualizar_texto()
+        if self.inicial: self._desenhar_seta_inicial()
+        if self.aceitacao: self._desenhar_anel()
+
+    def apagar_desenho(self):
+        itens = self.itens_no_canvas()
+        if itens:
+            self.canvas.delete(*itens)
+            esquecer_itens_canvas(itens)
+        self.id_circulo = self.id_texto = self.id_seta_inicial = self.id_anel = None
+
+    def mover(self, dx, dy):
+        self.x += dx
+        self.y += dy
+        if self.desenhado():
+            # Move pelos IDs guardados (mover por tag faria o Tk procurar a tag em todos os itens)
+            for item_id in self.itens_no_canvas():
+                self.canvas.move(item_id, dx * zoom_atual, dy * zoom_atual)
+        self.sincronizar_desenho()
+
+    def itens_no_canvas(self):
+        """IDs dos itens que este estado desenhou (círculo, texto, seta inicial e anel)."""
+        return [i for i in (self.id_circulo, self.id_texto, self.id_seta_inicial, self.id_anel) if i is not None]
+
+    def _desenhar_seta_inicial(self):
+        self.id_seta_inicial = registrar_item_canvas(self, self.canvas.create_line(
+            *na_tela(self.x - 50, self.y, self.x - self.raio, self.y),
+            arrow=tk.NONE if desenho_simplificado() else tk.LAST, width=2, fill="green", tags=("seta_inicial", self.nome)
+        ))
+
+    def _desenhar_anel(self):
+        self.id_anel = registrar_item_canvas(self, self.canvas.create_oval(
+            *na_tela(self.x - self.raio + 5, self.y - self.raio + 5, self.x + self.raio - 5, self.y + self.raio - 5),
+            outline="black", width=2, tags=("aceitacao", self.nome)
+        ))
+
+    def set_inicial(self):
+        self.inicial = True
+        if self.desenhado() and self.id_seta_inicial is None:
+            self._desenhar_seta_inicial()
+
+    def set_aceitacao(self, eh_aceitacao):
+        if self.aceitacao == eh_aceitacao: return
+        self.aceitacao = eh_aceitacao
+        if self.id_anel is not None:
+            self.canvas.delete(self.id_anel)
+            esquecer_itens_canvas([self.id_anel])
+            self.id_anel = None
+        if self.aceitacao and self.desenhado():
+            self._desenhar_anel()
+
+    def toggle_aceitacao(self):
+        self.set_aceitacao(not self.aceitacao)
+
+    def destruir(self):
+        # A cor fica guardada em 'estilo_circulo', então 'redesenhar' recria o estado igual
+        self.apagar_desenho()
+
+    def atualizar_texto(self):
+        """Atualiza o texto do estado no canvas para incluir a saída (se aplicável)."""
+        if self.id_texto is None: return # Fora da vista ou desenho simplificado
+        texto_display = self.nome
+        # Em modo Moore, se houver símbolo de saída, exibe "nome/saida"
+        if tipo_automato_atual == "Moore" and self.simbolo_saida:
+            texto_display = f"{self.nome}/{self.simbolo_saida}"
+        self.canvas.itemconfig(self.id_texto, text=texto_display)
+
+    def configurar_circulo(self, **estilo):
+        """Muda a aparência do círculo (fill/outline/width), mesmo que ele não esteja desenhado agora."""
+        self.estilo_circulo.update(estilo)
+        if self.id_circulo is not None:
+            self.canvas.itemconfig(self.id_circulo, **estilo)
+
+    def selecionar(self):
+        self.configurar_circulo(outline="green", width=3)
+    def desselecionar(self):
+        self.configurar_circulo(outline="black", width=2)
+
+    def redesenhar(self):
+        """Redesenha todos os componentes visuais do estado no canvas (se estiver na vista)."""
+        self.apagar_desenho()
+        self.sincronizar_desenho()
+
+
+class Transicao:
+    # Dentro da class Transicao
+    def __init__(self, origem, destino, canvas, simbolos_entrada="ε", simbolo_saida="", offset_x=0, offset_y=0):
+        self.origem = origem
+        self.destino = destino
+        self.canvas = canvas
+        
+        if isinstance(simbolos_entrada, str):
+            self.simbolos_entrada = [s.strip() for s in simbolos_entrada.split(',')]
+        else:
+            self.simbolos_entrada = simbolos_entrada
+            
+        self.simbolo_saida = simbolo_saida
+        
+        # --- NOVIDADE AQUI: Memória para o AP ---
+        self.para_desempilhar = "ε" 
+        self.para_empilhar = "ε"
+        # --- FIM DA NOVIDADE ---
+
+        self.tag_unica = f"trans_{id(self)}"
+        self.offset_x = offset_x
+        self.offset_y = offset_y
+        self.is_loop = (self.origem == self.destino)
+        self.ids_canvas = None # IDs dos itens desenhados; são reaproveitados (coords/itemconfig) nas atualizações
+        self.oculta = False # Linha reta entre estados na mesma posição não é mostrada
+        self.atualizar_posicao()
+
+    # Dentro da class Transicao
+    def _get_rotulo_texto(self):
+        global tipo_automato_atual
+        texto_entrada = ",".join(self.simbolos_entrada)
+
+        if tipo_automato_atual == "AP":
+            # Formato do Autômato com Pilha: a, b → c
+            return f"{texto_entrada},{self.para_desempilhar} → {self.para_empilhar}"
+        elif tipo_automato_atual == "Mealy" and self.simbolo_saida:
+            # Formato da Máquina de Mealy: a/1
+            return f"{texto_entrada}/{self.simbolo_saida}"
+        else:
+            # Formato padrão para AFD, AFN, Moore
+            return texto_entrada
+
+    def visivel(self):
+        o, d = self.origem, self.destino
+        if self.is_loop:
+            # O laço e o rótulo ficam acima do estado
+            return retangulo_visivel(o.x - o.raio, o.y - 2 * o.raio - 50, o.x + o.raio, o.y + o.raio)
+        return retangulo_visivel(min(o.x, d.x) + self.offset_x - o.raio, min(o.y, d.y) + self.offset_y - o.raio - 20,
+                                 max(o.x, d.x) + self.offset_x + o.raio, max(o.y, d.y) + self.offset_y + o.raio)
+
+    def sincronizar_desenho(self):
+        """Cria os itens se a transição entrou na vista, ou apaga se saiu."""
+        if self.visivel():
+            if self.ids_canvas is None: self.atualizar_posicao()
+        elif self.ids_canvas is not None:
+            self.destruir()
+
+    def atualizar_posicao(self):
+        # Os itens são criados uma vez só; depois disso só as coordenadas e o texto mudam,
+        # então a ordem de desenho (transições abaixo dos estados) não precisa ser refeita aqui.
+        # Fora da vista a transição não tem itens no canvas.
+        if not self.visivel():
+            if self.ids_canvas is not None: self.destruir()
+            return
+        if self.is_loop:
+            self._desenhar_loop()
+        else:
+            self._desenhar_linha_reta()
+
+    def _desenhar_linha_reta(self):
+        x_o, y_o, x_d, y_d = self.origem.x, self.origem.y, self.destino.x, self.destino.y
+        raio = self.origem.raio
+        dist = math.dist((x_o, y_o), (x_d, y_d))
+        if dist == 0:
+            self._definir_oculta(True)
+            return
+        vetor_x, vetor_y = (x_d - x_o) / dist, (y_d - y_o) / dist
+        p_ini_x, p_ini_y = x_o + vetor_x * raio, y_o + vetor_y * raio
+        p_fim_x, p_fim_y = x_d - vetor_x * raio, y_d - vetor_y * raio
+        coords_linha = na_tela(p_ini_x + self.offset_x, p_ini_y + self.offset_y, p_fim_x + self.offset_x, p_fim_y + self.offset_y)
+        coords_texto = na_tela(((x_o + x_d) / 2) + self.offset_x, ((y_o + y_d) / 2 - 15) + self.offset_y)
+        if self.ids_canvas is None:
+            if desenho_simplificado():
+                # Zoom baixo: só a linha, sem ponta de seta nem rótulo
+                self.ids_canvas = {"linha": self.canvas.create_line(coords_linha, fill="black", width=1, tags=(self.tag_unica, "transicao"))}
+            else:
+                self.ids_canvas = {
+                    "linha": self.canvas.create_line(coords_linha, arrow=tk.LAST, fill="black", width=2, tags=(self.tag_unica, "transicao")),
+                    "texto": self.canvas.create_text(coords_texto, text=self._get_rotulo_texto(), font=("Arial", max(1, round(10 * zoom_atual)), "italic"), tags=(self.tag_unica, "rotulo")),
+                }
+            for item_id in self.ids_canvas.values(): registrar_item_canvas(self, item_id)
+            agendar_ordem_camadas(self.canvas)
+        else:
+            self.canvas.coords(self.ids_canvas["linha"], *coords_linha)
+            if "texto" in self.ids_canvas:
+                self.canvas.coords(self.ids_canvas["texto"], *coords_texto)
+                self.canvas.itemconfig(self.ids_canvas["texto"], text=self._get_rotulo_texto())
+        self._definir_oculta(False)
+
+    def _desenhar_loop(self):
+        x, y = self.origem.x, self.origem.y
+        raio_estado, raio_loop = self.origem.raio, 20
+        bounding_box = na_tela(x - raio_loop, y - (2 * raio_estado), x + raio_loop, y)
+        
+        angulo_final_rad = math.radians(-30)
+        centro_arco_x, centro_arco_y = x, y - raio_estado
+        ponta_x = centro_arco_x + raio_loop * math.cos(angulo_final_rad)
+        ponta_y = centro_arco_y - raio_loop * math.sin(angulo_final_rad)
+        pontas = na_tela(ponta_x, ponta_y, ponta_x - 10, ponta_y - 2, ponta_x - 2, ponta_y + 8)
+        
+        coords_texto = na_tela(x, y - raio_estado - raio_loop - 20)
+        
+        if self.ids_canvas is None:
+            # Arco, ponta da seta e rótulo levam a tag_unica (no zoom baixo, só o arco)
+            self.ids_canvas = {
+                "arco": self.canvas.create_arc(bounding_box, start=210, extent=-240, style=tk.ARC,
+                                               outline="black", width=2, tags=(self.tag_unica, "transicao")),
+            }
+            if not desenho_simplificado():
+                self.ids_canvas["seta"] = self.canvas.create_polygon(pontas, fill="black", tags=(self.tag_unica, "transicao"))
+                self.ids_canvas["texto"] = self.canvas.create_text(coords_texto, text=self._get_rotulo_texto(), font=("Arial", max(1, round(10 * zoom_atual)), "italic"), tags=(self.tag_unica, "rotulo"))
+            for item_id in self.ids_canvas.values(): registrar_item_canvas(self, item_id)
+            agendar_ordem_camadas(self.canvas)
+        else:
+            self.canvas.coords(self.ids_canvas["arco"], *bounding_box)
+            if "seta" in self.ids_canvas:
+                self.canvas.coords(self.ids_canvas["seta"], *pontas)
+                self.canvas.coords(self.ids_canvas["texto"], *coords_texto)
+                self.canvas.itemconfig(self.ids_canvas["texto"], text=self._get_rotulo_texto())
+
+    def itens_no_canvas(self):
+        return list(self.ids_canvas.values()) if self.ids_canvas else []
+
+    def _definir_oculta(self, oculta):
+        if self.oculta != oculta and self.ids_canvas is not None:
+            for item_id in self.ids_canvas.values():
+                self.canvas.itemconfig(item_id, state="hidden" if oculta else "normal")
+        self.oculta = oculta
+
+    def restaurar_cores(self):
+        """Volta as cores padrão (depois de seleção ou destaque da simulação)."""
+        if self.ids_canvas is None: return
+        for papel, item_id in self.ids_canvas.items():
+            if papel == "arco":
+                self.canvas.itemconfig(item_id, outline="black")
+            else:
+                self.canvas.itemconfig(item_id, fill="black")
+
+    def atualizar_simbolo(self, novo_rotulo_completo):
+        global tipo_automato_atual
+        
+        if tipo_automato_atual == "AP":
+            try:
+                parte_antes, parte_depois = novo_rotulo_completo.split('→')
+                partes_antes = parte_antes.split(',')
+                
+                self.simbolos_entrada = [partes_antes[0].strip() or "ε"]
+                self.para_desempilhar = partes_antes[1].strip() if len(partes_antes) > 1 else "ε"
+                self.para_empilhar = parte_depois.strip() or "ε"
+            except ValueError:
+                messagebox.showerror("Erro de Formato", "Formato inválido. Use: entrada, desempilha → empilha")
+        else: # Para Mealy, AFD, AFN, etc.
+            partes = novo_rotulo_completo.split('/', 1)
+            simbolos_entrada_str = partes[0].strip()
+            self.simbolo_saida = partes[1].strip() if len(partes) > 1 else self.simbolo_saida
+            if not simbolos_entrada_str:
+                self.simbolos_entrada = ["ε"]
+            else:
+                self.simbolos_entrada = [s.strip() for s in simbolos_entrada_str.split(',')]
+
+        self.atualizar_posicao()
+
+    def destruir(self):
+        """Apaga do canvas exatamente os itens que esta transição desenhou."""
+        itens = self.itens_no_canvas()
+        if itens:
+            self.canvas.delete(*itens)
+            esquecer_itens_canvas(itens)
+        self.ids_canvas = None # Se voltar (desfazer/refazer), os itens são criados de novo
+        self.oculta = False
+        
+    def selecionar(self):
+        self.canvas.itemconfig(self.tag_unica, fill="green")
+
+    def desselecionar(self):
+        self.restaurar_cores()
+
+_ordem_camadas_agendada = False
+
+def agendar_ordem_camadas(canvas_alvo):
+    """
+    Traz estados, textos e anéis de aceitação para cima das transições recém-criadas.
+    Roda uma vez por lote (no próximo ciclo ocioso do Tk), não uma vez por transição.
+    """
+    global _ordem_camadas_agendada
+    if _ordem_camadas_agendada: return
+    _ordem_camadas_agendada = True
+    canvas_alvo.after_idle(aplicar_ordem_camadas, canvas_alvo)
+
+def aplicar_ordem_camadas(canvas_alvo):
+    global _ordem_camadas_agendada
+    _ordem_camadas_agendada = False
+    canvas_alvo.tag_raise("estado")
+    canvas_alvo.tag_raise("texto")
+    canvas_alvo.tag_raise("aceitacao")
+
+# --- Classes de Comando (para Undo/Redo) ---]
+# Custos aproximados (em bytes) usados para limitar a memória do histórico de Desfazer/Refazer
+CUSTO_APROX_COMANDO = 200
+CUSTO_APROX_ESTADO = 1500   # Estado + itens do canvas + índices de adjacência
+CUSTO_APROX_TRANSICAO = 800 # Transicao + itens do canvas
+
+class Comando:
+    """Classe base para todas as ações que podem ser desfeitas."""
+    # Indica se o comando muda o autômato (e portanto invalida as tabelas compiladas da simulação).
+    # Comandos puramente visuais (mover, cor, renomear) sobrescrevem com False.
+    altera_automato = True
+
+    def executar(self):
+        raise NotImplementedError
+    def desfazer(self):
+        raise NotImplementedError
+    def toca_epsilon(self):
+        """Indica se o comando mexe em transições ε ou remove estados (invalida o cache de fecho-ε)."""
+        return True
+    def custo_memoria(self):
+        """Memória aproximada (bytes) que o comando mantém viva enquanto está no histórico."""
+        return CUSTO_APROX_COMANDO
+    def mesclar(self, outro):
+        """
+        Tenta absorver 'outro' (já executado logo depois deste) numa entrada só do histórico.
+        Retorna True se absorveu; nesse caso desfazer este comando desfaz os dois.
+        """
+        return False
+
+class ComandoCriarEstado(Comando):
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+        self.estado_criado = None
+        self.nome_original = None # NOVO: Para lembrar o nome
+
+    def executar(self):
+        global contador_estados
+        
+        # Se estamos refazendo, usa o nome original. Senão, cria um novo nome.
+        if self.nome_original:
+            nome_estado = self.nome_original
+        else:
+            nome_estado = f"q{contador_estados}"
+            self.nome_original = nome_estado # Guarda o nome para o futuro
+            contador_estados += 1
+
+        self.estado_criado = Estado(nome_estado, self.x, self.y, canvas)
+        estados[nome_estado] = self.estado_criado
+        
+        # Lógica para definir como inicial (pode ser aprimorada no futuro)
+        is_initial = not any(est.inicial for est in estados.values() if est != self.estado_criado)
+        if is_initial:
+            self.estado_criado.set_inicial()
+
+        print(f"Comando Executado: Criar Estado {nome_estado}")
+        return True
+
+    def desfazer(self):
+        # Não precisamos mais mexer no contador global aqui
+        if self.estado_criado:
+            nome_estado = self.estado_criado.nome
+            self.estado_criado.destruir()
+            del estados[nome_estado]
+            print(f"Comando Desfeito: Apagar Estado {nome_estado}")
+
+    def custo_memoria(self):
+        return CUSTO_APROX_COMANDO + CUSTO_APROX_ESTADO
+
+class ComandoApagarTransicao(Comando):
+    def __init__(self, transicao_a_apagar):
+        # A "ordem" precisa saber qual transição ela é responsável por apagar.
+        self.transicao_apagada = transicao_a_apagar
+
+    def executar(self):
+        """Ação de apagar: remove a transição da lista e da tela."""
+        if transicao_no_modelo(self.transicao_apagada):
+            self.transicao_apagada.destruir()
+            remover_transicao(self.transicao_apagada)
+            print("Comando Executado: Apagar Transição")
+            return True
+        return False # Não executou se a transição já não existia
+
+    def desfazer(self):
+        """Ação de desfazer: coloca a transição de volta na lista e a redesenha."""
+        if not transicao_no_modelo(self.transicao_apagada):
+            registrar_transicao(self.transicao_apagada)
+            self.transicao_apagada.atualizar_posicao() # Redesenha a transição
+            print("Comando Desfeito: Restaurar Transição")
+
+    def toca_epsilon(self):
+        return "ε" in self.transicao_apagada.simbolos_entrada
+
+    def custo_memoria(self):
+        return CUSTO_APROX_COMANDO + CUSTO_APROX_TRANSICAO
+
+class ComandoCriarTransicao(Comando):
+    def __init__(self, origem, destino):
+        self.origem = origem
+        self.destino = destino
+        self.transicao_criada = None
+        self.transicao_gemea = None
+        self.offset_original_gemea = (0, 0)
+
+    def executar(self):
+        # Cria a nova transição
+        self.transicao_criada = Transicao(self.origem, self.destino, canvas)
+        registrar_transicao(self.transicao_criada)
+
+        # Procura por uma transição gêmea (no sentido contrário) pelo índice de pares
+        gemeas = transicoes_por_par.get((self.destino, self.origem)) if self.origem is not self.destino else None
+        self.transicao_gemea = gemeas[0] if gemeas else None
+
+        if self.transicao_gemea:
+            # Guarda o estado original da gêmea antes de modificá-la
+            self.offset_original_gemea = (self.transicao_gemea.offset_x, self.transicao_gemea.offset_y)
+            
+            # Aplica o desvio em ambas
+            dist = math.dist((self.origem.x, self.origem.y), (self.destino.x, self.destino.y))
+            if dist == 0: dist = 1
+            vetor_x = (self.destino.x - self.origem.x) / dist
+            vetor_y = (self.destino.y - self.origem.y) / dist
+            vetor_perp_x, vetor_perp_y = -vetor_y, vetor_x
+            offset_dist = 15
+
+            self.transicao_criada.offset_x = vetor_perp_x * offset_dist
+            self.transicao_criada.offset_y = vetor_perp_y * offset_dist
+            self.transicao_criada.atualizar_posicao()
+
+            self.transicao_gemea.offset_x = -vetor_perp_x * offset_dist
+            self.transicao_gemea.offset_y = -vetor_perp_y * offset_dist
+            self.transicao_gemea.atualizar_posicao()
+        
+        print("Comando Executado: Criar Transição")
+        return True
+
+    def desfazer(self):
+        # Apaga a transição que foi criada
+        self.transicao_criada.destruir()
+        remover_transicao(self.transicao_criada)
+
+        # Se uma transição gêmea foi modificada, restaura ela ao seu estado original
+        if self.transicao_gemea:
+            self.transicao_gemea.offset_x, self.transicao_gemea.offset_y = self.offset_original_gemea
+            self.transicao_gemea.atualizar_posicao()
+            
+        print("Comando Desfeito: Criar Transição")
+
+    def toca_epsilon(self):
+        # Toda transição nasce como 'ε'; no desfazer ela já voltou a esse rótulo
+        return "ε" in self.transicao_criada.simbolos_entrada
+
+    def custo_memoria(self):
+        return CUSTO_APROX_COMANDO + CUSTO_APROX_TRANSICAO
+
+class ComandoToggleAceitacao(Comando):
+    def __init__(self, estados_para_alternar):
+        # Esta classe é inteligente, ela aceita uma lista ou conjunto de estados
+        self.estados_afetados = list(estados_para_alternar)
+
+    def executar(self):
+        for estado in self.estados_afetados:
+            estado.toggle_aceitacao()
+        print(f"Comando Executado: Alternar aceitação para {len(self.estados_afetados)} estado(s).")
+        return True
+
+    def toca_epsilon(self):
+        return False
+
+    def desfazer(self):
+        # A ação de desfazer um 'toggle' é simplesmente fazer o 'toggle' de novo!
+        for estado in self.estados_afetados:
+            estado.toggle_aceitacao()
+        print(f"Comando Desfeito: Alternar aceitação para {len(self.estados_afetados)} estado(s).")
+
+class ComandoAlterarCor(Comando):
+    altera_automato = False
+
+    def __init__(self, estados_para_alterar):
+        self.estados_afetados = list(estados_para_alterar)
+        self.cores_antigas = {}
+        self.nova_cor = None
+
+    def executar(self):
+        # Primeiro, abre a caixa de diálogo para escolher a cor
+        from tkinter import colorchooser
+        cor_escolhida = colorchooser.askcolor(title="Escolha a nova cor")
+        if not cor_escolhida or not cor_escolhida[1]:
+            return False # Usuário cancelou, a ação não foi executada
+
+        self.nova_cor = cor_escolhida[1] # Guarda o código hexadecimal (ex: "#ffffff")
+        
+        # Antes de mudar, guarda as cores antigas de cada estado
+        for estado in self.estados_afetados:
+            cor_antiga = estado.estilo_circulo["fill"]
+            self.cores_antigas[estado] = cor_antiga
+        
+        # Aplica a nova cor a todos os estados
+        for estado in self.estados_afetados:
+            estado.configurar_circulo(fill=self.nova_cor)
+
+        print(f"Comando Executado: Mudar cor para {len(self.estados_afetados)} estado(s).")
+        return True
+
+    def desfazer(self):
+        # Restaura a cor antiga de cada estado, uma por uma
+        for estado in self.estados_afetados:
+            cor_original = self.cores_antigas.get(estado)
+            if cor_original:
+                estado.configurar_circulo(fill=cor_original)
+        print(f"Comando Desfeito: Restaurar cor para {len(self.estados_afetados)} estado(s).")
+
+class ComandoRenomearEstado(Comando):
+    altera_automato = False
+
+    def __init__(self, estado_para_renomear):
+        self.estado = estado_para_renomear
+        self.nome_antigo = None
+        self.nome_novo = None
+
+    def _aplicar_rename(self, de, para):
+        """Função auxiliar para aplicar a renomeação (em qualquer direção)."""
+        # Atualiza tags (só dos itens do próprio estado)
+        for item_id in self.estado.itens_no_canvas():
+            tags_atuais = list(canvas.gettags(item_id))
+            novas_tags = [para if t == de else t for t in tags_atuais]
+            canvas.itemconfig(item_id, tags=tuple(novas_tags))
+        # Atualiza objeto e dicionário
+        self.estado.nome = para
+        estados[para] = estados.pop(de)
+        # Atualiza texto
+        self.estado.atualizar_texto()
+
+    def executar(self):
+        self.nome_antigo = self.estado.nome
+        novo_nome = simpledialog.askstring("Renomear Estado", f"Digite o novo nome para '{self.nome_antigo}':", initialvalue=self.nome_antigo)
+        
+        if novo_nome and novo_nome != self.nome_antigo:
+            if novo_nome in estados:
+                messagebox.showwarning("Erro", "O nome inserido já existe.")
+                return False
+            
+            self.nome_novo = novo_nome
+            self._aplicar_rename(self.nome_antigo, self.nome_novo)
+            print(f"Comando Executado: Renomear {self.nome_antigo} -> {self.nome_novo}")
+            return True
+        return False
+
+    def desfazer(self):
+        if self.nome_antigo and self.nome_novo:
+            self._aplicar_rename(self.nome_novo, self.nome_antigo)
+            print(f"Comando Desfeito: Renomear {self.nome_novo} -> {self.nome_antigo}")
+
+class ComandoDefinirSaidaEstado(Comando):
+    """Muda o símbolo de saída de um estado (Moore). Altera o autômato: a tabela do transdutor guarda as saídas."""
+    def __init__(self, estado, nova_saida):
+        self.estado = estado
+        self.saida_antiga = estado.simbolo_saida
+        self.saida_nova = nova_saida
+
+    def executar(self):
+        if self.saida_nova == self.saida_antiga: return False
+        self.estado.simbolo_saida = self.saida_nova
+        self.estado.atualizar_texto()
+        print(f"Comando Executado: Saída de {self.estado.nome} -> '{self.saida_nova}'")
+        return True
+
+    def desfazer(self):
+        self.estado.simbolo_saida = self.saida_antiga
+        self.estado.atualizar_texto()
+        print(f"Comando Desfeito: Saída de {self.estado.nome} -> '{self.saida_antiga}'")
+
+    def toca_epsilon(self):
+        return False
+
+class ComandoEditarTransicao(Comando):
+    def __init__(self, transicao):
+        self.transicao = transicao
+        # Guarda o estado completo antes da edição
+        self.estado_antigo = {}
+        self.novo_rotulo_str = None
+        self.simbolos_novos = []
+
+    def executar(self):
+        # 1. Guarda o estado antigo completo para o Desfazer
+        self.estado_antigo = {
+            "simbolos_entrada": list(self.transicao.simbolos_entrada),
+            "simbolo_saida": self.transicao.simbolo_saida,
+            "para_desempilhar": self.transicao.para_desempilhar,
+            "para_empilhar": self.transicao.para_empilhar
+        }
+
+        # 2. Abre a caixa de diálogo correta com base no modo
+        valor_inicial = self.transicao._get_rotulo_texto()
+        
+        if tipo_automato_atual == "AP":
+            self.novo_rotulo_str = simpledialog.askstring(
+                "Editar Transição (AP)",
+                "Formato: entrada, desempilha → empilha\n(Use ε ou deixe em branco para vazio)",
+                initialvalue=valor_inicial
+            )
+        elif tipo_automato_atual == "Mealy":
+            self.novo_rotulo_str = simpledialog.askstring("Editar Transição (Mealy)", "Formato: entrada / saida", initialvalue=valor_inicial)
+        else: # AFD, AFN, AFNe, Moore
+            self.novo_rotulo_str = simpledialog.askstring(f"Editar Símbolos ({tipo_automato_atual})", "Símbolos de entrada (separados por vírgula):", initialvalue=valor_inicial)
+
+        # Se o usuário não cancelou...
+        if self.novo_rotulo_str is not None:
+            # 3. Manda a transição se atualizar com a nova informação
+            # (A função 'atualizar_simbolo' agora precisa ser mais inteligente)
+            self.transicao.atualizar_simbolo(self.novo_rotulo_str)
+            self.simbolos_novos = list(self.transicao.simbolos_entrada)
+            print("Comando Executado: Editar Transição")
+            return True
+        return False # Usuário cancelou
+
+    def toca_epsilon(self):
+        return "ε" in self.estado_antigo.get("simbolos_entrada", []) or "ε" in self.simbolos_novos
+
+    def desfazer(self):
+        # Restaura todos os valores antigos
+        self.transicao.simbolos_entrada = self.estado_antigo["simbolos_entrada"]
+        self.transicao.simbolo_saida = self.estado_antigo["simbolo_saida"]
+        self.transicao.para_desempilhar = self.estado_antigo["para_desempilhar"]
+        self.transicao.para_empilhar = self.estado_antigo["para_empilhar"]
+        self.transicao.atualizar_posicao() # Redesenha com os valores antigos
+        print("Comando Desfeito: Reverter Edição de Transição")
+
+    def mesclar(self, outro):
+        # Edições seguidas do mesmo rótulo viram uma só: guarda o rótulo original deste e o novo do outro
+        if not isinstance(outro, ComandoEditarTransicao) or outro.transicao is not self.transicao:
+            return False
+        self.novo_rotulo_str = outro.novo_rotulo_str
+        self.simbolos_novos = outro.simbolos_novos
+        return True
+
+class ComandoMover(Comando):
+    altera_automato = False
+
+    def __init__(self, itens_para_mover, dx, dy):
+        self.itens_movidos = set(itens_para_mover)
+        self.dx = dx
+        self.dy = dy
+
+    def executar(self):
+        for item in self.itens_movidos:
+            item.mover(self.dx, self.dy)
+        atualizar_transicoes_dos_estados(self.itens_movidos)
+        print(f"Comando Executado: Mover {len(self.itens_movidos)} item(ns)")
+        return True
+
+    def desfazer(self):
+        for item in self.itens_movidos:
+            item.mover(-self.dx, -self.dy)
+        atualizar_transicoes_dos_estados(self.itens_movidos)
+        print(f"Comando Desfeito: Mover {len(self.itens_movidos)} item(ns)")
+
+    def custo_memoria(self):
+        return CUSTO_APROX_COMANDO + 16 * len(self.itens_movidos)
+
+    def mesclar(self, outro):
+        # Movimentos seguidos da mesma seleção somam os deslocamentos
+        if not isinstance(outro, ComandoMover) or outro.itens_movidos != self.itens_movidos:
+            return False
+        self.dx += outro.dx
+        self.dy += outro.dy
+        return True
+
+class ComandoApagar(Comando):
+    def __init__(self, itens_para_apagar):
+        # Guarda os itens que o usuário mandou apagar
+        self.itens_apagados_diretamente = set(itens_para_apagar)
+        # Guarda as transições que serão apagadas como consequência
+        self.transicoes_em_cascata = set()
+
+    def executar(self):
+        estados_a_apagar = {item for item in self.itens_apagados_diretamente if isinstance(item, Estado)}
+        
+        # Encontra e guarda as transições conectadas aos estados que serão apagados
+        for estado in estados_a_apagar:
+            for t in transicoes_conectadas(estado):
+                if t not in self.itens_apagados_diretamente:
+                    self.transicoes_em_cascata.add(t)
+
+        # Junta todas as transições que devem sumir
+        todas_transicoes_a_apagar = self.itens_apagados_diretamente.union(self.transicoes_em_cascata)
+
+        # Executa a exclusão
+        for item in todas_transicoes_a_apagar:
+            if isinstance(item, Transicao) and transicao_no_modelo(item):
+                item.destruir()
+                remover_transicao(item)
+        
+        for estado in estados_a_apagar:
+            if estado.nome in estados:
+                estado.destruir()
+                del estados[estado.nome]
+        
+        itens_selecionados.clear()
+        print("Comando Executado: Apagar itens.")
+        return True
+
+    def desfazer(self):
+        # Restaura os estados primeiro
+        estados_a_restaurar = {item for item in self.itens_apagados_diretamente if isinstance(item, Estado)}
+        for estado in estados_a_restaurar:
+            estados[estado.nome] = estado
+            estado.redesenhar() # Usa o novo método para recriar na tela!
+        
+        # Restaura todas as transições depois
+        todas_transicoes_a_restaurar = self.itens_apagados_diretamente.union(self.transicoes_em_cascata)
+        for t in todas_transicoes_a_restaurar:
+            if isinstance(t, Transicao):
+                if not transicao_no_modelo(t):
+                    registrar_transicao(t)
+                t.atualizar_posicao()
+        
+        print("Comando Desfeito: Restaurar itens apagados.")
+
+    def toca_epsilon(self):
+        todos = self.itens_apagados_diretamente.union(self.transicoes_em_cascata)
+        return any(isinstance(item, Estado) or "ε" in item.simbolos_entrada for item in todos)
+
+    def custo_memoria(self):
+        # Calculado uma vez, quando o comando entra no histórico (ver contar_no_historico)
+        todos = self.itens_apagados_diretamente.union(self.transicoes_em_cascata)
+        qtd_estados = sum(1 for item in todos if isinstance(item, Estado))
+        return CUSTO_APROX_COMANDO + qtd_estados * CUSTO_APROX_ESTADO + (len(todos) - qtd_estados) * CUSTO_APROX_TRANSICAO
+
+
+class ComandoSubstituirAutomato(Comando):
+    """
+    Troca o autômato inteiro por outro gerado por uma ferramenta (conversão, minimização).
+    O novo autômato é descrito no mesmo formato de dicionários do arquivo .json.
+    """
+    def __init__(self, dados_estados, dados_transicoes, novo_tipo, descricao):
+        self.dados_estados = dados_estados
+        self.dados_transicoes = dados_transicoes
+        self.novo_tipo = novo_tipo
+        self.descricao = descricao
+        self.estados_novos = None
+        self.transicoes_novas = None
+        self.estados_antigos = None
+        self.transicoes_antigas = None
+        self.tipo_antigo = None
+        self.contador_antigo = 0
+
+    def _remover_atual(self):
+        limpar_selecao()
+        for t in list(transicoes):
+            t.destruir()
+            remover_transicao(t)
+        for e in estados.values(): e.destruir()
+        estados.clear()
+
+    def _restaurar(self, lista_estados, lista_transicoes, tipo):
+        global tipo_automato_atual
+        tipo_automato_atual = tipo
+        for e in lista_estados:
+            estados[e.nome] = e
+            e.redesenhar()
+        for t in lista_transicoes:
+            registrar_transicao(t)
+            t.atualizar_posicao()
+        atualizar_status_modo()
+
+    def executar(self):
+        global tipo_automato_atual, contador_estados
+        self.estados_antigos = list(estados.values())
+        self.transicoes_antigas = list(transicoes)
+        self.tipo_antigo = tipo_automato_atual
+        self.contador_antigo = contador_estados
+        self._remover_atual()
+
+        if self.estados_novos is None:
+            # Primeira execução: cria e desenha o novo autômato de uma vez só
+            tipo_automato_atual = self.novo_tipo
+            for e_data in self.dados_estados:
+                estado = Estado(e_data["nome"], e_data["x"], e_data["y"], canvas)
+                estado.simbolo_saida = e_data.get("simbolo_saida", "")
+                estados[estado.nome] = estado
+                if e_data.get("inicial"): estado.set_inicial()
+                if e_data.get("aceitacao"): estado.set_aceitacao(True)
+                estado.atualizar_texto()
+            for t_data in self.dados_transicoes:
+                registrar_transicao(Transicao(estados[t_data["origem"]], estados[t_data["destino"]], canvas,
+                                              t_data["simbolos_entrada"], t_data.get("simbolo_saida", "")))
+            self.estados_novos = list(estados.values())
+            self.transicoes_novas = list(transicoes)
+            atualizar_status_modo()
+        else:
+            self._restaurar(self.estados_novos, self.transicoes_novas, self.novo_tipo)
+
+        contador_estados = proximo_contador_estados(estados.keys())
+        print(f"Comando Executado: {self.descricao}")
+        return True
+
+    def desfazer(self):
+        global contador_estados
+        self._remover_atual()
+        self._restaurar(self.estados_antigos, self.transicoes_antigas, self.tipo_antigo)
+        contador_estados = self.contador_antigo
+        print(f"Comando Desfeito: {self.descricao}")
+
+    def custo_memoria(self):
+        # Guarda o autômato antigo e o novo inteiros (objetos e dicionários de dados)
+        qtd_estados = len(self.dados_estados) + len(self.estados_antigos or ())
+        qtd_transicoes = len(self.dados_transicoes) + len(self.transicoes_antigas or ())
+        return CUSTO_APROX_COMANDO + 2 * (qtd_estados * CUSTO_APROX_ESTADO + qtd_transicoes * CUSTO_APROX_TRANSICAO)
+
+
+# --- Variáveis Globais ---
+contador_estados = 0 # Contador para nomes automáticos de estados
+estados = {} # Dicionário de estados, chave é o nome do estado
+transicoes = {} # Transições do modelo (dicionário como conjunto ordenado: inserir/remover em O(1))
+transicoes_por_par = {} # Índice (origem, destino) -> [transições], mantido junto com 'transicoes'
+objeto_arrastado = {"id": None, "x_inicial": 0, "y_inicial": 0} # Estado ou "grupo"
+modo_atual = "arrastar" # Modos: arrastar, transicao, apagar, selecao
+transicao_info = {"origem": None} # Informação temporária para criação de transições
+caminho_arquivo_atual = None # Caminho do arquivo atualmente aberto
+tipo_automato_atual = "AFNe" # Padrão inicial
+itens_selecionados = set() # Conjunto de estados selecionados
+caixa_selecao = None # ID do retângulo de seleção
+historico_acoes = deque()   # Pilha de Undo (o mais antigo fica à esquerda e é o primeiro a ser descartado)
+historico_refazer = deque() # Pilha de Redo
+memoria_historico = 0       # Soma de custo_memoria() dos comandos em Desfazer + Refazer (mantida a cada entrada/saída)
+config_historico = { # Limites do histórico de Desfazer/Refazer
+    "max_acoes": 500,        # Entradas guardadas (Desfazer + Refazer)
+    "max_memoria_mb": 64,    # Memória aproximada mantida pelos comandos guardados
+    "janela_mesclagem_s": 2.0, # Comandos iguais seguidos dentro desta janela viram uma entrada só
+}
+comando_em_andamento = None # NOVO v12: Guarda um comando enquanto ele está sendo executado
+ponto_inicial_arraste = None # NOVO v12: Guarda o ponto inicial do arraste
+FPS_ARRASTE = 60 # Máximo de redesenhos por segundo durante o arraste
+quadro_arraste_agendado = None # ID do 'after' do próximo quadro de arraste (None se não há quadro pendente)
+instante_ultimo_quadro = 0.0 # time.perf_counter() do último quadro de arraste aplicado
+pilha_simulacao = [] # NOVO v13: Guarda o conteúdo da pilha durante a simulação
+motor_AFN = "conjuntos" # Motor de AFN/AFNe: "conjuntos" (set de Estado), "bitset" (máscaras de int) ou "preguicoso" (AFD sob demanda)
+limite_cache_determinizacao = LIMITE_CACHE_DETERMINIZACAO # Máximo de conjuntos guardados pelo motor "preguicoso"
+config_AP = dict(CONFIG_AP_PADRAO) # Limites e modo de aceitação do motor do Autômato com Pilha
+config_lote = { # Simulação em lote com vários processos
+    "processos": 1,         # 1 simula no próprio processo da interface (cache do motor "preguicoso" e estatísticas)
+    "tamanho_bloco": 5000,  # Palavras enviadas a cada processo por vez
+}
+cache_simulacao = {} # Tabelas compiladas dos motores de simulação (invalidadas quando um Comando altera o autômato)
+config_simulacao = {"atraso_ms": 800} # Atraso entre os passos da simulação animada (0 = turbo)
+simulacao_atual = None    # SimulacaoPassoAPasso em andamento (ou a última, já terminada)
+simulacao_rodando = False # Se a simulação avança sozinha (Executar) ou está pausada
+id_passo_agendado = None  # ID do 'after' do próximo passo automático
+ORCAMENTO_TURBO_S = 0.015 # No turbo, tempo de passos entre um desenho e outro
+LIMITE_SAIDA_NA_TELA = 200 # Pedaços de saída mostrados durante a simulação (o relatório guarda todos)
+
+
+# --- Índices de Adjacência ---
+def registrar_transicao(transicao):
+    """Acrescenta a transição ao modelo e aos índices de adjacência."""
+    transicoes[transicao] = None
+    transicao.origem.transicoes_saida[transicao] = None
+    transicao.destino.transicoes_entrada[transicao] = None
+    transicoes_por_par.setdefault((transicao.origem, transicao.destino), []).append(transicao)
+
+def remover_transicao(transicao):
+    """Retira a transição do modelo e dos índices de adjacência."""
+    transicoes.pop(transicao, None)
+    transicao.origem.transicoes_saida.pop(transicao, None)
+    transicao.destino.transicoes_entrada.pop(transicao, None)
+    par = (transicao.origem, transicao.destino)
+    irmas = transicoes_por_par.get(par)
+    if irmas:
+        if transicao in irmas: irmas.remove(transicao)
+        if not irmas: del transicoes_por_par[par]
+
+def transicao_no_modelo(transicao):
+    return transicao in transicao.origem.transicoes_saida
+
+def transicoes_conectadas(estado):
+    """Transições que saem ou chegam ao estado (laços aparecem uma vez só)."""
+    conectadas = dict(estado.transicoes_saida)
+    conectadas.update(estado.transicoes_entrada)
+    return list(conectadas)
+
+
+# --- Funções "Detetive" ---
+def encontrar_estado_clicado(event):
+    itens_proximos = canvas.find_closest(event.x_tela, event.y_tela)
+    if not itens_proximos: return None
+    dono = objeto_do_item(itens_proximos[0])
+    return dono if isinstance(dono, Estado) else None
+
+def encontrar_transicao_clicada(event):
+    itens_proximos = canvas.find_closest(event.x_tela, event.y_tela)
+    if not itens_proximos: return None
+    dono = objeto_do_item(itens_proximos[0])
+    return dono if isinstance(dono, Transicao) else None
+
+
+# --- Funções de Vista (Zoom e Deslocamento) ---
+vista_agendada = None # ID do 'after_idle' que vai atualizar a vista (None se não há atualização pendente)
+
+def no_mundo(tratador):
+    """
+    Adapta um tratador de evento do canvas: event.x/event.y passam a ser coordenadas do mundo
+    (as do modelo) e event.x_tela/event.y_tela guardam as coordenadas no canvas (para find_closest).
+    """
+    def tratador_no_mundo(event):
+        event.x_tela, event.y_tela = canvas.canvasx(event.x), canvas.canvasy(event.y)
+        event.x, event.y = event.x_tela / zoom_atual, event.y_tela / zoom_atual
+        return tratador(event)
+    return tratador_no_mundo
+
+def medir_area_visivel():
+    """Recalcula a área do mundo que aparece no canvas (mais a margem)."""
+    global area_visivel
+    largura, altura = canvas.winfo_width(), canvas.winfo_height()
+    if largura <= 1 or altura <= 1: # Canvas ainda não foi mostrado
+        area_visivel = None
+        return
+    margem = MARGEM_VISTA
+    x1, y1 = canvas.canvasx(-margem), canvas.canvasy(-margem)
+    x2, y2 = canvas.canvasx(largura + margem), canvas.canvasy(altura + margem)
+    area_visivel = (x1 / zoom_atual, y1 / zoom_atual, x2 / zoom_atual, y2 / zoom_atual)
+
+def atualizar_vista():
+    """Cria os itens de quem entrou na área visível e apaga os de quem saiu (depois de deslocar/redimensionar)."""
+    global vista_agendada
+    vista_agendada = None
+    medir_area_visivel()
+    for estado in estados.values():
+        estado.sincronizar_desenho()
+    for transicao in transicoes:
+        transicao.sincronizar_desenho()
+
+def agendar_atualizacao_vista(event=None):
+    """Junta vários eventos de deslocamento/redimensionamento numa atualização só."""
+    global vista_agendada
+    if vista_agendada is None:
+        vista_agendada = canvas.after_idle(atualizar_vista)
+
+def redesenhar_vista():
+    """Apaga e recria tudo que está visível (o zoom muda as coordenadas de todos os itens)."""
+    for transicao in transicoes:
+        transicao.destruir()
+    for estado in estados.values():
+        estado.apagar_desenho()
+    atualizar_vista()
+
+def _deslocar_vista(dx, dy):
+    """Desloca a vista em (dx, dy) pixels do canvas usando a rolagem nativa."""
+    canvas.scan_mark(0, 0)
+    canvas.scan_dragto(-round(dx), -round(dy), gain=1)
+
+def definir_zoom(novo_zoom, x_ancora=None, y_ancora=None):
+    """Muda o zoom mantendo parado o ponto do mundo sob (x_ancora, y_ancora), em pixels da janela."""
+    global zoom_atual
+    novo_zoom = min(ZOOM_MAXIMO, max(ZOOM_MINIMO, novo_zoom))
+    if novo_zoom == zoom_atual: return
+    if x_ancora is None:
+        x_ancora, y_ancora = canvas.winfo_width() / 2, canvas.winfo_height() / 2
+    mundo_x, mundo_y = canvas.canvasx(x_ancora) / zoom_atual, canvas.canvasy(y_ancora) / zoom_atual
+    zoom_atual = novo_zoom
+    _deslocar_vista(mundo_x * novo_zoom - x_ancora - canvas.canvasx(0), mundo_y * novo_zoom - y_ancora - canvas.canvasy(0))
+    redesenhar_vista()
+    status_acao.config(text=f"Zoom: {zoom_atual:.0%}")
+
+def zoom_com_roda(event):
+    # Windows/macOS mandam <MouseWheel> com 'delta'; Linux manda <Button-4>/<Button-5>
+    aproximar = getattr(event, "delta", 0) > 0 or getattr(event, "num", None) == 4
+    definir_zoom(zoom_atual * (1.2 if aproximar else 1 / 1.2), event.x, event.y)
+
+def iniciar_deslocamento(event):
+    """Botão do meio: cancela a transição em andamento e começa a arrastar a vista."""
+    cancelar_criacao_transicao(event)
+    canvas.scan_mark(event.x, event.y)
+
+def deslocar_com_mouse(event):
+    canvas.scan_dragto(event.x, event.y, gain=1)
+    agendar_atualizacao_vista()
+
+def enquadrar_automato():
+    """Ajusta zoom e deslocamento para mostrar todos os estados."""
+    if not estados: return
+    margem = 60
+    x1 = min(e.x for e in estados.values()) - margem
+    y1 = min(e.y for e in estados.values()) - margem
+    x2 = max(e.x for e in estados.values()) + margem
+    y2 = max(e.y for e in estados.values()) + margem
+    largura, altura = max(canvas.winfo_width(), 1), max(canvas.winfo_height(), 1)
+    global zoom_atual
+    zoom_atual = min(ZOOM_MAXIMO, max(ZOOM_MINIMO, min(largura / (x2 - x1), altura / (y2 - y1))))
+    _deslocar_vista(x1 * zoom_atual - canvas.canvasx(0), y1 * zoom_atual - canvas.canvasy(0))
+    redesenhar_vista()
+    status_acao.config(text=f"Zoom: {zoom_atual:.0%}")
+
+
+# --- Funções de Interação e UI ---
+def iniciar_movimento(event):
+    global ponto_inicial_arraste, caixa_selecao, comando_em_andamento
+    
+    # Prioridade 1: Apagar
+    if modo_atual == "apagar":
+        gerenciar_clique_apagar(event)
+        return
+
+    # Prioridade 2: Editar transição
+    transicao_clicada = encontrar_transicao_clicada(event)
+    if transicao_clicada:
+        editar_rotulo_transicao(transicao_clicada)
+        return
+
+    # --- LÓGICA CORRIGIDA ---
+    # Agora, a lógica de cada modo é totalmente independente
+
+    if modo_atual == "arrastar":
+        # Só define o ponto inicial se estivermos neste modo
+        ponto_inicial_arraste = (event.x, event.y)
+        objeto_arrastado["x_prev"], objeto_arrastado["y_prev"] = event.x, event.y
+        estado_clicado = encontrar_estado_clicado(event)
+        if estado_clicado and math.dist((event.x, event.y), (estado_clicado.x, estado_clicado.y)) <= estado_clicado.raio:
+            objeto_arrastado["id"] = estado_clicado
+        else:
+            objeto_arrastado["id"] = None
+            
+    elif modo_atual == "selecao":
+        # Só define o ponto inicial se estivermos neste modo
+        ponto_inicial_arraste = (event.x, event.y)
+        objeto_arrastado["x_prev"], objeto_arrastado["y_prev"] = event.x, event.y
+        estado_clicado = encontrar_estado_clicado(event)
+        if estado_clicado and estado_clicado in itens_selecionados:
+            objeto_arrastado["id"] = "grupo"
+        else:
+            limpar_selecao()
+            caixa_selecao = canvas.create_rectangle(event.x_tela, event.y_tela, event.x_tela, event.y_tela, outline="blue", dash=(3, 5))
+    
+    elif modo_atual == "transicao":
+        # Este modo NÃO define o ponto_inicial_arraste, pois é um clique, não um arraste.
+        gerenciar_clique_transicao(event)
+
+def arrastar_objeto(event):
+    global comando_em_andamento
+    if ponto_inicial_arraste is None: return
+
+    # Se um comando de movimento já foi iniciado (pela lógica de Desfazer/Refazer)
+    if isinstance(comando_em_andamento, ComandoMover):
+        dx_total = event.x - ponto_inicial_arraste[0]
+        dy_total = event.y - ponto_inicial_arraste[1]
+        
+        # Para o 'desfazer' funcionar corretamente, precisamos mover a partir da posição original
+        # Desfazemos o último movimento antes de aplicar o novo movimento total
+        comando_em_andamento.desfazer() 
+        comando_em_andamento.dx, comando_em_andamento.dy = dx_total, dy_total
+        comando_em_andamento.executar()
+        return
+
+    # Lógica de arraste visual (antes de criar o comando): só guarda a posição do mouse,
+    # o movimento é aplicado no próximo quadro (no máximo FPS_ARRASTE por segundo)
+    if estados_em_arraste():
+        objeto_arrastado["x_alvo"], objeto_arrastado["y_alvo"] = event.x, event.y
+        agendar_quadro_arraste()
+    elif modo_atual == "selecao" and caixa_selecao:
+        canvas.coords(caixa_selecao, *na_tela(*ponto_inicial_arraste), event.x_tela, event.y_tela)
+
+def estados_em_arraste():
+    """Estados que o arraste atual está movendo (vazio se não há arraste de estados)."""
+    if modo_atual == "arrastar" and isinstance(objeto_arrastado.get("id"), Estado):
+        return {objeto_arrastado["id"]}
+    if modo_atual == "selecao" and objeto_arrastado.get("id") == "grupo":
+        return itens_selecionados
+    return set()
+
+def agendar_quadro_arraste():
+    """Agenda um único quadro pendente; eventos de movimento até lá só atualizam o alvo."""
+    global quadro_arraste_agendado
+    if quadro_arraste_agendado is not None: return
+    espera_ms = 1000 / FPS_ARRASTE - (time.perf_counter() - instante_ultimo_quadro) * 1000
+    if espera_ms <= 0:
+        quadro_arraste_agendado = canvas.after_idle(aplicar_quadro_arraste)
+    else:
+        quadro_arraste_agendado = canvas.after(int(espera_ms) + 1, aplicar_quadro_arraste)
+
+def aplicar_quadro_arraste():
+    """Move os estados arrastados até a última posição do mouse e redesenha cada transição afetada uma vez."""
+    global quadro_arraste_agendado, instante_ultimo_quadro
+    quadro_arraste_agendado = None
+    instante_ultimo_quadro = time.perf_counter()
+    if "x_alvo" not in objeto_arrastado: return
+    dx = objeto_arrastado["x_alvo"] - objeto_arrastado["x_prev"]
+    dy = objeto_arrastado["y_alvo"] - objeto_arrastado["y_prev"]
+    if dx == 0 and dy == 0: return
+    movidos = estados_em_arraste()
+    for estado in movidos:
+        estado.mover(dx, dy)
+    atualizar_transicoes_dos_estados(movidos)
+    objeto_arrastado["x_prev"], objeto_arrastado["y_prev"] = objeto_arrastado["x_alvo"], objeto_arrastado["y_alvo"]
+
+def cancelar_quadro_arraste():
+    global quadro_arraste_agendado
+    if quadro_arraste_agendado is not None:
+        canvas.after_cancel(quadro_arraste_agendado)
+        quadro_arraste_agendado = None
+
+
+def finalizar_arraste(event):
+    global caixa_selecao, ponto_inicial_arraste
+    
+    if ponto_inicial_arraste is None:
+        return
+    cancelar_quadro_arraste()
+
+    dx = event.x - ponto_inicial_arraste[0]
+    dy = event.y - ponto_inicial_arraste[1]
+    itens_movidos = estados_em_arraste()
+
+    # Devolve os estados ao ponto de partida: quem aplica o deslocamento final é o ComandoMover
+    # (as transições são redesenhadas por ele, uma vez só)
+    dx_visual = objeto_arrastado.get("x_prev", ponto_inicial_arraste[0]) - ponto_inicial_arraste[0]
+    dy_visual = objeto_arrastado.get("y_prev", ponto_inicial_arraste[1]) - ponto_inicial_arraste[1]
+    if dx_visual or dy_visual:
+        for estado in itens_movidos:
+            estado.mover(-dx_visual, -dy_visual)
+        if abs(dx) <= 3 and abs(dy) <= 3:
+            atualizar_transicoes_dos_estados(itens_movidos)
+
+    # Se o movimento foi significativo, cria um ComandoMover
+    if (abs(dx) > 3 or abs(dy) > 3):
+        if itens_movidos:
+            comando = ComandoMover(itens_movidos, dx, dy)
+            executar_comando(comando)
+            status_acao.config(text=f"{len(itens_movidos)} item(ns) movido(s).")
+    
+    # Se NÃO houve arraste (foi um clique simples) no modo arrastar
+    elif modo_atual == "arrastar" and objeto_arrastado.get("id") is None:
+         comando = ComandoCriarEstado(event.x, event.y)
+         executar_comando(comando)
+         status_acao.config(text=f"Estado {comando.estado_criado.nome} criado.")
+
+    # Finaliza o DESENHO da caixa de seleção
+    if modo_atual == "selecao" and caixa_selecao:
+        coords_caixa = canvas.coords(caixa_selecao)
+        ids_na_caixa = canvas.find_enclosed(*coords_caixa)
+        for item_id in ids_na_caixa:
+            estado = objeto_do_item(item_id)
+            # Só conta o círculo: o estado está na caixa quando o círculo inteiro está
+            if isinstance(estado, Estado) and item_id == estado.id_circulo and estado not in itens_selecionados:
+                estado.selecionar()
+                itens_selecionados.add(estado)
+        canvas.delete(caixa_selecao)
+        caixa_selecao = None
+
+    # Limpeza final
+    objeto_arrastado.clear()
+    ponto_inicial_arraste = None
+
+def gerenciar_clique_arrastar(event):
+    """
+    Gerencia o clique no modo arrastar. Se o clique for em um estado,
+    prepara para arrastar. Se for no fundo, usa o sistema de COMANDOS
+    para criar um novo estado (permitindo o Undo/Redo).
+    """
+    estado_clicado = encontrar_estado_clicado(event)
+    
+    # Se o clique foi dentro de um estado existente, prepara para arrastar
+    if estado_clicado:
+        dist = math.dist((event.x, event.y), (estado_clicado.x, estado_clicado.y))
+        if dist <= estado_clicado.raio:
+            objeto_arrastado["id"] = estado_clicado
+            objeto_arrastado["x_inicial"], objeto_arrastado["y_inicial"] = event.x, event.y
+            return # Ação de arrastar definida, termina a função aqui
+
+    # Se a função chegou até aqui, significa que o clique foi no fundo do canvas.
+    # Em vez de chamar a função antiga, usamos o novo sistema de Comandos:
+    
+    # 1. Cria a "ordem de serviço" para criar um estado
+    comando = ComandoCriarEstado(event.x, event.y)
+    
+    # 2. Executa o comando e o adiciona ao histórico
+    executar_comando(comando)
+    
+    # 3. Atualiza o status para o usuário
+    status_acao.config(text=f"Estado {comando.estado_criado.nome} criado.")
+
+def gerenciar_clique_transicao(event):
+    global transicao_info
+    estado_clicado = encontrar_estado_clicado(event)
+
+    if not estado_clicado:
+        cancelar_criacao_transicao(event) # Reutiliza a função de cancelar
+        return
+
+    if transicao_info["origem"] is None:
+        transicao_info["origem"] = estado_clicado
+        estado_clicado.configurar_circulo(fill="yellow")
+        status_acao.config(text=f"Origem: {estado_clicado.nome}. Clique no destino ou botão do meio para cancelar.")
+    else:
+        estado_origem = transicao_info["origem"]
+        estado_destino = estado_clicado
+
+        comando = ComandoCriarTransicao(estado_origem, estado_destino)
+        executar_comando(comando)
+        
+        # Limpa e reseta a UI
+        estado_origem.configurar_circulo(fill="lightblue")
+        transicao_info["origem"] = None
+        status_acao.config(text="Transição criada! Clique nela para editar.")
+
+def editar_rotulo_transicao(transicao_alvo):
+    if not transicao_alvo: return
+
+    # Em vez de ter a lógica aqui, criamos e executamos o comando
+    comando = ComandoEditarTransicao(transicao_alvo)
+    executar_comando(comando)
+
+def gerenciar_clique_apagar(event):
+    """
+    Gerencia cliques no modo apagar. Usa o sistema de Comandos para
+    ações que podem ser desfeitas.
+    """
+    # Encontra o item clicado, seja estado ou transição
+    estado_clicado = encontrar_estado_clicado(event)
+    
+    # --- LÓGICA PARA APAGAR ESTADO ---
+    if estado_clicado:
+        # Se o estado faz parte de uma seleção, o comando é para o grupo
+        if estado_clicado in itens_selecionados:
+            comando = ComandoApagar(itens_selecionados)
+        else: # Senão, é só para o estado clicado
+            comando = ComandoApagar({estado_clicado})
+        
+        executar_comando(comando)
+        status_acao.config(text="Item(ns) apagado(s).")
+        return
+
+    # --- LÓGICA PARA APAGAR TRANSIÇÃO (PREENCHIDA) ---
+    transicao_para_apagar = encontrar_transicao_clicada(event)
+    if transicao_para_apagar: # Se encontrou, cria e executa o comando
+        comando = ComandoApagar({transicao_para_apagar})
+        executar_comando(comando)
+        status_acao.config(text="Transição apagada.")
+
+def toggle_aceitacao_event(event):
+    # Se estamos no meio da criação de uma transição, ignora o clique duplo
+    # Impede a ação se estivermos no modo Mealy
+    if tipo_automato_atual == "Mealy":
+        return
+    
+    estado_clicado = encontrar_estado_clicado(event)
+    if estado_clicado:
+        estado_clicado.toggle_aceitacao()
+
+def atualizar_transicoes_conectadas(estado_movido):
+    for transicao in transicoes_conectadas(estado_movido):
+        transicao.atualizar_posicao()
+
+def atualizar_transicoes_dos_estados(estados_movidos):
+    """Redesenha uma única vez cada transição ligada a algum dos estados (mesmo se as duas pontas se moveram)."""
+    afetadas = {}
+    for estado in estados_movidos:
+        afetadas.update(estado.transicoes_saida)
+        afetadas.update(estado.transicoes_entrada)
+    for transicao in afetadas:
+        transicao.atualizar_posicao()
+
+def mostrar_menu_contexto(event):
+    estado_clicado = encontrar_estado_clicado(event)
+    if not estado_clicado: return
+
+    menu_contexto = tk.Menu(janela, tearoff=0)
+    acao_em_grupo = estado_clicado in itens_selecionados and len(itens_selecionados) > 1
+
+    if acao_em_grupo:
+        # --- MENU PARA AÇÕES EM GRUPO ---
+        if tipo_automato_atual not in ["Mealy", "Moore"]:
+            menu_contexto.add_command(label=f"Marcar/Desmarcar Aceitação ({len(itens_selecionados)} itens)", command=lambda: executar_comando(ComandoToggleAceitacao(itens_selecionados)))
+        menu_contexto.add_command(label="Renomear Estados...", state="disabled")
+        menu_contexto.add_command(label=f"Alterar Cor ({len(itens_selecionados)} itens)...", command=lambda: executar_comando(ComandoAlterarCor(itens_selecionados)))
+        menu_contexto.add_separator()
+        menu_contexto.add_command(label=f"Apagar {len(itens_selecionados)} Estados Selecionados", command=apagar_selecao)
+    else:
+        # --- MENU PARA AÇÃO INDIVIDUAL ---
+        if tipo_automato_atual not in ["Mealy", "Moore"]:
+            menu_contexto.add_command(label="Marcar/Desmarcar como Aceitação", command=lambda: executar_comando(ComandoToggleAceitacao({estado_clicado})))
+        if tipo_automato_atual == "Moore":
+            menu_contexto.add_command(label="Definir Saída do Estado...", command=lambda: definir_saida_estado(estado_clicado))
+        
+        menu_contexto.add_command(label="Renomear Estado...", command=lambda: executar_comando(ComandoRenomearEstado(estado_clicado)))
+        menu_contexto.add_command(label="Alterar Cor...", command=lambda: executar_comando(ComandoAlterarCor({estado_clicado})))
+        menu_contexto.add_separator()
+        menu_contexto.add_command(label="Apagar Estado", command=lambda: apagar_estado(estado_clicado))
+
+    menu_contexto.post(event.x_root, event.y_root)
+
+def atualizar_status_modo():
+    """Atualiza o texto do painel de status da esquerda com o modo e tipo atuais."""
+    # Capitalize() deixa a primeira letra maiúscula (ex: 'arrastar' -> 'Arrastar')
+    texto_modo = modo_atual.capitalize().replace("Arrastar", "Criar/Arrastar")
+    status_modo.config(text=f"Tipo: {tipo_automato_atual}  |  Modo: {texto_modo}")
+
+def atualizar_display_pilha():
+    """Atualiza a label na UI para mostrar o conteúdo atual da pilha."""
+    # Mostra o topo da pilha à esquerda
+    conteudo_formatado = "[" + " | ".join(reversed(pilha_simulacao)) + "]"
+    label_pilha.config(text=conteudo_formatado)
+
+def apagar_estado(estado_para_apagar):
+    """
+    Função dedicada para apagar um estado e suas transições,
+    com diálogo de confirmação.
+    """
+    if not estado_para_apagar: return
+
+    confirmar = messagebox.askyesno(
+        "Apagar Estado",
+        f"Tem certeza que deseja apagar o estado '{estado_para_apagar.nome}'?\n"
+        f"Todas as transições conectadas a ele também serão apagadas."
+    )
+
+    if confirmar:
+        # O ComandoApagar apaga o estado e as transições conectadas (e permite desfazer)
+        executar_comando(ComandoApagar({estado_para_apagar}))
+        status_acao.config(text=f"Estado {estado_para_apagar.nome} apagado.")
+    else:
+        status_acao.config(text="Ação de apagar cancelada.")
+
+def cancelar_criacao_transicao(event):
+    """
+    Cancela a criação de uma transição que está em andamento.
+    Chamada pelo clique do botão do meio do mouse.
+    """
+    global transicao_info
+    # Verifica se há um estado de origem já selecionado
+    if transicao_info["origem"]:
+        # Restaura a cor original do estado de origem
+        transicao_info["origem"].configurar_circulo(fill="lightblue")
+        
+        # Limpa a variável de controle, efetivamente cancelando a ação
+        transicao_info["origem"] = None
+        
+        # Atualiza a interface para informar o usuário
+        status_acao.config(text="Criação de transição cancelada.")
+        print("Criação de transição cancelada.")
+
+def gerenciar_atalhos_teclado(event):
+    """Gerencia os atalhos de teclado para ações rápidas."""
+    # event.keysym nos dá o nome da tecla que foi pressionada
+    if event.keysym == "F1":
+        ativar_modo_arrastar()
+    elif event.keysym == "F2":
+        ativar_modo_transicao()
+    elif event.keysym == "F3":
+        ativar_modo_selecao()
+    elif event.keysym == "F4":
+        ativar_modo_apagar()
+    elif event.keysym == "Delete" and itens_selecionados:
+        apagar_selecao()
+
+def gerenciar_clique_duplo(event):
+    """
+    Gerencia o evento de clique duplo, usando o sistema de Comandos.
+    """
+    if modo_atual == "transicao":
+        estado_clicado = encontrar_estado_clicado(event)
+        if estado_clicado:
+            # --- MUDANÇA AQUI ---
+            # Em vez de criar diretamente, usamos o sistema de Comandos
+            comando = ComandoCriarTransicao(estado_clicado, estado_clicado)
+            executar_comando(comando)
+            
+            if transicao_info["origem"]:
+                transicao_info["origem"].configurar_circulo(fill="lightblue")
+                transicao_info["origem"] = None
+            status_acao.config(text=f"Laço criado para o estado {estado_clicado.nome}.")
+            
+    else: # Para qualquer outro modo
+        # A ação de toggle também já usa o sistema de Comandos, então está correto
+        estado_clicado = encontrar_estado_clicado(event)
+        if estado_clicado:
+            comando = ComandoToggleAceitacao({estado_clicado})
+            executar_comando(comando)
+
+def contar_no_historico(comando):
+    """Soma o custo do comando a memoria_historico (guardado nele para ser descontado depois)."""
+    global memoria_historico
+    comando.custo_registrado = comando.custo_memoria()
+    memoria_historico += comando.custo_registrado
+
+def descontar_do_historico(comando):
+    global memoria_historico
+    memoria_historico -= getattr(comando, "custo_registrado", 0)
+    comando.custo_registrado = 0
+
+def executar_comando(comando, vindo_do_refazer=False):
+    if vindo_do_refazer: descontar_do_historico(comando) # Saiu do Refazer; volta a contar ao entrar no Desfazer
+    if comando.executar():
+        if comando.altera_automato:
+            invalidar_cache_simulacao(preservar_fecho_epsilon=not comando.toca_epsilon())
+        agora = time.monotonic()
+        anterior = historico_acoes[-1] if historico_acoes else None
+        if (not vindo_do_refazer and anterior is not None
+                and agora - getattr(anterior, "instante", 0) <= config_historico["janela_mesclagem_s"]
+                and anterior.mesclar(comando)):
+            anterior.instante = agora # Mesclado: o histórico não cresce
+            descontar_do_historico(anterior)
+            contar_no_historico(anterior)
+        else:
+            comando.instante = agora
+            historico_acoes.append(comando)
+            contar_no_historico(comando)
+        if not vindo_do_refazer:
+            for descartado in historico_refazer: descontar_do_historico(descartado)
+            historico_refazer.clear()
+        aparar_historico()
+
+def aparar_historico():
+    """Descarta as entradas mais antigas até respeitar os limites de quantidade e de memória."""
+    limite_bytes = config_historico["max_memoria_mb"] * 1024 * 1024
+    total = len(historico_acoes) + len(historico_refazer)
+    while total > config_historico["max_acoes"] or (memoria_historico > limite_bytes and total > 1):
+        # Primeiro o Desfazer mais antigo; depois o Refazer mais distante
+        pilha = historico_acoes if historico_acoes else historico_refazer
+        descontar_do_historico(pilha.popleft())
+        total -= 1
+
+def configurar_historico():
+    """Pergunta os limites do histórico de Desfazer/Refazer."""
+    max_acoes = simpledialog.askinteger("Histórico", "Máximo de ações guardadas:",
+                                        initialvalue=config_historico["max_acoes"], minvalue=1)
+    if max_acoes is None: return
+    max_memoria_mb = simpledialog.askinteger("Histórico", "Memória máxima aproximada (MB):",
+                                             initialvalue=config_historico["max_memoria_mb"], minvalue=1)
+    if max_memoria_mb is None: return
+    config_historico["max_acoes"] = max_acoes
+    config_historico["max_memoria_mb"] = max_memoria_mb
+    aparar_historico()
+    status_acao.config(text=f"Histórico: até {max_acoes} ações / {max_memoria_mb} MB.")
+
+def desfazer_acao(event=None):
+    if not historico_acoes:
+        status_acao.config(text="Nada para desfazer.")
+        return
+    
+    comando = historico_acoes.pop()
+    comando.desfazer()
+    if comando.altera_automato:
+        invalidar_cache_simulacao(preservar_fecho_epsilon=not comando.toca_epsilon())
+    historico_refazer.append(comando)
+    # Cada comando apaga/recria só os itens que são seus (Estado/Transicao guardam os próprios IDs),
+    # então não sobra item órfão para varrer no canvas
+    status_acao.config(text="Ação desfeita.")
+
+
+def refazer_acao(event=None):
+    if not historico_refazer:
+        status_acao.config(text="Nada para refazer.")
+        return
+
+    comando = historico_refazer.pop()
+    # Avisa ao executor que esta ação está vindo do refazer
+    executar_comando(comando, vindo_do_refazer=True) 
+    status_acao.config(text="Ação refeita.")
+
+
+
+# --- Funções de Modo e Tipo ---
+def ativar_modo_arrastar():
+    global modo_atual
+    limpar_selecao() # Limpa a seleção ao entrar neste modo
+    modo_atual = "arrastar"
+    atualizar_status_modo()
+    print("Modo alterado para: arrastar")
+
+def ativar_modo_transicao():
+    global modo_atual
+    limpar_selecao() # Limpa a seleção ao entrar neste modo
+    modo_atual = "transicao"
+    atualizar_status_modo()
+    print("Modo alterado para: transicao")
+
+def ativar_modo_apagar():
+    global modo_atual
+    limpar_selecao() # Limpa a seleção ao entrar neste modo
+    modo_atual = "apagar"
+    atualizar_status_modo()
+    print("Modo alterado para: apagar")
+
+def ativar_modo_selecao():
+    global modo_atual
+    modo_atual = "selecao"
+    atualizar_status_modo() # Atualiza o painel de status
+    print("Modo alterado para: selecao")
+def limpar_selecao():
+    """
+    Desseleciona todos os itens visualmente e limpa o conjunto de
+    itens selecionados na memória.
+    """
+    if itens_selecionados:
+        for item in itens_selecionados:
+            item.desselecionar()
+        itens_selecionados.clear()
+        print("Seleção limpa.")
+def apagar_selecao():
+    """
+    Verifica se há itens selecionados e, após confirmação, apaga todos
+    os estados selecionados e suas transições conectadas.
+    """
+    # Se não há nada selecionado, não faz nada
+    if not itens_selecionados:
+        return
+
+    # Pede confirmação ao usuário, informando quantos itens serão apagados
+    confirmar = messagebox.askyesno(
+        "Apagar Seleção",
+        f"Tem certeza que deseja apagar os {len(itens_selecionados)} estados selecionados?\n"
+        "Todas as transições conectadas a eles também serão apagadas."
+    )
+
+    if confirmar:
+        estados_para_apagar = set(itens_selecionados)
+        # O ComandoApagar cuida das transições conectadas e limpa a seleção
+        executar_comando(ComandoApagar(estados_para_apagar))
+        status_acao.config(text=f"{len(estados_para_apagar)} estados foram apagados.")
+def atalho_apagar_selecao(event):
+    """Função adaptadora para o atalho da tecla Delete."""
+    apagar_selecao()
+
+def definir_tipo_automato(novo_tipo):
+    global tipo_automato_atual
+    confirmar = messagebox.askyesno(
+        "Mudar Tipo de Autômato",
+        f"Você tem certeza que deseja mudar para {novo_tipo}?\n"
+        "Todo o trabalho não salvo no autômato atual será perdido."
+    )
+    if confirmar:
+        novo_automato()
+        tipo_automato_atual = novo_tipo
+        atualizar_status_modo() # <-- USA A NOVA FUNÇÃO
+        status_acao.config(text=f"Tipo alterado para {novo_tipo}.") # Mensagem de ação
+        print(f"Tipo de autômato definido para: {tipo_automato_atual}")
+
+def definir_saida_estado(estado):
+    """Abre uma caixa de diálogo para definir o símbolo de saída de um estado (Moore)."""
+    nova_saida = simpledialog.askstring(
+        "Definir Saída de Estado (Moore)",
+        f"Digite o símbolo de saída para o estado '{estado.nome}':",
+        initialvalue=estado.simbolo_saida
+    )
+    if nova_saida is not None: # Permite definir uma saída vazia
+        # Como Comando: dá para desfazer, e as tabelas compiladas (transdutor de Moore) são descartadas
+        executar_comando(ComandoDefinirSaidaEstado(estado, nova_saida))
+
+
+
+# --- Funções de Animação e Simulação ---
+def animar_token(token_id, origem, destino, callback_ao_finalizar, passo_atual=0, total_passos=30):
+    x_o, y_o = na_tela(origem.x, origem.y)
+    x_d, y_d = na_tela(destino.x, destino.y)
+    deslocamento_x, deslocamento_y = x_d - x_o, y_d - y_o
+    pos_x = x_o + (deslocamento_x * passo_atual) / total_passos
+    pos_y = y_o + (deslocamento_y * passo_atual) / total_passos
+    raio_token = 5
+    canvas.coords(token_id, pos_x - raio_token, pos_y - raio_token, pos_x + raio_token, pos_y + raio_token)
+    if passo_atual < total_passos:
+        canvas.after(20, animar_token, token_id, origem, destino, callback_ao_finalizar, passo_atual + 1, total_passos)
+    else:
+        canvas.delete(token_id)
+        if callback_ao_finalizar:
+            callback_ao_finalizar()
+
+def tabelas_atuais():
+    """Tabelas compiladas do autômato do editor; ficam em cache_simulacao até a próxima edição."""
+    return TabelasSimulacao(estados.values(), transicoes, cache_simulacao, limite_cache_determinizacao)
+
+def obter_fechos_epsilon():
+    """Retorna a tabela de fechos-ε do autômato atual, compilando-a se necessário."""
+    return tabelas_atuais().fechos_epsilon()
+
+def calcular_fecho_epsilon(estados_origem):
+    """O fecho de um conjunto é a união dos fechos (em cache) de cada estado."""
+    return fecho_de_conjunto(obter_fechos_epsilon(), estados_origem)
+
+def validar_automato_como_AFD():
+    for estado in estados.values():
+        simbolos_vistos = set()
+        for t in estado.transicoes_saida:
+            if "ε" in t.simbolos_entrada:
+                return (False, f"O estado '{estado.nome}' possui uma transição épsilon (ε).")
+            interseccao = simbolos_vistos.intersection(t.simbolos_entrada)
+            if interseccao:
+                return (False, f"Não-determinismo no estado '{estado.nome}' para o símbolo '{list(interseccao)[0]}'.")
+            simbolos_vistos.update(t.simbolos_entrada)
+    return (True, "")
+
+# --- Motor Compilado (tabela de transições) ---
+def invalidar_cache_simulacao(preservar_fecho_epsilon=False):
+    """
+    Descarta as tabelas compiladas. Elas são reconstruídas na próxima simulação.
+    Os fechos-ε podem ser mantidos quando a alteração não mexe em transições ε nem remove estados.
+    """
+    fechos = cache_simulacao.get("fechos_epsilon")
+    cache_simulacao.clear()
+    if preservar_fecho_epsilon and fechos is not None:
+        cache_simulacao["fechos_epsilon"] = fechos
+
+def obter_tabela_transicoes():
+    """Retorna a tabela do autômato atual, compilando-a apenas se o cache estiver vazio."""
+    return tabelas_atuais().tabela_transicoes()
+
+def obter_indice_AFN():
+    """Retorna o índice não determinístico do autômato atual, compilando-o se necessário."""
+    return tabelas_atuais().indice_AFN()
+
+def construir_AFD_por_subconjuntos(lista_estados, lista_transicoes, estado_inicial):
+    """
+    Construção dos subconjuntos (powerset) a partir do fecho-ε do estado inicial.
+    Usa uma lista de trabalho e um dicionário de frozensets, então só cria os
+    subconjuntos alcançáveis. Não cria estado de erro: o AFD resultante é parcial.
+    Retorna (subconjuntos, arestas), com arestas como (indice_origem, simbolo, indice_destino).
+    """
+    fechos = compilar_fechos_epsilon(lista_estados, lista_transicoes)
+    indice = compilar_indice_AFN(lista_transicoes)
+    alfabeto = sorted({s for t in lista_transicoes for s in t.simbolos_entrada if s != "ε"})
+
+    inicial = fechos[estado_inicial]
+    numero = {inicial: 0}
+    subconjuntos = [inicial]
+    arestas = []
+    i = 0
+    while i < len(subconjuntos): # A própria lista serve de fila (ordem de largura)
+        atual = subconjuntos[i]
+        for simbolo in alfabeto:
+            destino = set()
+            for estado in atual:
+                for t in indice.get(estado, {}).get(simbolo, ()):
+                    destino |= fechos[t.destino]
+            if not destino: continue
+            destino = frozenset(destino)
+            j = numero.get(destino)
+            if j is None:
+                j = numero[destino] = len(subconjuntos)
+                subconjuntos.append(destino)
+            arestas.append((i, simbolo, j))
+        i += 1
+    return subconjuntos, arestas
+
+def calcular_layout_em_camadas(quantidade, arestas, x0=100, y0=80, passo_x=160, passo_y=110):
+    """Posiciona os estados 0..quantidade-1 em colunas pela distância (em largura) ao estado 0."""
+    vizinhos = {}
+    for origem, _, destino in arestas:
+        vizinhos.setdefault(origem, []).append(destino)
+    camada = {0: 0} if quantidade else {}
+    fila = [0] if quantidade else []
+    for atual in fila:
+        for proximo in vizinhos.get(atual, ()):
+            if proximo not in camada:
+                camada[proximo] = camada[atual] + 1
+                fila.append(proximo)
+    ocupacao = {}
+    posicoes = []
+    for i in range(quantidade):
+        c = camada.get(i, max(camada.values(), default=0) + 1) # Inalcançáveis vão para o fim
+        linha = ocupacao.get(c, 0)
+        ocupacao[c] = linha + 1
+        posicoes.append((x0 + c * passo_x, y0 + linha * passo_y))
+    return posicoes
+
+def agrupar_arestas(arestas, nomes):
+    """Junta arestas com a mesma origem e destino numa só transição com vários símbolos (formato .json)."""
+    agrupadas = {}
+    for origem, simbolo, destino in arestas:
+        agrupadas.setdefault((origem, destino), []).append(simbolo)
+    return [{"origem": nomes[o], "destino": nomes[d], "simbolos_entrada": simbolos}
+            for (o, d), simbolos in agrupadas.items()]
+
+def converter_para_AFD():
+    """Ferramenta 'Converter para AFD': substitui o AFN/AFNe atual pelo AFD equivalente (pode ser desfeito)."""
+    if tipo_automato_atual not in ["AFN", "AFNe", "AFD"]:
+        messagebox.showwarning("Converter para AFD", "A conversão só se aplica a AFN/AFNe.")
+        return
+    estado_inicial = next((est for est in estados.values() if est.inicial), None)
+    if not estado_inicial:
+        messagebox.showwarning("Converter para AFD", "O autômato não possui estado inicial.")
+        return
+
+    inicio = time.perf_counter()
+    subconjuntos, arestas = construir_AFD_por_subconjuntos(list(estados.values()), transicoes, estado_inicial)
+    tempo_construcao = time.perf_counter() - inicio
+
+    nomes = [f"q{i}" for i in range(len(subconjuntos))]
+    posicoes = calcular_layout_em_camadas(len(subconjuntos), arestas)
+    dados_estados = [{"nome": nomes[i], "x": posicoes[i][0], "y": posicoes[i][1], "inicial": i == 0,
+                      "aceitacao": any(e.aceitacao for e in sub)} for i, sub in enumerate(subconjuntos)]
+    executar_comando(ComandoSubstituirAutomato(dados_estados, agrupar_arestas(arestas, nomes), "AFD", "Converter para AFD"))
+    tempo_total = time.perf_counter() - inicio
+
+    print("Correspondência dos estados do AFD:")
+    for nome, sub in zip(nomes, subconjuntos):
+        print(f"  {nome} = {{{', '.join(sorted(e.nome for e in sub))}}}")
+    valido, _ = validar_automato_como_AFD()
+    relatorio = (f"{len(subconjuntos)} subconjuntos criados, {len(arestas)} transições.\n"
+                 f"Construção: {tempo_construcao * 1000:.1f} ms | com desenho: {tempo_total * 1000:.1f} ms\n"
+                 f"Validação como AFD: {'ok' if valido else 'falhou'}")
+    status_acao.config(text=f"Convertido para AFD: {len(subconjuntos)} subconjuntos em {tempo_construcao * 1000:.1f} ms")
+    messagebox.showinfo("Converter para AFD", relatorio)
+
+def minimizar_AFD_hopcroft(lista_transicoes, estado_inicial):
+    """
+    Minimização de AFD pelo refinamento de partições de Hopcroft, O(n·|Σ|·log n).
+    Considera só os estados alcançáveis, mas o alfabeto vem de todas as transições (como na
+    construção dos subconjuntos). O AFD é completado sobre esse alfabeto com um estado de erro
+    explícito; o bloco que o contém (junto com os estados "mortos" equivalentes a ele) é descartado
+    no resultado, que continua parcial.
+    Retorna (blocos, arestas): blocos é uma lista de listas de Estado (bloco 0 contém o inicial)
+    e arestas é uma lista de (indice_bloco_origem, simbolo, indice_bloco_destino).
+    """
+    tabela = compilar_tabela_transicoes(lista_transicoes)
+
+    # 1. Estados alcançáveis, numerados em ordem de largura a partir do inicial
+    alcancaveis = [estado_inicial]
+    numero = {estado_inicial: 0}
+    for estado in alcancaveis:
+        for t in tabela.get(estado, {}).values():
+            if t.destino not in numero:
+                numero[t.destino] = len(alcancaveis)
+                alcancaveis.append(t.destino)
+    n = len(alcancaveis)
+    alfabeto = sorted({s for t in lista_transicoes for s in t.simbolos_entrada if s != "ε"})
+
+    # 2. Função de transição total sobre o alfabeto, com o estado de erro 'n' (sempre presente, para
+    #    que um estado "morto" do próprio AFD caia no mesmo bloco que ele e também seja descartado)
+    delta = [[n] * len(alfabeto) for _ in range(n + 1)]
+    for i, estado in enumerate(alcancaveis):
+        linha = tabela.get(estado, {})
+        for a, simbolo in enumerate(alfabeto):
+            t = linha.get(simbolo)
+            if t is not None: delta[i][a] = numero[t.destino]
+    total = n + 1
+
+    inversa = [{} for _ in alfabeto] # inversa[a][destino] = [origens]
+    for i in range(total):
+        for a in range(len(alfabeto)):
+            inversa[a].setdefault(delta[i][a], []).append(i)
+
+    # 3. Refinamento: parte de {aceitação, demais} e divide pelos "splitters" da fila
+    aceitacao = {i for i in range(n) if alcancaveis[i].aceitacao}
+    demais = set(range(total)) - aceitacao
+    blocos = [b for b in (aceitacao, demais) if b]
+    bloco_de = [0] * total
+    for b, bloco in enumerate(blocos):
+        for q in bloco: bloco_de[q] = b
+    menor = min(range(len(blocos)), key=lambda b: len(blocos[b]))
+    fila = deque((menor, a) for a in range(len(alfabeto)))
+    na_fila = set(fila)
+    while fila:
+        splitter = fila.popleft()
+        na_fila.discard(splitter)
+        b, a = splitter
+        afetados = {}
+        for q in blocos[b]:
+            for p in inversa[a].get(q, ()):
+                afetados.setdefault(bloco_de[p], []).append(p)
+        for y, estados_y in afetados.items():
+            if len(estados_y) == len(blocos[y]): continue
+            novo = set(estados_y)
+            blocos[y] -= novo
+            z = len(blocos)
+            blocos.append(novo)
+            for q in novo: bloco_de[q] = z
+            for c in range(len(alfabeto)):
+                if (y, c) in na_fila:
+                    fila.append((z, c))
+                    na_fila.add((z, c))
+                else:
+                    escolhido = (y, c) if len(blocos[y]) <= len(blocos[z]) else (z, c)
+                    fila.append(escolhido)
+                    na_fila.add(escolhido)
+
+    # 4. Monta o resultado, começando pelo bloco do inicial e descartando o do estado de erro
+    bloco_erro = bloco_de[n]
+    ordem = {bloco_de[0]: 0}
+    for i in range(n):
+        if bloco_de[i] != bloco_erro and bloco_de[i] not in ordem:
+            ordem[bloco_de[i]] = len(ordem)
+    resultado_blocos = [[] for _ in ordem]
+    for i in range(n):
+        if bloco_de[i] in ordem:
+            resultado_blocos[ordem[bloco_de[i]]].append(alcancaveis[i])
+    arestas = []
+    for b, indice_bloco in ordem.items():
+        representante = min(blocos[b])
+        for a, simbolo in enumerate(alfabeto):
+            destino = bloco_de[delta[representante][a]]
+            if destino in ordem:
+                arestas.append((indice_bloco, simbolo, ordem[destino]))
+    return resultado_blocos, arestas
+
+def minimizar_AFD():
+    """Ferramenta 'Minimizar AFD': substitui o AFD atual pelo mínimo equivalente (pode ser desfeito)."""
+    if tipo_automato_atual not in ["AFD", "AFN", "AFNe"]:
+        messagebox.showwarning("Minimizar AFD", "A minimização só se aplica a autômatos finitos.")
+        return
+    valido, motivo = validar_automato_como_AFD()
+    if not valido:
+        messagebox.showwarning("Minimizar AFD", f"O autômato não é um AFD:\n{motivo}\n\nConverta-o para AFD antes de minimizar.")
+        return
+    estado_inicial = next((est for est in estados.values() if est.inicial), None)
+    if not estado_inicial:
+        messagebox.showwarning("Minimizar AFD", "O autômato não possui estado inicial.")
+        return
+
+    inicio = time.perf_counter()
+    blocos, arestas = minimizar_AFD_hopcroft(transicoes, estado_inicial)
+    tempo_minimizacao = time.perf_counter() - inicio
+
+    # Cada bloco herda o nome e a posição do seu primeiro estado (na ordem do autômato original)
+    ordem_original = {e: i for i, e in enumerate(estados.values())}
+    representantes = [min(bloco, key=ordem_original.get) for bloco in blocos]
+    nomes = [r.nome for r in representantes]
+    dados_estados = [{"nome": r.nome, "x": r.x, "y": r.y, "inicial": i == 0, "aceitacao": r.aceitacao}
+                     for i, r in enumerate(representantes)]
+    quantidade_antes = len(estados)
+    executar_comando(ComandoSubstituirAutomato(dados_estados, agrupar_arestas(arestas, nomes), tipo_automato_atual, "Minimizar AFD"))
+
+    status_acao.config(text=f"AFD minimizado: {quantidade_antes} -> {len(blocos)} estados em {tempo_minimizacao * 1000:.1f} ms")
+    messagebox.showinfo("Minimizar AFD", f"Estados: {quantidade_antes} -> {len(blocos)}\n"
+                                         f"Transições: {len(arestas)} (por símbolo)\n"
+                                         f"Tempo de minimização: {tempo_minimizacao * 1000:.1f} ms")
+
+def obter_cache_determinizacao():
+    """Retorna o cache de determinização do autômato atual; ele persiste entre simulações até uma edição."""
+    return tabelas_atuais().cache_determinizacao()
+
+def definir_limite_cache_determinizacao():
+    """Pergunta ao usuário o número máximo de conjuntos guardados pelo motor preguiçoso."""
+    global limite_cache_determinizacao
+    novo_limite = simpledialog.askinteger(
+        "Cache de Determinização",
+        "Número máximo de conjuntos de estados em cache:",
+        initialvalue=limite_cache_determinizacao, minvalue=1
+    )
+    if novo_limite:
+        limite_cache_determinizacao = novo_limite
+        cache = cache_simulacao.get("determinizacao")
+        if cache:
+            cache.limite = novo_limite
+            while len(cache.linhas) > novo_limite:
+                cache.linhas.popitem(last=False)
+                cache.descartes += 1
+        status_acao.config(text=f"Limite do cache de determinização: {novo_limite} conjuntos")
+
+def mostrar_estatisticas_cache():
+    cache = cache_simulacao.get("determinizacao")
+    texto = cache.estatisticas() if cache else "O cache de determinização está vazio."
+    messagebox.showinfo("Cache de Determinização", texto)
+
+def obter_motor_bitset():
+    """Retorna o motor bitset do autômato atual, compilando-o se necessário."""
+    return tabelas_atuais().motor_bitset()
+
+def calcular_passo_AFN(estados_atuais, simbolo):
+    """
+    Um passo de AFN/AFNe com o motor escolhido em 'motor_AFN', para a simulação animada.
+    Retorna (proximos_estados, transicoes_usadas, saida_passo); proximos_estados já vem fechado por ε.
+    """
+    indice = obter_indice_AFN()
+    transicoes_usadas = [t for estado in estados_atuais for t in indice.get(estado, {}).get(simbolo, ())]
+    saida_passo = "".join(t.simbolo_saida for t in transicoes_usadas)
+    if motor_AFN == "bitset":
+        motor = obter_motor_bitset()
+        proximos = motor.conjunto_de(motor.passo(motor.mascara_de(estados_atuais), simbolo))
+    elif motor_AFN == "preguicoso":
+        proximos = set(obter_cache_determinizacao().transicao(frozenset(estados_atuais), simbolo))
+    else:
+        proximos = passo_conjuntos(indice, obter_fechos_epsilon(), estados_atuais, simbolo)
+    return proximos, transicoes_usadas, saida_passo
+
+def definir_modo_aceitacao_AP(modo):
+    config_AP["modo_aceitacao"] = modo
+    status_acao.config(text=f"AP aceita por {'pilha vazia' if modo == 'pilha_vazia' else 'estado final'}.")
+
+def configurar_limites_AP():
+    """Pergunta ao usuário os limites da busca do AP e o símbolo inicial da pilha."""
+    profundidade = simpledialog.askinteger("Configurar AP", "Profundidade máxima da pilha:",
+                                           initialvalue=config_AP["max_profundidade_pilha"], minvalue=1)
+    if profundidade is None: return
+    passos = simpledialog.askinteger("Configurar AP", "Máximo de passos (configurações expandidas):",
+                                     initialvalue=config_AP["max_passos"], minvalue=1)
+    if passos is None: return
+    simbolo_inicial = simpledialog.askstring("Configurar AP", "Símbolo inicial da pilha (vazio para nenhum):",
+                                             initialvalue=config_AP["simbolo_inicial_pilha"])
+    if simbolo_inicial is None: return
+    config_AP["max_profundidade_pilha"] = profundidade
+    config_AP["max_passos"] = passos
+    config_AP["simbolo_inicial_pilha"] = simbolo_inicial.strip()
+    status_acao.config(text=f"AP: pilha até {profundidade}, até {passos} passos.")
+
+def definir_motor_AFN(nome):
+    """Escolhe o motor usado pelas simulações de AFN/AFNe (animada e em lote)."""
+    global motor_AFN
+    motor_AFN = nome
+    status_acao.config(text=f"Motor de AFN/AFNe: {nome}")
+
+def obter_tabela_AP():
+    return tabelas_atuais().tabela_AP()
+
+def criar_simulador_sem_animacao(tipo, estado_inicial):
+    """
+    Escolhe o motor certo para o tipo de autômato e devolve uma função
+    palavra -> (resultado, saida), sem nenhum acesso ao canvas.
+    Retorna None se o tipo ainda não tiver motor.
+    """
+    return criar_simulador(tipo, estado_inicial, tabelas_atuais(), motor_AFN, config_AP)
+
+def exportar_modelo_simulacao():
+    """
+    Serializa o autômato atual (e as opções dos motores) numa estrutura sem Tk,
+    que pode ser enviada aos processos da simulação em lote.
+    """
+    copia = {e: EstadoModelo(e.nome, e.inicial, e.aceitacao, e.simbolo_saida) for e in estados.values()}
+    lista_transicoes = [TransicaoModelo(copia[t.origem], copia[t.destino], list(t.simbolos_entrada), t.simbolo_saida,
+                                        t.para_desempilhar, t.para_empilhar) for t in transicoes]
+    return novo_modelo(tipo_automato_atual, list(copia.values()), lista_transicoes, motor_AFN, limite_cache_determinizacao, config_AP)
+
+
+def configurar_lote():
+    """Pergunta quantos processos e qual o tamanho de bloco da simulação em lote."""
+    processos = simpledialog.askinteger("Simulação em Lote", f"Número de processos (1 = sem paralelismo; "
+                                        f"este computador tem {os.cpu_count() or 1} núcleos):",
+                                        initialvalue=config_lote["processos"], minvalue=1)
+    if processos is None: return
+    tamanho_bloco = simpledialog.askinteger("Simulação em Lote", "Palavras por bloco:",
+                                            initialvalue=config_lote["tamanho_bloco"], minvalue=1)
+    if tamanho_bloco is None: return
+    config_lote["processos"] = processos
+    config_lote["tamanho_bloco"] = tamanho_bloco
+    status_acao.config(text=f"Lote: {processos} processo(s), blocos de {tamanho_bloco} palavras.")
+
+def simular_arquivo():
+    """
+    Modo "Simular arquivo...": lê um arquivo com uma palavra por linha, simula cada
+    uma sem animação e grava o resultado num .csv à medida que avança.
+    """
+    estado_inicial = next((est for est in estados.values() if est.inicial), None)
+    if not estado_inicial:
+        messagebox.showwarning("Simular Arquivo", "O autômato não possui estado inicial.")
+        return
+    simulador = criar_simulador_sem_animacao(tipo_automato_atual, estado_inicial)
+    if simulador is None:
+        messagebox.showwarning("Simular Arquivo", f"A simulação em lote ainda não suporta o tipo {tipo_automato_atual}.")
+        return
+
+    arquivo_palavras = filedialog.askopenfilename(
+        title="Arquivo de palavras (uma por linha)",
+        filetypes=[("Arquivos de texto", "*.txt"), ("Todos os arquivos", "*.*")]
+    )
+    if not arquivo_palavras: return
+    arquivo_csv = filedialog.asksaveasfilename(
+        defaultextension=".csv",
+        filetypes=[("Arquivo CSV", "*.csv"), ("Todos os arquivos", "*.*")],
+        initialfile="resultado_lote.csv"
+    )
+    if not arquivo_csv: return
+
+    import csv
+    total, aceitas = 0, 0
+    processos = config_lote["processos"]
+    try:
+        with open(arquivo_palavras, "r", encoding="utf-8-sig") as entrada, \
+             open(arquivo_csv, "w", encoding="utf-8-sig", newline="") as f:
+            # Mesmo formato do relatório de simulação (';' e utf-8-sig para o Excel)
+            writer = csv.writer(f, delimiter=';')
+            writer.writerow(["Palavra", "Resultado", "Saída"])
+            blocos = ler_blocos_de_palavras(entrada, config_lote["tamanho_bloco"])
+            if processos > 1:
+                resultados_por_bloco = simular_blocos_em_paralelo(exportar_modelo_simulacao(), blocos, processos)
+            else:
+                resultados_por_bloco = ((bloco, [simulador(p) for p in bloco]) for bloco in blocos)
+            for bloco, resultados_bloco in resultados_por_bloco:
+                for palavra, (res, saida) in zip(bloco, resultados_bloco):
+                    writer.writerow([palavra, res, saida])
+                    if res in ("aceita", "concluída"): aceitas += 1
+                total += len(bloco)
+                status_acao.config(text=f"Simulando arquivo... {total} palavras")
+                janela.update_idletasks()
+    except Exception as e:
+        messagebox.showerror("Erro na Simulação em Lote", f"Não foi possível simular o arquivo:\n{e}")
+        return
+    texto_status = f"{total} palavras simuladas ({aceitas} aceitas/concluídas). Resultado em {arquivo_csv.split('/')[-1]}"
+    if tipo_automato_atual in ["AFN", "AFNe"] and motor_AFN == "preguicoso" and processos == 1:
+        texto_status += f" | {obter_cache_determinizacao().estatisticas()}"
+    status_acao.config(text=texto_status)
+
+def transduzir_arquivo():
+    """
+    Modo transdutor (Mealy/Moore): passa um arquivo inteiro pela máquina, em blocos, e grava a saída
+    num outro arquivo à medida que lê. O relatório passo a passo (.csv) é opcional e fica no rastro
+    compacto (lflap.rastro), que passa para o disco quando cresce.
+    """
+    if tipo_automato_atual not in ["Mealy", "Moore"]:
+        messagebox.showwarning("Transduzir Arquivo", "O modo transdutor é para Máquinas de Mealy e Moore.")
+        return
+    estado_inicial = next((est for est in estados.values() if est.inicial), None)
+    if not estado_inicial:
+        messagebox.showwarning("Transduzir Arquivo", "O autômato não possui estado inicial.")
+        return
+    arquivo_entrada = filedialog.askopenfilename(title="Arquivo de entrada",
+                                                 filetypes=[("Arquivos de texto", "*.txt *.log"), ("Todos os arquivos", "*.*")])
+    if not arquivo_entrada: return
+    arquivo_saida = filedialog.asksaveasfilename(title="Salvar a saída como", defaultextension=".txt",
+                                                 filetypes=[("Arquivos de texto", "*.txt"), ("Todos os arquivos", "*.*")],
+                                                 initialfile="saida_transdutor.txt")
+    if not arquivo_saida: return
+    ignorar_quebras = messagebox.askyesno("Transduzir Arquivo", "Ignorar as quebras de linha da entrada (não lê-las como símbolos)?")
+    arquivo_rastro = None
+    if messagebox.askyesno("Transduzir Arquivo", "Gravar também o relatório passo a passo (.csv)?\n"
+                                                 "Com ele, a transdução fica bem mais lenta."):
+        arquivo_rastro = filedialog.asksaveasfilename(title="Salvar o relatório como", defaultextension=".csv",
+                                                      filetypes=[("Arquivo CSV", "*.csv"), ("Todos os arquivos", "*.*")],
+                                                      initialfile="relatorio_transdutor.csv")
+    rastro = RastroSimulacao(primeiro_passo=0 if tipo_automato_atual == "Moore" else 1) if arquivo_rastro else None
+
+    def ao_avancar(lidos):
+        status_acao.config(text=f"Transduzindo... {lidos} símbolos")
+        janela.update_idletasks()
+
+    tabela = tabelas_atuais().tabela_transdutor(tipo_automato_atual)
+    inicio = time.perf_counter()
+    try:
+        with open(arquivo_entrada, "r", encoding="utf-8-sig") as entrada, \
+             open(arquivo_saida, "w", encoding="utf-8", newline="") as saida:
+            concluida, lidos, estado_final, simbolo_preso = transduzir_fluxo(
+                tabela, estado_inicial, entrada, saida, tipo_automato_atual,
+                ignorar="\r\n" if ignorar_quebras else "", ao_avancar=ao_avancar, rastro=rastro)
+        if rastro is not None:
+            status_acao.config(text="Gravando o relatório passo a passo...")
+            janela.update_idletasks()
+            with open(arquivo_rastro, "w", encoding="utf-8-sig", newline="") as f:
+                rastro.escrever_csv(f, [["Arquivo de Entrada", arquivo_entrada], ["Arquivo de Saída", arquivo_saida]])
+    except (OSError, UnicodeDecodeError) as e:
+        messagebox.showerror("Erro ao Transduzir", f"Não foi possível transduzir o arquivo:\n{e}")
+        return
+    finally:
+        if rastro is not None: rastro.fechar()
+    duracao = time.perf_counter() - inicio
+    if not concluida:
+        messagebox.showwarning("Transduzir Arquivo", f"Parou no símbolo {lidos + 1} ({simbolo_preso!r}): o estado "
+                                                      f"'{estado_final.nome}' não tem transição para ele.\n"
+                                                      f"A saída até esse ponto foi gravada.")
+    status_acao.config(text=f"{lidos} símbolos transduzidos em {duracao:.2f} s. Saída em {arquivo_saida.split('/')[-1]}")
+
+class SimulacaoPassoAPasso:
+    """
+    Simulação animada por cursor: 'indice' aponta o próximo símbolo da palavra (nada é fatiado nem
+    concatenado a cada passo). avancar() dá um passo sem tocar na interface, e desenhar() mostra o
+    passo atual; o controle (Executar/Pausar, Passo, Até o fim e o atraso) só combina os dois.
+    """
+    def __init__(self, palavra, estado_inicial):
+        self.palavra = palavra
+        self.indice = 0
+        self.atual = estado_inicial # Estado corrente (um Estado; nos AFN/AFNe, um conjunto deles)
+        self.saida = []             # Pedaços de saída de cada passo (juntados só para mostrar)
+        self.simbolo = None         # Símbolo lido no último passo
+        self.realcadas = []         # Transições usadas no último passo
+        self.preso = False          # Parou num símbolo sem transição
+        self.terminada = False
+        self._estados_desenhados = []
+        self._transicoes_desenhadas = []
+
+    def chegou_ao_fim(self):
+        return self.indice >= len(self.palavra)
+
+    def avancar(self):
+        """Lê palavra[indice] e atualiza o estado corrente. Retorna False se não há transição."""
+        raise NotImplementedError
+
+    def estados_realcados(self):
+        return [self.atual]
+
+    def texto_status(self):
+        return f"Lendo '{self.simbolo}'..."
+
+    def desenhar(self):
+        """Realça o estado corrente e as transições do último passo (desfaz só o realce anterior)."""
+        self.apagar_realces()
+        self._estados_desenhados = list(self.estados_realcados())
+        self._transicoes_desenhadas = list(self.realcadas)
+        for estado in self._estados_desenhados: estado.configurar_circulo(outline="blue", width=3)
+        for t in self._transicoes_desenhadas: canvas.itemconfig(t.tag_unica, fill="red")
+        if self.simbolo is not None and not self.terminada: status_acao.config(text=self.texto_status())
+        if self.saida: sequencia_saida.config(text=f"Saída: {self.texto_saida()}")
+
+    def apagar_realces(self):
+        for estado in self._estados_desenhados: estado.configurar_circulo(outline="black", width=2)
+        for t in self._transicoes_desenhadas: canvas.itemconfig(t.tag_unica, fill="black")
+        self._estados_desenhados, self._transicoes_desenhadas = [], []
+
+    def texto_saida(self):
+        """A saída acumulada; palavras longas mostram só o final (o relatório guarda tudo)."""
+        if len(self.saida) <= LIMITE_SAIDA_NA_TELA: return "".join(self.saida)
+        return "…" + "".join(self.saida[-LIMITE_SAIDA_NA_TELA:])
+
+    def concluir(self):
+        """Mostra o resultado final (a palavra foi lida até o fim, ou o passo ficou preso)."""
+        raise NotImplementedError
+
+    def descartar(self):
+        """Chamado quando a simulação é interrompida antes do fim."""
+        pass
+
+class SimulacaoAFD(SimulacaoPassoAPasso):
+    def __init__(self, palavra, estado_inicial):
+        super().__init__(palavra, estado_inicial)
+        self.tabela = obter_tabela_transicoes() # Buscada uma vez; cada passo é só um acesso ao dicionário
+        self.anterior = None
+
+    def avancar(self):
+        self.simbolo = self.palavra[self.indice]
+        transicao = self.tabela.get(self.atual, {}).get(self.simbolo)
+        if not transicao: return False
+        self.anterior, self.atual = self.atual, transicao.destino
+        self.indice += 1
+        return True
+
+    def desenhar(self):
+        super().desenhar()
+        # O token percorre a transição durante boa parte do atraso (sem animação nos atrasos curtos)
+        quadros = config_simulacao["atraso_ms"] * 3 // 4 // 20
+        if self.anterior is not None and quadros > 1 and not self.terminada:
+            raio_token = 5
+            x_token, y_token = na_tela(self.anterior.x, self.anterior.y)
+            token = canvas.create_oval(x_token - raio_token, y_token - raio_token, x_token + raio_token, y_token + raio_token, fill="red", outline="black")
+            animar_token(token, self.anterior, self.atual, None, total_passos=quadros)
+        self.anterior = None
+
+    def concluir(self):
+        if self.preso:
+            resultado.config(text=f"Rejeitada ❌ (preso no símbolo '{self.simbolo}')", fg="red")
+        else:
+            aceita = self.atual.aceitacao
+            resultado.config(text="Palavra aceita ✅" if aceita else "Palavra rejeitada ❌", fg="green" if aceita else "red")
+
+class SimulacaoAFN(SimulacaoPassoAPasso):
+    def __init__(self, palavra, estado_inicial):
+        super().__init__(palavra, calcular_fecho_epsilon({estado_inicial}))
+
+    def avancar(self):
+        self.simbolo = self.palavra[self.indice]
+        proximos, self.realcadas, saida_passo = calcular_passo_AFN(self.atual, self.simbolo)
+        if not proximos: return False
+        self.atual = proximos
+        self.saida.append(saida_passo)
+        self.indice += 1
+        return True
+
+    def estados_realcados(self):
+        return self.atual
+
+    def texto_status(self):
+        nomes_atuais = ", ".join(sorted(e.nome for e in self.atual))
+        return f"Lendo '{self.simbolo}'... Próximos estados: [{nomes_atuais}]"
+
+    def concluir(self):
+        if self.preso:
+            resultado.config(text=f"Rejeitada ❌ (preso no símbolo '{self.simbolo}')", fg="red")
+            return
+        aceita = any(estado.aceitacao for estado in self.atual)
+        resultado.config(text="Palavra aceita ✅" if aceita else "Palavra rejeitada ❌", fg="green" if aceita else "red")
+        sequencia_saida.config(text=f"Saída Final: {self.texto_saida()}")
+
+class SimulacaoMealy(SimulacaoPassoAPasso):
+    """Mealy: a saída vem da transição. Cada passo vai também para o rastro do relatório."""
+    primeiro_passo = 1
+
+    def __init__(self, palavra, estado_inicial):
+        super().__init__(palavra, estado_inicial)
+        self.tabela = obter_tabela_transicoes() # Como no AFD: buscada uma vez, não a cada passo
+        self.rastro = RastroSimulacao(primeiro_passo=self.primeiro_passo)
+
+    def saida_do_passo(self, transicao):
+        return transicao.simbolo_saida
+
+    def avancar(self):
+        self.simbolo = self.palavra[self.indice]
+        transicao = self.tabela.get(self.atual, {}).get(self.simbolo)
+        if not transicao: return False
+        saida_passo = self.saida_do_passo(transicao)
+        self.rastro.registrar(self.atual.nome, self.simbolo, saida_passo, transicao.destino.nome)
+        self.saida.append(saida_passo)
+        self.atual, self.realcadas = transicao.destino, [transicao]
+        self.indice += 1
+        return True
+
+    def texto_status(self):
+        return f"Lendo '{self.simbolo}', gerando '{self.saida[-1]}'..."
+
+    def concluir(self):
+        if self.preso:
+            resultado.config(text=f"Rejeitada ❌ (transição inválida para '{self.simbolo}')", fg="red")
+            self.rastro.fechar()
+            return
+        resultado.config(text="Simulação concluída!", fg="blue")
+        sequencia_saida.config(text=f"Saída Final: {self.texto_saida()}")
+        janela.after(500, lambda: salvar_saida_em_arquivo(self.palavra, self.rastro))
+
+    def descartar(self):
+        self.rastro.fechar()
+
+class SimulacaoMoore(SimulacaoMealy):
+    """Moore: a saída vem do estado de destino; o rastro começa no passo 0, a saída do estado inicial."""
+    primeiro_passo = 0
+
+    def __init__(self, palavra, estado_inicial):
+        super().__init__(palavra, estado_inicial)
+        self.rastro.registrar(estado_inicial.nome, "", estado_inicial.simbolo_saida, estado_inicial.nome)
+        self.saida.append(estado_inicial.simbolo_saida)
+
+    def saida_do_passo(self, transicao):
+        return transicao.destino.simbolo_saida
+
+class SimulacaoAP(SimulacaoPassoAPasso):
+    """AP: a busca é feita de uma vez; o cursor só percorre o caminho encontrado."""
+    def __init__(self, palavra, estado_inicial):
+        self.aceita, self.caminho, self.info = simular_AP(obter_tabela_AP(), estado_inicial, palavra, config_AP)
+        print(f"Simulação AP: {self.info}")
+        super().__init__(palavra, estado_inicial)
+
+    def chegou_ao_fim(self):
+        return self.indice >= len(self.caminho) - 1
+
+    def avancar(self):
+        posicao = self.caminho[self.indice][1]
+        self.indice += 1
+        self.atual, posicao_nova, _, transicao = self.caminho[self.indice]
+        self.simbolo = self.palavra[posicao] if posicao_nova > posicao else "ε"
+        self.realcadas = [transicao]
+        return True
+
+    def desenhar(self):
+        super().desenhar()
+        pilha_simulacao[:] = self.caminho[self.indice][2]
+        atualizar_display_pilha()
+
+    def texto_status(self):
+        transicao = self.realcadas[0]
+        return f"Lendo '{self.simbolo}', desempilha '{transicao.para_desempilhar}', empilha '{transicao.para_empilhar}'"
+
+    def concluir(self):
+        if self.aceita:
+            resultado.config(text="Palavra aceita ✅", fg="green")
+        elif self.info["indeterminada"]:
+            resultado.config(text=f"Não aceita ⚠️ (busca limitada: {descrever_limites_AP(self.info)})", fg="orange")
+        else:
+            resultado.config(text="Palavra rejeitada ❌", fg="red")
+        status_acao.config(text=f"AP: {self.info['configuracoes']} configurações exploradas em {self.info['passos']} passos.")
+
+CLASSES_SIMULACAO = {"AFD": SimulacaoAFD, "AFN": SimulacaoAFN, "AFNe": SimulacaoAFN,
+                     "Mealy": SimulacaoMealy, "Moore": SimulacaoMoore, "AP": SimulacaoAP}
+
+def simular_palavra(executar=True):
+    """
+    Começa a simulação passo a passo da palavra digitada (interrompendo a anterior).
+    Com executar=False ela fica pausada no estado inicial, esperando Passo/Executar.
+    """
+    global simulacao_atual
+    parar_simulacao()
+    palavra = input_entry.get()
+    resultado.config(text="Simulando...", fg="black")
+    sequencia_saida.config(text="Saída: ")
+    
+    estado_inicial = next((est for est in estados.values() if est.inicial), None)
+    if not estado_inicial:
+        # ...
+        return
+
+    classe = CLASSES_SIMULACAO.get(tipo_automato_atual)
+    if classe is None: return
+    simulacao_atual = classe(palavra, estado_inicial)
+    simulacao_atual.desenhar()
+    if executar:
+        continuar_simulacao()
+    else:
+        atualizar_botoes_simulacao()
+
+def atualizar_botoes_simulacao():
+    botao_pausar.config(text="Pausar" if simulacao_rodando else "Executar")
+
+def _agendar_proximo_passo():
+    global id_passo_agendado
+    id_passo_agendado = janela.after(config_simulacao["atraso_ms"] or 1, _tique_simulacao)
+
+def _cancelar_passo_agendado():
+    global id_passo_agendado
+    if id_passo_agendado is not None:
+        janela.after_cancel(id_passo_agendado)
+        id_passo_agendado = None
+
+def _dar_passo(simulacao):
+    """Um passo sem desenhar. Retorna False (e conclui a simulação) se ela acabou."""
+    if simulacao.chegou_ao_fim() or not simulacao.avancar():
+        if not simulacao.chegou_ao_fim(): simulacao.preso, simulacao.realcadas = True, []
+        _concluir_simulacao(simulacao)
+        return False
+    return True
+
+def _tique_simulacao():
+    """
+    Um quadro da execução automática. Com atraso zero (turbo), dá quantos passos couberem em
+    ORCAMENTO_TURBO_S e só desenha o último, deixando a janela responder entre os quadros.
+    """
+    global id_passo_agendado
+    id_passo_agendado = None
+    simulacao = simulacao_atual
+    if simulacao is None or not simulacao_rodando: return
+    if config_simulacao["atraso_ms"] == 0:
+        limite = time.perf_counter() + ORCAMENTO_TURBO_S
+        while _dar_passo(simulacao):
+            if time.perf_counter() >= limite: break
+        else:
+            return
+    elif not _dar_passo(simulacao):
+        return
+    simulacao.desenhar()
+    _agendar_proximo_passo()
+
+def _concluir_simulacao(simulacao):
+    global simulacao_rodando
+    _cancelar_passo_agendado()
+    simulacao_rodando = False
+    simulacao.terminada = True
+    simulacao.desenhar()
+    simulacao.concluir()
+    atualizar_botoes_simulacao()
+    def limpar_realces_finais():
+        if simulacao_atual is simulacao: simulacao.apagar_realces()
+    janela.after(2000, limpar_realces_finais)
+
+def continuar_simulacao():
+    global simulacao_rodando
+    if simulacao_atual is None or simulacao_atual.terminada or simulacao_rodando: return
+    simulacao_rodando = True
+    atualizar_botoes_simulacao()
+    _agendar_proximo_passo()
+
+def pausar_simulacao():
+    global simulacao_rodando
+    _cancelar_passo_agendado()
+    simulacao_rodando = False
+    atualizar_botoes_simulacao()
+
+def executar_ou_pausar_simulacao():
+    """Botão Executar/Pausar: começa uma nova simulação se não há nenhuma em andamento."""
+    if simulacao_atual is None or simulacao_atual.terminada:
+        simular_palavra()
+    elif simulacao_rodando:
+        pausar_simulacao()
+    else:
+        continuar_simulacao()
+
+def passo_simulacao():
+    """Botão Passo: pausa e avança um símbolo (a primeira vez, só prepara a simulação)."""
+    if simulacao_atual is None or simulacao_atual.terminada:
+        simular_palavra(executar=False)
+        return
+    pausar_simulacao()
+    if _dar_passo(simulacao_atual): simulacao_atual.desenhar()
+
+def simular_ate_o_fim():
+    """Botão Até o fim: lê o resto da palavra sem desenhar nada e mostra só o resultado final."""
+    if simulacao_atual is None or simulacao_atual.terminada:
+        simular_palavra(executar=False)
+        if simulacao_atual is None: return
+    pausar_simulacao()
+    simulacao = simulacao_atual
+    while _dar_passo(simulacao): pass
+
+def parar_simulacao():
+    """Interrompe a simulação em andamento (se houver) e desfaz os realces dela."""
+    global simulacao_atual
+    pausar_simulacao()
+    if simulacao_atual is not None:
+        simulacao_atual.apagar_realces()
+        if not simulacao_atual.terminada: simulacao_atual.descartar()
+        simulacao_atual = None
+
+def definir_atraso_simulacao(valor):
+    """Escala de velocidade: atraso entre passos em ms (0 = turbo). Vale já para o próximo passo."""
+    config_simulacao["atraso_ms"] = int(float(valor))
+    if simulacao_rodando:
+        _cancelar_passo_agendado()
+        _agendar_proximo_passo()
+
+
+
+# --- Funções de Arquivo ---
+def proximo_contador_estados(nomes):
+    """Primeiro número livre para nomes automáticos 'qN', dados os nomes existentes."""
+    numeros = [int(nome[1:]) for nome in nomes if nome.startswith('q') and nome[1:].isdigit()]
+    return max(numeros) + 1 if numeros else 0
+
+def novo_automato():
+    global estados, transicoes, transicoes_por_par, contador_estados, caminho_arquivo_atual
+    canvas.delete("all")
+    objetos_por_item.clear()
+    estados, transicoes, transicoes_por_par = {}, {}, {}
+    contador_estados = 0
+    invalidar_cache_simulacao()
+    caminho_arquivo_atual = None
+    resultado.config(text="")
+    status_acao.config(text="Novo autômato criado. Clique no canvas para começar.")
+
+def _salvar_dados_no_arquivo(caminho):
+    dados = {
+        "estados": [{"nome": e.nome, "x": e.x, "y": e.y, "inicial": e.inicial, "aceitacao": e.aceitacao, "simbolo_saida": e.simbolo_saida} for e in estados.values()],
+        "transicoes": [{"origem": t.origem.nome, "destino": t.destino.nome, "simbolos_entrada": t.simbolos_entrada,
+                        "simbolo_saida": t.simbolo_saida, "para_desempilhar": t.para_desempilhar, "para_empilhar": t.para_empilhar,
+                        "offset_x": t.offset_x, "offset_y": t.offset_y} for t in transicoes]
+    }
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(dados, f, indent=4)
+    status_acao.config(text=f"Autômato salvo em {caminho.split('/')[-1]}")
+
+def _salvar_conforme_extensao(caminho):
+    """Escolhe o formato pelo final do nome: .jff (JFLAP), .lfab (binário compacto) ou .json."""
+    if caminho.lower().endswith('.jff'):
+        exportar_para_jflap_xml(caminho)
+    elif caminho.lower().endswith('.lfab'):
+        salvar_binario(caminho, list(estados.values()), transicoes, tipo_automato_atual)
+        status_acao.config(text=f"Autômato salvo em {caminho.split('/')[-1]}")
+    else:
+        _salvar_dados_no_arquivo(caminho)
+
+def salvar():
+    if caminho_arquivo_atual:
+        _salvar_conforme_extensao(caminho_arquivo_atual)
+    else:
+        salvar_como()
+
+def salvar_como():
+    global caminho_arquivo_atual
+    arquivo = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON files", "*.json"), ("JFLAP files", "*.jff"), ("Binário compacto", "*.lfab")])
+    if arquivo:
+        caminho_arquivo_atual = arquivo
+        _salvar_conforme_extensao(caminho_arquivo_atual)
+
+def salvar_saida_em_arquivo(palavra_entrada, rastro):
+    """
+    Pergunta ao usuário se deseja salvar o rastro da simulação (RastroSimulacao) e, se sim,
+    abre um diálogo para salvar em um arquivo .csv formatado para o Excel. O rastro é fechado no fim.
+    """
+    with rastro:
+        _salvar_rastro_em_arquivo(palavra_entrada, rastro)
+
+def _resumir(texto, limite=200):
+    return texto if len(texto) <= limite else texto[:limite] + f"... ({len(texto)} caracteres)"
+
+def _salvar_rastro_em_arquivo(palavra_entrada, rastro):
+    if not len(rastro): return
+
+    string_saida = rastro.saida_completa()
+    
+    confirmar = messagebox.askyesno(
+        "Salvar Relatório de Simulação",
+        f"A simulação para a entrada '{_resumir(palavra_entrada)}' gerou a saída: '{_resumir(string_saida)}'\n\n"
+        "Deseja salvar um relatório detalhado (.csv)?"
+    )
+    
+    if confirmar:
+        nome_sugerido = f"relatorio_{palavra_entrada[:40]}.csv" if palavra_entrada else "relatorio.csv"
+        arquivo = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=[("Arquivo CSV", "*.csv"), ("Todos os arquivos", "*.*")],
+            initialfile=nome_sugerido
+        )
+        
+        if arquivo:
+            try:
+                # Usamos 'utf-8-sig' para ajudar o Excel a entender os acentos
+                # E 'newline=""' que é uma boa prática para arquivos csv
+                with open(arquivo, "w", encoding="utf-8-sig", newline="") as f:
+                    # Os passos vão direto do rastro para o arquivo, separados por ';' para o Excel
+                    rastro.escrever_csv(f, [["Palavra de Entrada", palavra_entrada], ["Palavra de Saída", string_saida]])
+                        
+                status_acao.config(text=f"Relatório salvo em {arquivo.split('/')[-1]}")
+            except Exception as e:
+                messagebox.showerror("Erro ao Salvar", f"Não foi possível salvar o relatório:\n{e}")
+
+
+#--------------------------------------------------------
+
+def exportar_para_jflap_xml(caminho_arquivo):
+    with open(caminho_arquivo, "w", encoding="utf-8", newline="\n") as f:
+        escrever_jff(f, list(estados.values()), transicoes, tipo_automato_atual)
+  
+    status_acao.config(text=f"Exportado para JFLAP XML (JFF) em: {caminho_arquivo.split('/')[-1]}")
+#----------------------------------------------------
+
+def atalho_salvar(event):
+    """Função adaptadora para o atalho Ctrl+S. Ignora o evento e chama a função salvar."""
+    # O 'event' é recebido mas não precisamos usá-lo aqui.
+    salvar()
+    print("Atalho Ctrl+S acionado: arquivo salvo.")
+
+def abrir_automato():
+    global caminho_arquivo_atual
+    
+    # Aumentei a lista de filtros para ser mais robusta
+    arquivo = filedialog.askopenfilename(
+        filetypes=[
+            ("Todos os Arquivos de Autômato", "*.jff;*.json;*.lfab"),
+            ("JFLAP files", "*.jff"),
+            ("JSON files", "*.json"),
+            ("Binário compacto", "*.lfab")
+        ]
+    )
+    
+    if not arquivo: return
+    
+    # --- NOVO FLUXO: Decide O QUE chamar com base na extensão ---
+    if arquivo.lower().endswith('.jff'):
+        # CHAMA O IMPORTADOR XML (ele mesmo avisa os erros)
+        if not importar_de_jflap_xml(arquivo): return
+
+    elif arquivo.lower().endswith(('.json', '.lfab')):
+        # Todo conteúdo malformado chega aqui como ValueError; o autômato aberto só é trocado depois da leitura
+        carregar = _carregar_dados_json if arquivo.lower().endswith('.json') else _carregar_dados_binarios
+        try:
+            carregar(arquivo)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Erro ao Abrir", f"Não foi possível abrir o arquivo:\n{e}")
+            return
+
+    else:
+        messagebox.showwarning("Erro de Formato", "Formato de arquivo não reconhecido. Tente .jff, .json ou .lfab.")
+        return
+
+    caminho_arquivo_atual = arquivo # Depois da carga: novo_automato() o apaga
+    status_acao.config(text=f"Autômato carregado de {arquivo.split('/')[-1]}")
+
+#-----------------------------------------------
+
+def _carregar_dados_json(arquivo):
+    # O arquivo é lido e conferido inteiro antes de o autômato atual ser apagado
+    lista_estados, lista_transicoes = ler_json(arquivo)
+    _trocar_automato(tipo_automato_atual, lista_estados, lista_transicoes) # O .json não guarda o tipo
+
+def _trocar_automato(tipo, lista_estados, lista_transicoes, chave="nome"):
+    """
+    Troca o autômato do editor pelo lido de um arquivo. Recebe os dicionários já completos
+    (ler_json, ler_jff ou os arrays do .lfab), então só apaga o atual quando o novo já foi lido.
+    Cria o modelo inteiro sem desenhar; o canvas é montado de uma vez (só o que está na vista) no final.
+    """
+    global contador_estados, tipo_automato_atual, desenho_adiado
+    novo_automato()
+    tipo_automato_atual = tipo
+    desenho_adiado = True
+    try:
+        estado_por_chave = {}
+        for e_data in lista_estados:
+            estado = Estado(e_data["nome"], e_data["x"], e_data["y"], canvas)
+            estado.simbolo_saida = e_data["simbolo_saida"] # Saída de Moore
+            if e_data["inicial"]: estado.set_inicial()
+            if e_data["aceitacao"]: estado.set_aceitacao(True)
+            estados[estado.nome] = estado
+            estado_por_chave[e_data[chave]] = estado
+        contador_estados = proximo_contador_estados(estados.keys())
+
+        for t_data in lista_transicoes:
+            origem, destino = estado_por_chave.get(t_data["origem"]), estado_por_chave.get(t_data["destino"])
+            if not origem or not destino: continue
+            transicao = Transicao(origem, destino, canvas, t_data["simbolos_entrada"], t_data["simbolo_saida"],
+                                  t_data.get("offset_x", 0), t_data.get("offset_y", 0))
+            transicao.para_desempilhar = t_data["para_desempilhar"]
+            transicao.para_empilhar = t_data["para_empilhar"]
+            registrar_transicao(transicao)
+
+        # Corrige o desenho de transições que ligam o mesmo par de estados
+        corrigir_desvios_carregados()
+    finally:
+        desenho_adiado = False
+    atualizar_vista()
+    atualizar_status_modo()
+
+#--------------------------------------------------------------
+
+#--------------------------------------------------------------------------
+def importar_de_jflap_xml(caminho_arquivo):
+    try:
+        tipo_jflap, lista_estados, lista_transicoes = ler_jff(caminho_arquivo)
+    except (OSError, ValueError) as e: # ler_jff já converte o XML malformado em ValueError
+        messagebox.showerror("Erro de Importação JFLAP", f"Erro ao carregar o arquivo JFLAP: {e}")
+        return False
+
+    if tipo_jflap in TIPO_DO_JFLAP:
+        tipo = TIPO_DO_JFLAP[tipo_jflap]
+    elif tipo_automato_atual in ("AFD", "AFN", "AFNe"):
+        tipo = tipo_automato_atual
+    else:
+        tipo = "AFNe" # Autômato finito qualquer: o AFNe aceita todos
+    _trocar_automato(tipo, lista_estados, lista_transicoes, chave="id")
+    return True
+    
+#----------------------------------------------------------
+
+# --- Formato Binário Compacto (.lfab) ---
+# O formato em si (salvar_binario, AutomatoBinario) fica em lflap/formatos.py
+def _carregar_dados_binarios(caminho):
+    """
+    Abre um .lfab no editor. Os arrays são lidos (e conferidos por AutomatoBinario) para
+    dicionários no formato de ler_jff, com o índice do estado como chave, e o arquivo é fechado
+    antes de o autômato atual ser trocado.
+    """
+    with AutomatoBinario(caminho) as automato:
+        texto = automato.texto
+        lista_estados = [{
+            "id": i, "nome": texto(automato.estado_nome[i]),
+            "x": automato.estado_coords[2 * i], "y": automato.estado_coords[2 * i + 1],
+            "inicial": bool(automato.estado_flags[i] & FLAG_INICIAL),
+            "aceitacao": bool(automato.estado_flags[i] & FLAG_ACEITACAO),
+            "simbolo_saida": texto(automato.estado_saida[i]),
+        } for i in range(automato.qtd_estados)]
+        lista_transicoes = [{
+            "origem": automato.trans_origem[i], "destino": automato.trans_destino[i],
+            "simbolos_entrada": automato.entradas_da_transicao(i), "simbolo_saida": texto(automato.trans_saida[i]),
+            "para_desempilhar": texto(automato.trans_desempilha[i]), "para_empilhar": texto(automato.trans_empilha[i]),
+            "offset_x": automato.trans_desvios[2 * i], "offset_y": automato.trans_desvios[2 * i + 1],
+        } for i in range(automato.qtd_transicoes)]
+        tipo = automato.tipo or tipo_automato_atual
+    _trocar_automato(tipo, lista_estados, lista_transicoes, chave="id")
+
+def corrigir_desvios_carregados(distancia_desvio=30):
+    """
+    Afasta as transições que ligam o mesmo par de estados (em qualquer sentido) para que não
+    fiquem sobrepostas. Agrupa por par não ordenado num dicionário (uma passada só) e abre as
+    transições do grupo em leque, separadas por 'distancia_desvio'. Com duas transições o desvio
+    é de ±15, como no ComandoCriarTransicao. Grupos que já têm algum desvio salvo são mantidos.
+    """
+    grupos = {}
+    for t in transicoes:
+        if t.origem is t.destino: continue # Laços são desenhados à parte
+        grupos.setdefault(frozenset((t.origem, t.destino)), []).append(t)
+
+    for grupo in grupos.values():
+        if len(grupo) < 2: continue
+        if any(t.offset_x or t.offset_y for t in grupo): continue
+        # Todas as transições do grupo usam a mesma perpendicular (a do sentido da primeira)
+        estado_origem, estado_destino = grupo[0].origem, grupo[0].destino
+        dist = math.dist((estado_origem.x, estado_origem.y), (estado_destino.x, estado_destino.y))
+        if dist == 0: dist = 1
+        vetor_x, vetor_y = (estado_destino.x - estado_origem.x) / dist, (estado_destino.y - estado_origem.y) / dist
+        vetor_perp_x, vetor_perp_y = -vetor_y, vetor_x
+        centro = (len(grupo) - 1) / 2
+        for i, t in enumerate(grupo):
+            desvio = (centro - i) * distancia_desvio
+            t.offset_x, t.offset_y = vetor_perp_x * desvio, vetor_perp_y * desvio
+            t.atualizar_posicao()
+
+
+# --- Ícones da Barra de Ferramentas ---
+# Os PNGs de 'icones/' têm 512 px ou mais; reduzi-los a cada abertura deixava a janela lenta.
+# A cópia já no tamanho da barra fica em PASTA_CACHE_ICONES e é lida direto pelo PhotoImage do Tk,
+# que abre PNG sem o PIL. O PIL só é importado para gerar essa cópia (uma vez por ícone).
+PASTA_ICONES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "icones")
+PASTA_CACHE_ICONES = os.path.join(os.path.expanduser("~"), ".cache", "mini-jflap", "icones")
+TAMANHO_ICONE = 24
+
+def _gerar_icone_em_cache(origem, destino, tamanho):
+    """Reduz o PNG com o PIL (LANCZOS) e grava a cópia. Retorna False se o PIL não estiver instalado."""
+    try:
+        from PIL import Image
+    except ImportError:
+        return False
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    with Image.open(origem) as img:
+        img.resize((tamanho, tamanho), Image.Resampling.LANCZOS).save(destino)
+    return True
+
+def carregar_icone(nome, tamanho=TAMANHO_ICONE):
+    """
+    PhotoImage do ícone 'nome' com 'tamanho' px. Usa a cópia em cache se ela for mais nova que o PNG
+    original; senão tenta gerá-la com o PIL. Sem PIL (ou sem onde gravar), reduz o original no próprio Tk.
+    """
+    origem = os.path.join(PASTA_ICONES, f"{nome}.png")
+    em_cache = os.path.join(PASTA_CACHE_ICONES, f"{nome}_{tamanho}.png")
+    try:
+        atualizado = os.path.getmtime(em_cache) >= os.path.getmtime(origem)
+    except OSError:
+        atualizado = False
+    if not atualizado:
+        try:
+            atualizado = _gerar_icone_em_cache(origem, em_cache, tamanho)
+        except OSError: # Pasta de cache sem permissão de escrita, por exemplo
+            atualizado = False
+    if atualizado:
+        return tk.PhotoImage(file=em_cache)
+    imagem = tk.PhotoImage(file=origem)
+    fator = -(-max(imagem.width(), imagem.height()) // tamanho) # Divisão arredondada para cima
+    return imagem.subsample(max(1, fator))
+
+
+# --- UI Setup ---
+# A interface só é montada quando o arquivo é executado diretamente. Assim os processos
+# da simulação em lote podem importar este módulo sem abrir uma janela.
+if __name__ == "__main__":
+    marcar_etapa("imports e definições")
+    janela = tk.Tk()
+    janela.title("Mini-JFLAP em Python v11")
+    janela.geometry("900x700")
+
+
+    # --- Menu ---
+    menu_bar = tk.Menu(janela)
+    menu_arquivo = tk.Menu(menu_bar, tearoff=0)
+    menu_arquivo.add_command(label="Novo", command=novo_automato)
+    menu_arquivo.add_command(label="Abrir", command=abrir_automato)
+    menu_arquivo.add_command(label="Salvar", command=salvar)
+    menu_arquivo.add_command(label="Salvar como...", command=salvar_como)
+    menu_arquivo.add_separator()
+    menu_arquivo.add_command(label="Sair", command=janela.quit)
+    menu_bar.add_cascade(label="Arquivo", menu=menu_arquivo)
+    # --- NOVO: Menu Tipo de Autômato ---
+    menu_tipo = tk.Menu(menu_bar, tearoff=0)
+    menu_tipo.add_command(label="Autômato Finito Determinístico (AFD)", command=lambda: definir_tipo_automato("AFD"))
+    menu_tipo.add_command(label="Autômato Finito Não Determinístico (AFN)", command=lambda: definir_tipo_automato("AFN"))
+    menu_tipo.add_command(label="Autômato Finito Não Determinístico com ε (AFNe)", command=lambda: definir_tipo_automato("AFNe"))
+    menu_tipo.add_separator() # Separador visual
+    menu_tipo.add_command(label="Máquina de Mealy", command=lambda: definir_tipo_automato("Mealy"))
+    menu_tipo.add_command(label="Máquina de Moore", command=lambda: definir_tipo_automato("Moore"))
+    menu_tipo.add_separator() # Separador visual
+    menu_tipo.add_command(label="Autômato com Pilha (AP)", command=lambda: definir_tipo_automato("AP")) # v13
+    menu_tipo.add_command(label="Máquina de Turing [EM BREVE]", state="disabled")
+    menu_bar.add_cascade(label="Tipo de Autômato", menu=menu_tipo)
+    # --- Menu Simulação ---
+    menu_simulacao = tk.Menu(menu_bar, tearoff=0)
+    menu_simulacao.add_command(label="Simular arquivo...", command=simular_arquivo)
+    menu_simulacao.add_command(label="Transduzir arquivo (Mealy/Moore)...", command=transduzir_arquivo)
+    menu_simulacao.add_command(label="Paralelismo do lote...", command=configurar_lote)
+    menu_simulacao.add_separator()
+    var_motor_AFN = tk.StringVar(value=motor_AFN)
+    menu_simulacao.add_radiobutton(label="Motor AFN/AFNe: conjuntos", variable=var_motor_AFN, value="conjuntos", command=lambda: definir_motor_AFN("conjuntos"))
+    menu_simulacao.add_radiobutton(label="Motor AFN/AFNe: bitset", variable=var_motor_AFN, value="bitset", command=lambda: definir_motor_AFN("bitset"))
+    menu_simulacao.add_radiobutton(label="Motor AFN/AFNe: AFD preguiçoso (cache)", variable=var_motor_AFN, value="preguicoso", command=lambda: definir_motor_AFN("preguicoso"))
+    menu_simulacao.add_command(label="Limite do cache de determinização...", command=definir_limite_cache_determinizacao)
+    menu_simulacao.add_command(label="Estatísticas do cache...", command=mostrar_estatisticas_cache)
+    menu_simulacao.add_separator()
+    var_aceitacao_AP = tk.StringVar(value=config_AP["modo_aceitacao"])
+    menu_simulacao.add_radiobutton(label="AP aceita por estado final", variable=var_aceitacao_AP, value="estado_final", command=lambda: definir_modo_aceitacao_AP("estado_final"))
+    menu_simulacao.add_radiobutton(label="AP aceita por pilha vazia", variable=var_aceitacao_AP, value="pilha_vazia", command=lambda: definir_modo_aceitacao_AP("pilha_vazia"))
+    menu_simulacao.add_command(label="Limites do AP...", command=configurar_limites_AP)
+    menu_bar.add_cascade(label="Simulação", menu=menu_simulacao)
+    # --- Menu Ferramentas ---
+    menu_ferramentas = tk.Menu(menu_bar, tearoff=0)
+    menu_ferramentas.add_command(label="Converter AFN/AFNe para AFD", command=converter_para_AFD)
+    menu_ferramentas.add_command(label="Minimizar AFD (Hopcroft)", command=minimizar_AFD)
+    menu_ferramentas.add_separator()
+    menu_ferramentas.add_command(label="Limites do histórico...", command=configurar_historico)
+    menu_bar.add_cascade(label="Ferramentas", menu=menu_ferramentas)
+    # --- Menu Visualizar ---
+    menu_visualizar = tk.Menu(menu_bar, tearoff=0)
+    menu_visualizar.add_command(label="Aumentar zoom", command=lambda: definir_zoom(zoom_atual * 1.2))
+    menu_visualizar.add_command(label="Diminuir zoom", command=lambda: definir_zoom(zoom_atual / 1.2))
+    menu_visualizar.add_command(label="Zoom 100%", command=lambda: definir_zoom(1.0))
+    menu_visualizar.add_command(label="Enquadrar autômato", command=enquadrar_automato)
+    menu_bar.add_cascade(label="Visualizar", menu=menu_visualizar)
+    janela.config(menu=menu_bar)
+    marcar_etapa("janela e menus")
+
+
+
+    # --- Toolbar ---
+    toolbar = tk.Frame(janela, bd=1, relief=tk.RAISED)
+    toolbar.pack(side=tk.TOP, fill=tk.X, padx=2, pady=2)
+    icones = {}
+    try:
+        nomes_icones = ["selecionar", "estado", "transicao", "apagar", "salvar", "desfazer", "refazer"] # <-- NOVOS ÍCONES v11 e v12
+        for nome in nomes_icones:
+            icones[nome] = carregar_icone(nome)
+        usar_icones = True
+    except Exception as e:
+        print(f"Aviso: Ícones não carregados. Usando texto. (Erro: {e})")
+        usar_icones = False
+    marcar_etapa("ícones")
+
+    def criar_botao_toolbar(parent, nome_icone, texto, comando):
+        icone = icones.get(nome_icone)
+        if usar_icones and icone:
+            btn = tk.Button(parent, image=icone, relief=tk.FLAT, command=comando, width=30, height=30)
+        else:
+            btn = tk.Button(parent, text=texto, relief=tk.FLAT, command=comando)
+        btn.pack(side=tk.LEFT, padx=2, pady=2)
+        return btn
+
+    btn_estado = criar_botao_toolbar(toolbar, "estado", "Estado", ativar_modo_arrastar)
+    btn_transicao = criar_botao_toolbar(toolbar, "transicao", "Transição", ativar_modo_transicao)
+    btn_selecionar = criar_botao_toolbar(toolbar, "selecionar", "Selecionar", ativar_modo_selecao) # <-- NOVO BOTÃO v11
+    btn_apagar = criar_botao_toolbar(toolbar, "apagar", "Apagar", ativar_modo_apagar)
+    tk.Frame(toolbar, height=30, width=2, bg="grey").pack(side=tk.LEFT, padx=5, pady=2)
+    btn_desfazer = criar_botao_toolbar(toolbar, "desfazer", "Desfazer", desfazer_acao) # <-- NOVO BOTÃO v12
+    btn_refazer = criar_botao_toolbar(toolbar, "refazer", "Refazer", refazer_acao) # <-- NOVO BOTÃO v12
+    tk.Frame(toolbar, height=30, width=2, bg="grey").pack(side=tk.LEFT, padx=5, pady=2)
+    btn_salvar = criar_botao_toolbar(toolbar, "salvar", "Salvar", salvar)
+
+
+
+    # --- Canvas ---
+    # confine=False deixa a vista ser deslocada livremente (não há scrollregion fixa)
+    canvas = tk.Canvas(janela, bg="white", highlightthickness=1, highlightbackground="black", confine=False) # Borda preta
+    canvas.pack(fill="both", expand=True, padx=10, pady=10) # Expande para preencher o espaço disponível
+    # Os tratadores recebem coordenadas do mundo (ver no_mundo), independentes de zoom e deslocamento
+    canvas.bind("<ButtonPress-1>", no_mundo(iniciar_movimento)) # Clique com o botão esquerdo
+    canvas.bind("<Double-Button-1>", no_mundo(gerenciar_clique_duplo)) # Duplo clique com o botão esquerdo
+    canvas.bind("<B1-Motion>", no_mundo(arrastar_objeto)) # Arrasta com o botão esquerdo
+    canvas.bind("<ButtonRelease-1>", no_mundo(finalizar_arraste)) # Solta o botão esquerdo
+    canvas.bind("<Button-2>", iniciar_deslocamento)  # Botão do meio: cancela transição e desloca a vista
+    canvas.bind("<B2-Motion>", deslocar_com_mouse)
+    canvas.bind("<Button-3>", no_mundo(mostrar_menu_contexto)) # Botão direito para menu de contexto
+    canvas.bind("<MouseWheel>", zoom_com_roda) # Roda do mouse: zoom (Windows/macOS)
+    canvas.bind("<Button-4>", zoom_com_roda)   # Roda do mouse no Linux
+    canvas.bind("<Button-5>", zoom_com_roda)
+    canvas.bind("<Configure>", agendar_atualizacao_vista) # Janela redimensionada
+    janela.bind("<Key>", gerenciar_atalhos_teclado) # Atalhos de teclado
+    janela.bind("<Control-s>", atalho_salvar) # Atalho Ctrl+S para salvar
+    janela.bind("<Control-z>", desfazer_acao) # Atalho Ctrl+Z para desfazer
+    janela.bind("<Control-y>", refazer_acao) # Atalho Ctrl+Y para refazer
+
+
+    # --- Painel Inferior (Status Bar) ---
+    status_bar = tk.Frame(janela, bd=1, relief=tk.SUNKEN)
+    status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+    # NOVO: Label da esquerda para o status permanente (modo e tipo)
+    status_modo = tk.Label(status_bar, text="", bd=1, relief=tk.FLAT, anchor=tk.W)
+    status_modo.pack(side=tk.LEFT, padx=5, pady=2)
+    # NOVO: Label da direita para as ações temporárias
+    status_acao = tk.Label(status_bar, text="Bem-vindo!", bd=1, relief=tk.FLAT, anchor=tk.E)
+    status_acao.pack(side=tk.RIGHT, padx=5, pady=2)
+
+    # --- Painel de Simulação ---
+    painel_simulacao = tk.Frame(janela)
+    painel_simulacao.pack(side=tk.BOTTOM, fill="x", padx=10, pady=5)
+    tk.Label(painel_simulacao, text="Palavra:", font=("Arial", 10)).pack(side=tk.LEFT, padx=5)
+    input_entry = tk.Entry(painel_simulacao, width=40)
+    input_entry.pack(side=tk.LEFT, padx=5)
+    botao_simular = tk.Button(painel_simulacao, text="Simular", command=simular_palavra)
+    botao_simular.pack(side=tk.LEFT, padx=5)
+    botao_pausar = tk.Button(painel_simulacao, text="Executar", width=8, command=executar_ou_pausar_simulacao)
+    botao_pausar.pack(side=tk.LEFT, padx=2)
+    tk.Button(painel_simulacao, text="Passo", command=passo_simulacao).pack(side=tk.LEFT, padx=2)
+    tk.Button(painel_simulacao, text="Até o fim", command=simular_ate_o_fim).pack(side=tk.LEFT, padx=2)
+    escala_atraso = tk.Scale(painel_simulacao, from_=1500, to=0, resolution=50, orient=tk.HORIZONTAL, length=120,
+                             showvalue=False, label="Velocidade", command=definir_atraso_simulacao)
+    escala_atraso.set(config_simulacao["atraso_ms"])
+    escala_atraso.pack(side=tk.LEFT, padx=5)
+    botao_simular_arquivo = tk.Button(painel_simulacao, text="Simular arquivo...", command=simular_arquivo)
+    botao_simular_arquivo.pack(side=tk.LEFT, padx=5)
+    resultado = tk.Label(painel_simulacao, text="", font=("Arial", 12, "bold"))
+    resultado.pack(side=tk.LEFT, padx=10)
+    sequencia_saida = tk.Label(painel_simulacao, text="Saída: ", font=("Arial", 12))  
+    sequencia_saida.pack(side=tk.LEFT, padx=10)
+
+    # --- NOVO: Painel de Visualização da Pilha ---
+    painel_pilha = tk.Frame(janela, bd=1, relief=tk.SUNKEN)
+    painel_pilha.pack(side=tk.BOTTOM, fill=tk.X, padx=10, pady=5)
+    tk.Label(painel_pilha, text="Pilha:", font=("Arial", 10, "bold")).pack(side=tk.LEFT, padx=5)
+    label_pilha = tk.Label(painel_pilha, text="[]", font=("Courier", 10), anchor=tk.W)
+    label_pilha.pack(fill=tk.X, padx=5)
+
+
+    ativar_modo_arrastar()
+    marcar_etapa("painéis e canvas")
+
+    def inicializacao_concluida():
+        marcar_etapa("janela na tela")
+        print(relatorio_inicializacao())
+    janela.after_idle(inicializacao_concluida)
+    janela.mainloop() # Inicia o loop principal da interface gráfica
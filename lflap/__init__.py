@@ -0,0 +1,14 @@
+"""
+Núcleo do Mini-JFLAP sem interface gráfica: modelo do autômato, motores de simulação,
+formatos de arquivo e simulação em lote. Nada aqui importa tkinter ou PIL, então pode
+rodar em servidores sem tela (ver 'python -m lflap --help').
+"""
+from lflap.modelo import EstadoModelo, TransicaoModelo, novo_modelo, montar_modelo
+from lflap.motores import TabelasSimulacao, criar_simulador
+from lflap.formatos import carregar_modelo
+from lflap.lote import criar_simulador_do_modelo
+
+__all__ = [
+    "EstadoModelo", "TransicaoModelo", "novo_modelo", "montar_modelo",
+    "TabelasSimulacao", "criar_simulador", "carregar_modelo", "criar_simulador_do_modelo",
+]
@@ -0,0 +1,171 @@
+"""
+Linha de comando do Mini-JFLAP, sem interface gráfica:
+
+    python -m lflap simular automato.json palavras.txt --tipo AFD
+    python -m lflap simulate automato.jff palavras.txt --type AFN --motor bitset -o resultado.csv
+    python -m lflap transduzir maquina.json entrada.log --tipo Mealy -o saida.log --rastro passos.csv
+
+'simular' escreve uma linha 'Palavra;Resultado;Saída' por palavra (o mesmo formato do "Simular
+arquivo..." do editor). 'transduzir' passa o arquivo inteiro, como uma só palavra, por uma Máquina de
+Mealy/Moore e escreve a saída à medida que lê; com --rastro, grava também o relatório passo a passo
+(o mesmo .csv do editor). Os dois deixam um resumo na saída de erros.
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+
+from lflap.formatos import carregar_modelo
+from lflap.lote import criar_simulador_do_modelo, ler_blocos_de_palavras, simular_blocos_em_paralelo
+from lflap.motores import CONFIG_AP_PADRAO, MOTORES_AFN, TAMANHO_BLOCO_TRANSDUTOR, TabelasSimulacao, transduzir_fluxo
+from lflap.rastro import RastroSimulacao
+
+TIPOS = ("AFD", "AFN", "AFNe", "Mealy", "Moore", "AP")
+
+def _criar_parser():
+    parser = argparse.ArgumentParser(prog="python -m lflap", description="Mini-JFLAP sem interface gráfica.")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    simular = comandos.add_parser("simular", aliases=["simulate"], help="Simula um arquivo de palavras (uma por linha).")
+    simular.add_argument("automato", help="Autômato em .json, .jff ou .lfab")
+    simular.add_argument("palavras", help="Arquivo com uma palavra por linha ('-' lê da entrada padrão)")
+    simular.add_argument("--tipo", "--type", choices=TIPOS,
+                         help="Tipo do autômato (padrão: o do arquivo; AFNe se o arquivo não disser)")
+    simular.add_argument("--motor", "--engine", choices=MOTORES_AFN, default="conjuntos", help="Motor de AFN/AFNe")
+    simular.add_argument("-o", "--saida", help="Arquivo .csv de saída (padrão: saída padrão)")
+    simular.add_argument("-p", "--processos", type=int, default=1, help="Processos da simulação em lote (padrão: 1)")
+    simular.add_argument("--bloco", type=int, default=5000, help="Palavras enviadas a cada processo por vez")
+    simular.add_argument("--aceitacao-ap", choices=("estado_final", "pilha_vazia"), default=CONFIG_AP_PADRAO["modo_aceitacao"])
+    simular.add_argument("--pilha-inicial", default=CONFIG_AP_PADRAO["simbolo_inicial_pilha"], help="Símbolo inicial da pilha do AP")
+
+    transduzir = comandos.add_parser("transduzir", aliases=["transduce"],
+                                     help="Passa um arquivo por uma Máquina de Mealy/Moore, em blocos.")
+    transduzir.add_argument("automato", help="Máquina em .json, .jff ou .lfab")
+    transduzir.add_argument("entrada", help="Arquivo de entrada ('-' lê da entrada padrão)")
+    transduzir.add_argument("--tipo", "--type", choices=("Mealy", "Moore"),
+                            help="Tipo da máquina (padrão: o do arquivo)")
+    transduzir.add_argument("-o", "--saida", help="Arquivo de saída (padrão: saída padrão)")
+    transduzir.add_argument("--bloco", type=int, default=TAMANHO_BLOCO_TRANSDUTOR, help="Caracteres lidos por vez")
+    transduzir.add_argument("--ignorar-quebras", action="store_true",
+                            help="Não lê as quebras de linha (\\r, \\n) como símbolos")
+    transduzir.add_argument("--rastro", "--trace", metavar="ARQUIVO_CSV",
+                            help="Grava também o passo a passo (Passo;Estado Atual;...) neste .csv")
+    return parser
+
+def _abrir_entrada_e_saida(caminho_entrada, caminho_saida, **opcoes_saida):
+    """Abre os arquivos (ou usa stdin/stdout). Retorna (entrada, saida) ou None, já avisando o erro."""
+    try:
+        entrada = sys.stdin if caminho_entrada == "-" else open(caminho_entrada, "r", encoding="utf-8-sig")
+    except OSError as e:
+        print(f"Erro ao abrir '{caminho_entrada}': {e}", file=sys.stderr)
+        return None
+    try:
+        saida = open(caminho_saida, "w", **opcoes_saida) if caminho_saida else sys.stdout
+    except OSError as e:
+        if entrada is not sys.stdin: entrada.close()
+        print(f"Erro ao criar '{caminho_saida}': {e}", file=sys.stderr)
+        return None
+    return entrada, saida
+
+def _fechar(entrada, saida):
+    if entrada is not sys.stdin: entrada.close()
+    if saida is not sys.stdout: saida.close()
+
+def _carregar(caminho, tipo, **opcoes):
+    """carregar_modelo com as mensagens de erro da linha de comando. Retorna (modelo, estado_inicial) ou None."""
+    try:
+        modelo = carregar_modelo(caminho, tipo, **opcoes)
+    except (OSError, ValueError) as e: # carregar_modelo converte todo conteúdo malformado em ValueError
+        print(f"Erro ao carregar '{caminho}': {e}", file=sys.stderr)
+        return None
+    estado_inicial = next((e for e in modelo["estados"] if e.inicial), None)
+    if estado_inicial is None:
+        print("O autômato não possui estado inicial.", file=sys.stderr)
+        return None
+    return modelo, estado_inicial
+
+def simular(args):
+    config_AP = dict(CONFIG_AP_PADRAO, modo_aceitacao=args.aceitacao_ap, simbolo_inicial_pilha=args.pilha_inicial)
+    carregado = _carregar(args.automato, args.tipo, motor_AFN=args.motor, config_AP=config_AP)
+    if carregado is None: return 1
+    modelo, _ = carregado
+    simulador = criar_simulador_do_modelo(modelo)
+    if simulador is None:
+        print(f"A simulação ainda não suporta o tipo {modelo['tipo']}.", file=sys.stderr)
+        return 1
+
+    inicio = time.perf_counter()
+    total, aceitas = 0, 0
+    # Em arquivo, utf-8-sig como o editor (para o Excel); na saída padrão, sem BOM
+    arquivos = _abrir_entrada_e_saida(args.palavras, args.saida, encoding="utf-8-sig", newline="")
+    if arquivos is None: return 1
+    entrada, saida = arquivos
+    try:
+        writer = csv.writer(saida, delimiter=';', lineterminator="\n")
+        writer.writerow(["Palavra", "Resultado", "Saída"])
+        blocos = ler_blocos_de_palavras(entrada, max(1, args.bloco))
+        if args.processos > 1:
+            resultados_por_bloco = simular_blocos_em_paralelo(modelo, blocos, args.processos)
+        else:
+            resultados_por_bloco = ((bloco, [simulador(p) for p in bloco]) for bloco in blocos)
+        for bloco, resultados_bloco in resultados_por_bloco:
+            for palavra, (res, texto_saida) in zip(bloco, resultados_bloco):
+                writer.writerow([palavra, res, texto_saida])
+                if res in ("aceita", "concluída"): aceitas += 1
+            total += len(bloco)
+    finally:
+        _fechar(entrada, saida)
+    duracao = time.perf_counter() - inicio
+    print(f"{total} palavras simuladas ({aceitas} aceitas/concluídas) em {duracao:.3f} s [{modelo['tipo']}]", file=sys.stderr)
+    return 0
+
+def transduzir(args):
+    carregado = _carregar(args.automato, args.tipo)
+    if carregado is None: return 1
+    modelo, estado_inicial = carregado
+    if modelo["tipo"] not in ("Mealy", "Moore"):
+        print(f"O modo transdutor é para Máquinas de Mealy/Moore, não {modelo['tipo']} (use --tipo).", file=sys.stderr)
+        return 1
+    tabela = TabelasSimulacao(modelo["estados"], modelo["transicoes"]).tabela_transdutor(modelo["tipo"])
+
+    inicio = time.perf_counter()
+    arquivos = _abrir_entrada_e_saida(args.entrada, args.saida, encoding="utf-8", newline="")
+    if arquivos is None: return 1
+    entrada, saida = arquivos
+    rastro = RastroSimulacao(primeiro_passo=0 if modelo["tipo"] == "Moore" else 1) if args.rastro else None
+    try:
+        concluida, lidos, estado_final, simbolo_preso = transduzir_fluxo(
+            tabela, estado_inicial, entrada, saida, modelo["tipo"], max(1, args.bloco),
+            "\r\n" if args.ignorar_quebras else "", rastro=rastro)
+    finally:
+        _fechar(entrada, saida)
+    if rastro is not None:
+        with rastro:
+            try:
+                with open(args.rastro, "w", encoding="utf-8-sig", newline="") as f:
+                    rastro.escrever_csv(f, [["Arquivo de Entrada", args.entrada],
+                                            ["Arquivo de Saída", args.saida or "(saída padrão)"]])
+            except OSError as e:
+                print(f"Erro ao gravar o rastro em '{args.rastro}': {e}", file=sys.stderr)
+                return 1
+    duracao = time.perf_counter() - inicio
+    if not concluida:
+        print(f"Parou no símbolo {lidos + 1} ({simbolo_preso!r}): o estado '{estado_final.nome}' não tem transição para ele.", file=sys.stderr)
+        return 1
+    print(f"{lidos} símbolos transduzidos em {duracao:.3f} s, estado final '{estado_final.nome}' [{modelo['tipo']}]", file=sys.stderr)
+    return 0
+
+def main(argv=None):
+    args = _criar_parser().parse_args(argv)
+    try:
+        if args.comando in ("simular", "simulate"):
+            return simular(args)
+        if args.comando in ("transduzir", "transduce"):
+            return transduzir(args)
+    except BrokenPipeError: # Saída fechada antes do fim (ex.: '| head'); não há mais onde escrever
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,362 @@
+"""
+Leitura e escrita dos formatos de arquivo (.json, .jff do JFLAP e o binário .lfab) sem depender do Tk.
+"""
+import json
+import mmap
+import struct
+import sys
+from array import array
+from html import escape # Serve para XML (texto e atributos) e é bem mais leve de importar que xml.sax.saxutils
+
+from lflap.modelo import EstadoModelo, TransicaoModelo, novo_modelo, montar_modelo
+
+# --- JSON (.json) ---
+def ler_json(caminho_arquivo):
+    """
+    Lê o .json salvo pelo editor e devolve (estados, transicoes) como dicionários completos, no
+    mesmo formato de ler_jff (com "nome" no lugar de "id" como chave dos estados).
+    Conteúdo fora do formato vira ValueError, antes de qualquer coisa ser montada.
+    """
+    with open(caminho_arquivo, "r", encoding="utf-8") as f:
+        dados = json.load(f)
+    try:
+        lista_estados = [{
+            "nome": str(e["nome"]), "x": float(e["x"]), "y": float(e["y"]),
+            "inicial": bool(e.get("inicial")), "aceitacao": bool(e.get("aceitacao")),
+            "simbolo_saida": str(e.get("simbolo_saida", "")),
+        } for e in dados["estados"]]
+        lista_transicoes = []
+        for t in dados["transicoes"]:
+            simbolos = t.get("simbolos_entrada", ["ε"])
+            if isinstance(simbolos, str): simbolos = [s.strip() for s in simbolos.split(',')]
+            lista_transicoes.append({
+                "origem": str(t["origem"]), "destino": str(t["destino"]), "simbolos_entrada": [str(s) for s in simbolos],
+                "simbolo_saida": str(t.get("simbolo_saida", "")),
+                "para_desempilhar": str(t.get("para_desempilhar", "ε")), "para_empilhar": str(t.get("para_empilhar", "ε")),
+                "offset_x": float(t.get("offset_x", 0)), "offset_y": float(t.get("offset_y", 0)),
+            })
+    except (KeyError, TypeError, AttributeError, ValueError) as e:
+        raise ValueError(f"JSON fora do formato do Mini-JFLAP: {e!r}") from e
+    return lista_estados, lista_transicoes
+
+# --- JFLAP (.jff) ---
+# Tipo do Mini-JFLAP -> <type> do JFLAP
+TIPO_JFLAP = {"AFD": "fa", "AFN": "fa", "AFNe": "fa", "Mealy": "mealy", "Moore": "moore", "AP": "pda"}
+# <type> do JFLAP -> tipo do Mini-JFLAP ("fa" serve para AFD, AFN e AFNe e fica a critério de quem lê)
+TIPO_DO_JFLAP = {"mealy": "Mealy", "moore": "Moore", "pda": "AP"}
+
+def _vazio_se_epsilon(texto):
+    """No JFLAP a palavra vazia é uma tag sem texto; aqui ela é 'ε' (ou 'λ')."""
+    return "" if texto in ("ε", "λ", "") else texto
+
+def escrever_jff(arquivo, lista_estados, lista_transicoes, tipo):
+    """
+    Escreve o autômato em formato JFLAP (.jff) direto no arquivo, linha a linha, sem montar a árvore XML.
+    Cada símbolo de entrada vira um <transition> (o JFLAP só aceita um por transição), com a saída de
+    Mealy (<transout>), a de Moore no estado (<output>) e, no AP, <pop>/<push>.
+    """
+    def tag(nivel, nome, texto):
+        recuo = "\t" * nivel
+        texto = _vazio_se_epsilon(texto)
+        if texto:
+            arquivo.write(f"{recuo}<{nome}>{escape(texto)}</{nome}>\n")
+        else:
+            arquivo.write(f"{recuo}<{nome}/>\n")
+
+    arquivo.write('<?xml version="1.0" encoding="UTF-8" standalone="no"?><!--Created with Mini-JFLAP-->\n')
+    arquivo.write("<structure>\n")
+    arquivo.write(f"\t<type>{TIPO_JFLAP.get(tipo, 'fa')}</type>\n")
+    arquivo.write("\t<automaton>\n")
+    arquivo.write("\t\t<!--The list of states.-->\n")
+    estado_para_id = {}
+    for i, estado in enumerate(lista_estados):
+        estado_para_id[estado] = i
+        arquivo.write(f'\t\t<state id="{i}" name="{escape(estado.nome)}">\n')
+        arquivo.write(f"\t\t\t<x>{float(estado.x)}</x>\n")
+        arquivo.write(f"\t\t\t<y>{float(estado.y)}</y>\n")
+        if estado.inicial:
+            arquivo.write("\t\t\t<initial/>\n")
+        if estado.aceitacao:
+            arquivo.write("\t\t\t<final/>\n")
+        if tipo == "Moore":
+            tag(3, "output", estado.simbolo_saida)
+        arquivo.write("\t\t</state>\n")
+
+    arquivo.write("\t\t<!--The list of transitions.-->\n")
+    for transicao in lista_transicoes:
+        origem_id = estado_para_id.get(transicao.origem)
+        destino_id = estado_para_id.get(transicao.destino)
+        if origem_id is None or destino_id is None: continue
+        for simbolo in transicao.simbolos_entrada or ["ε"]:
+            arquivo.write("\t\t<transition>\n")
+            arquivo.write(f"\t\t\t<from>{origem_id}</from>\n")
+            arquivo.write(f"\t\t\t<to>{destino_id}</to>\n")
+            tag(3, "read", simbolo)
+            if tipo == "Mealy":
+                tag(3, "transout", transicao.simbolo_saida)
+            elif tipo == "AP":
+                tag(3, "pop", transicao.para_desempilhar)
+                tag(3, "push", transicao.para_empilhar)
+            arquivo.write("\t\t</transition>\n")
+    arquivo.write("\t</automaton>\n")
+    arquivo.write("</structure>\n")
+
+def ler_jff(caminho_arquivo):
+    """
+    Lê um .jff com iterparse, liberando cada <state>/<transition> assim que é consumido, e devolve
+    (tipo_jflap, estados, transicoes) como dicionários simples, sem tocar no canvas.
+    Transições com a mesma origem, destino e saída (ou pilha, no AP) viram uma só, com vários símbolos.
+    XML malformado vira ValueError, como os outros erros de conteúdo de carregar_modelo.
+    """
+    tipo_jflap = "fa"
+    lista_estados, por_chave = [], {}
+    import xml.etree.ElementTree as ET # Só quem lê .jff paga a importação
+    pilha = [] # Elementos abertos; o pai de cada <state>/<transition> é pilha[-1] no 'end'
+    try:
+        for evento, elem in ET.iterparse(caminho_arquivo, events=("start", "end")):
+            if evento == "start":
+                pilha.append(elem)
+                continue
+            pilha.pop()
+            if elem.tag == "type":
+                tipo_jflap = (elem.text or "fa").strip()
+            elif elem.tag == "state":
+                lista_estados.append({
+                    "id": elem.get("id"), "nome": elem.get("name") or f"q{elem.get('id')}",
+                    "x": float(elem.findtext("x") or 50), "y": float(elem.findtext("y") or 50),
+                    "inicial": elem.find("initial") is not None, "aceitacao": elem.find("final") is not None,
+                    "simbolo_saida": elem.findtext("output") or "",
+                })
+            elif elem.tag == "transition":
+                # Tag vazia (<read/>) é a palavra vazia
+                chave = (elem.findtext("from"), elem.findtext("to"), elem.findtext("transout") or "",
+                         elem.findtext("pop") or "ε", elem.findtext("push") or "ε")
+                simbolo = elem.findtext("read") or "ε"
+                simbolos = por_chave.setdefault(chave, [])
+                if simbolo not in simbolos: simbolos.append(simbolo)
+            else:
+                continue
+            elem.clear()
+            if pilha: pilha[-1].remove(elem) # Os anteriores já saíram, então a busca em remove() é imediata
+    except ET.ParseError as e:
+        raise ValueError(f"XML inválido: {e}") from e
+
+    lista_transicoes = [{"origem": o, "destino": d, "simbolos_entrada": simbolos, "simbolo_saida": saida,
+                         "para_desempilhar": desempilha, "para_empilhar": empilha}
+                        for (o, d, saida, desempilha, empilha), simbolos in por_chave.items()]
+    return tipo_jflap, lista_estados, lista_transicoes
+
+# --- Formato Binário Compacto (.lfab) ---
+# Tudo little-endian; cada seção começa alinhada em 8 bytes, na ordem de _secoes_binarias.
+#   cabeçalho: "LFAB", versão, (reservado), tipo, qtd_simbolos, tamanho_textos, qtd_estados, qtd_transicoes, qtd_entradas
+#   símbolos internados: cada texto (nomes, símbolos, saídas, pilha) aparece uma vez só e é
+#   referenciado pelo índice; o índice 0 é sempre "".
+#   estados e transições: um array compacto por campo (u32 = índice de símbolo, f32 = coordenada).
+#   Os símbolos de entrada de cada transição ficam em 'trans_entradas', de inicio[i] até inicio[i + 1].
+MAGICO_BINARIO = b"LFAB"
+VERSAO_BINARIO = 1
+_CABECALHO_BINARIO = struct.Struct("<4sHHIIIIII")
+_TAMANHO_ITEM = {"I": 4, "B": 1, "f": 4}
+FLAG_INICIAL, FLAG_ACEITACAO = 1, 2
+
+def _secoes_binarias(qtd_simbolos, tamanho_textos, qtd_estados, qtd_transicoes, qtd_entradas):
+    """Calcula {nome: (código do array, quantidade, deslocamento)} e o tamanho total do arquivo."""
+    campos = [
+        ("simbolos_inicio", "I", qtd_simbolos + 1), ("textos", "B", tamanho_textos),
+        ("estado_nome", "I", qtd_estados), ("estado_saida", "I", qtd_estados),
+        ("estado_flags", "B", qtd_estados), ("estado_coords", "f", 2 * qtd_estados),
+        ("trans_origem", "I", qtd_transicoes), ("trans_destino", "I", qtd_transicoes),
+        ("trans_saida", "I", qtd_transicoes), ("trans_desempilha", "I", qtd_transicoes),
+        ("trans_empilha", "I", qtd_transicoes), ("trans_entradas_inicio", "I", qtd_transicoes + 1),
+        ("trans_entradas", "I", qtd_entradas), ("trans_desvios", "f", 2 * qtd_transicoes),
+    ]
+    secoes, posicao = {}, _CABECALHO_BINARIO.size
+    for nome, codigo, quantidade in campos:
+        posicao = (posicao + 7) & ~7
+        secoes[nome] = (codigo, quantidade, posicao)
+        posicao += quantidade * _TAMANHO_ITEM[codigo]
+    return secoes, posicao
+
+def salvar_binario(caminho, lista_estados, lista_transicoes, tipo):
+    """Grava o autômato no formato .lfab. Estados precisam de x/y; transições de offset_x/offset_y."""
+    simbolos = {"": 0}
+    def internar(texto):
+        indice = simbolos.get(texto)
+        if indice is None:
+            indice = simbolos[texto] = len(simbolos)
+        return indice
+
+    indice_estado = {e: i for i, e in enumerate(lista_estados)}
+    arrays = {
+        "estado_nome": array("I", (internar(e.nome) for e in lista_estados)),
+        "estado_saida": array("I", (internar(e.simbolo_saida) for e in lista_estados)),
+        "estado_flags": array("B", ((FLAG_INICIAL if e.inicial else 0) | (FLAG_ACEITACAO if e.aceitacao else 0) for e in lista_estados)),
+        "estado_coords": array("f"),
+    }
+    for e in lista_estados:
+        arrays["estado_coords"].extend((e.x, e.y))
+    for nome in ("trans_origem", "trans_destino", "trans_saida", "trans_desempilha", "trans_empilha", "trans_entradas"):
+        arrays[nome] = array("I")
+    arrays["trans_entradas_inicio"] = array("I", [0])
+    arrays["trans_desvios"] = array("f")
+    for t in lista_transicoes:
+        arrays["trans_origem"].append(indice_estado[t.origem])
+        arrays["trans_destino"].append(indice_estado[t.destino])
+        arrays["trans_saida"].append(internar(t.simbolo_saida))
+        arrays["trans_desempilha"].append(internar(t.para_desempilhar))
+        arrays["trans_empilha"].append(internar(t.para_empilhar))
+        arrays["trans_entradas"].extend(internar(s) for s in t.simbolos_entrada)
+        arrays["trans_entradas_inicio"].append(len(arrays["trans_entradas"]))
+        arrays["trans_desvios"].extend((t.offset_x, t.offset_y))
+    indice_tipo = internar(tipo)
+
+    textos_codificados = [texto.encode("utf-8") for texto in simbolos] # dict mantém a ordem dos índices
+    arrays["simbolos_inicio"] = array("I", [0])
+    for codificado in textos_codificados:
+        arrays["simbolos_inicio"].append(arrays["simbolos_inicio"][-1] + len(codificado))
+    arrays["textos"] = array("B", b"".join(textos_codificados))
+
+    secoes, tamanho_total = _secoes_binarias(len(simbolos), len(arrays["textos"]), len(lista_estados),
+                                             len(lista_transicoes), len(arrays["trans_entradas"]))
+    with open(caminho, "wb") as f:
+        f.write(_CABECALHO_BINARIO.pack(MAGICO_BINARIO, VERSAO_BINARIO, 0, indice_tipo, len(simbolos), len(arrays["textos"]),
+                                        len(lista_estados), len(lista_transicoes), len(arrays["trans_entradas"])))
+        for nome, (codigo, quantidade, deslocamento) in secoes.items():
+            f.write(b"\0" * (deslocamento - f.tell()))
+            dados = arrays[nome]
+            if sys.byteorder != "little":
+                dados = array(codigo, dados)
+                dados.byteswap()
+            f.write(dados.tobytes())
+        f.write(b"\0" * (tamanho_total - f.tell()))
+
+class AutomatoBinario:
+    """
+    Leitura de um arquivo .lfab mapeado em memória (mmap). Os campos ficam como memoryviews sobre o
+    arquivo (sem cópia); os textos só são decodificados quando alguém pede. Use com 'with' ou chame fechar().
+    """
+    def __init__(self, caminho):
+        self._arquivo = open(caminho, "rb")
+        self._mapa, self._visoes = None, []
+        try:
+            self._abrir()
+        except BaseException: # Arquivo inválido: não deixa o mmap nem o arquivo abertos
+            self.fechar()
+            raise
+
+    def _abrir(self):
+        try:
+            self._mapa = mmap.mmap(self._arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError: # Arquivo vazio
+            raise ValueError("Arquivo .lfab vazio.")
+        if len(self._mapa) < _CABECALHO_BINARIO.size:
+            raise ValueError("Arquivo .lfab truncado.")
+        (magico, versao, _, indice_tipo, qtd_simbolos, tamanho_textos,
+         self.qtd_estados, self.qtd_transicoes, qtd_entradas) = _CABECALHO_BINARIO.unpack_from(self._mapa, 0)
+        if magico != MAGICO_BINARIO or versao != VERSAO_BINARIO:
+            raise ValueError("O arquivo não é um autômato .lfab compatível.")
+        secoes, tamanho_total = _secoes_binarias(qtd_simbolos, tamanho_textos, self.qtd_estados, self.qtd_transicoes, qtd_entradas)
+        if len(self._mapa) < tamanho_total:
+            raise ValueError("Arquivo .lfab truncado.")
+        visao = memoryview(self._mapa)
+        self._visoes.append(visao)
+        for nome, (codigo, quantidade, deslocamento) in secoes.items():
+            trecho = visao[deslocamento:deslocamento + quantidade * _TAMANHO_ITEM[codigo]]
+            self._visoes.append(trecho) # Liberado em fechar(); senão o mmap não fecha
+            if sys.byteorder == "little":
+                campo = trecho.cast(codigo)
+                self._visoes.append(campo)
+            else: # Máquina big-endian: copia e inverte os bytes
+                campo = array(codigo, trecho.tobytes())
+                campo.byteswap()
+            setattr(self, nome, campo)
+        self._validar(indice_tipo, qtd_simbolos, tamanho_textos, qtd_entradas)
+        self._textos = [None] * qtd_simbolos
+        self.tipo = self.texto(indice_tipo)
+
+    def _validar(self, indice_tipo, qtd_simbolos, tamanho_textos, qtd_entradas):
+        """
+        Confere os índices de cada coluna contra o tamanho da tabela a que apontam (o cabeçalho pode
+        estar certo e o conteúdo não), para que um arquivo corrompido vire ValueError e não IndexError.
+        """
+        def corrompido(motivo):
+            return ValueError(f"arquivo .lfab corrompido: {motivo}")
+        def crescente(campo, limite):
+            return campo[0] == 0 and campo[-1] <= limite and all(a <= b for a, b in zip(campo, campo[1:]))
+
+        if qtd_simbolos == 0 or indice_tipo >= qtd_simbolos:
+            raise corrompido("tabela de símbolos vazia ou tipo fora dela")
+        if not crescente(self.simbolos_inicio, tamanho_textos):
+            raise corrompido("deslocamentos dos textos fora de ordem ou além do fim")
+        for nome in ("estado_nome", "estado_saida", "trans_saida", "trans_desempilha", "trans_empilha", "trans_entradas"):
+            if max(getattr(self, nome), default=0) >= qtd_simbolos:
+                raise corrompido(f"'{nome}' aponta para um símbolo inexistente")
+        for nome in ("trans_origem", "trans_destino"):
+            if max(getattr(self, nome), default=0) >= self.qtd_estados:
+                raise corrompido(f"'{nome}' aponta para um estado inexistente")
+        if not crescente(self.trans_entradas_inicio, qtd_entradas):
+            raise corrompido("deslocamentos das entradas das transições fora de ordem ou além do fim")
+
+    def texto(self, indice):
+        """Texto do símbolo internado 'indice' (decodificado uma vez e guardado)."""
+        texto = self._textos[indice]
+        if texto is None:
+            inicio, fim = self.simbolos_inicio[indice], self.simbolos_inicio[indice + 1]
+            try:
+                texto = self._textos[indice] = bytes(self.textos[inicio:fim]).decode("utf-8")
+            except UnicodeDecodeError:
+                raise ValueError(f"arquivo .lfab corrompido: o texto {indice} não é UTF-8") from None
+        return texto
+
+    def entradas_da_transicao(self, i):
+        # Por índice, sem fatiar: uma fatia da memoryview presa num traceback impediria o mmap de fechar
+        entradas = self.trans_entradas
+        return [self.texto(entradas[j]) for j in range(self.trans_entradas_inicio[i], self.trans_entradas_inicio[i + 1])]
+
+    def modelo_simulacao(self, **opcoes):
+        """
+        Monta o modelo sem Tk (EstadoModelo/TransicaoModelo, como exportar_modelo_simulacao) direto dos arrays,
+        pronto para criar_simulador ou para os processos da simulação em lote. 'opcoes' vão para novo_modelo.
+        """
+        lista_estados = [EstadoModelo(self.texto(self.estado_nome[i]), bool(self.estado_flags[i] & FLAG_INICIAL),
+                                      bool(self.estado_flags[i] & FLAG_ACEITACAO), self.texto(self.estado_saida[i]))
+                         for i in range(self.qtd_estados)]
+        lista_transicoes = [TransicaoModelo(lista_estados[self.trans_origem[i]], lista_estados[self.trans_destino[i]],
+                                            self.entradas_da_transicao(i), self.texto(self.trans_saida[i]),
+                                            self.texto(self.trans_desempilha[i]), self.texto(self.trans_empilha[i]))
+                            for i in range(self.qtd_transicoes)]
+        return novo_modelo(self.tipo, lista_estados, lista_transicoes, **opcoes)
+
+    def fechar(self):
+        for visao in reversed(self._visoes):
+            visao.release()
+        self._visoes = []
+        if self._mapa is not None and not self._mapa.closed: self._mapa.close()
+        self._arquivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *erro):
+        self.fechar()
+
+# --- Carregamento sem Interface ---
+def carregar_modelo(caminho, tipo=None, **opcoes):
+    """
+    Lê um .json, .jff ou .lfab direto para o modelo sem Tk (ver novo_modelo).
+    'tipo' tem prioridade sobre o do arquivo; sem nenhum dos dois (o .json não guarda o tipo
+    e o "fa" do JFLAP vale para qualquer autômato finito) o padrão é AFNe, como no editor.
+    """
+    extensao = caminho.lower().rsplit(".", 1)[-1]
+    if extensao == "lfab":
+        with AutomatoBinario(caminho) as automato:
+            modelo = automato.modelo_simulacao(**opcoes)
+        modelo["tipo"] = tipo or modelo["tipo"] or "AFNe"
+        return modelo
+    if extensao == "jff":
+        tipo_jflap, dados_estados, dados_transicoes = ler_jff(caminho)
+        return montar_modelo(tipo or TIPO_DO_JFLAP.get(tipo_jflap, "AFNe"), dados_estados, dados_transicoes, chave="id", **opcoes)
+    if extensao == "json":
+        dados_estados, dados_transicoes = ler_json(caminho)
+        return montar_modelo(tipo or "AFNe", dados_estados, dados_transicoes, **opcoes)
+    raise ValueError("Formato de arquivo não reconhecido. Use .jff, .json ou .lfab.")
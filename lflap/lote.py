@@ -0,0 +1,59 @@
+"""
+Simulação em lote: leitura das palavras em blocos e distribuição dos blocos por vários processos.
+Os processos só importam o pacote lflap (sem Tk).
+"""
+from collections import deque
+
+from lflap.motores import TabelasSimulacao, criar_simulador
+
+_simulador_do_processo = None # Motor montado uma vez em cada processo da simulação em lote
+
+def criar_simulador_do_modelo(modelo):
+    """Compila o motor do modelo (ver novo_modelo). Retorna None se não há estado inicial ou motor para o tipo."""
+    estado_inicial = next((e for e in modelo["estados"] if e.inicial), None)
+    if estado_inicial is None: return None
+    tabelas = TabelasSimulacao(modelo["estados"], modelo["transicoes"],
+                               limite_cache_determinizacao=modelo["limite_cache_determinizacao"])
+    return criar_simulador(modelo["tipo"], estado_inicial, tabelas, modelo["motor_AFN"], modelo["config_AP"])
+
+def _inicializar_processo_lote(modelo):
+    """Roda em cada processo do pool: compila o motor do modelo recebido uma única vez."""
+    global _simulador_do_processo
+    _simulador_do_processo = criar_simulador_do_modelo(modelo)
+
+def _simular_bloco(palavras):
+    return [_simulador_do_processo(palavra) for palavra in palavras]
+
+def ler_blocos_de_palavras(entrada, tamanho_bloco):
+    """Lê o arquivo de palavras (uma por linha) em blocos de até 'tamanho_bloco' palavras."""
+    bloco = []
+    for linha in entrada:
+        bloco.append(linha.rstrip("\r\n"))
+        if len(bloco) >= tamanho_bloco:
+            yield bloco
+            bloco = []
+    if bloco:
+        yield bloco
+
+def simular_blocos_em_paralelo(modelo, blocos, processos):
+    """
+    Distribui os blocos de palavras por um ProcessPoolExecutor e devolve (bloco, resultados)
+    na mesma ordem da entrada. Mantém só alguns blocos em andamento por processo,
+    então a memória não cresce com o tamanho do arquivo.
+    """
+    # Importados aqui: só o lote em paralelo precisa deles, e pesam na abertura do editor e da linha de comando
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    # 'spawn' evita copiar (fork) o processo da interface com a conexão do Tk aberta
+    contexto = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=processos, mp_context=contexto,
+                             initializer=_inicializar_processo_lote, initargs=(modelo,)) as executor:
+        pendentes = deque()
+        for bloco in blocos:
+            pendentes.append((bloco, executor.submit(_simular_bloco, bloco)))
+            if len(pendentes) >= processos * 2:
+                bloco_pronto, futuro = pendentes.popleft()
+                yield bloco_pronto, futuro.result()
+        while pendentes:
+            bloco_pronto, futuro = pendentes.popleft()
+            yield bloco_pronto, futuro.result()
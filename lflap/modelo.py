@@ -0,0 +1,56 @@
+"""
+Modelo do autômato sem canvas, usado pela linha de comando e pelos processos da simulação em lote.
+"""
+from lflap.motores import CONFIG_AP_PADRAO, LIMITE_CACHE_DETERMINIZACAO
+
+class EstadoModelo:
+    """Estado sem canvas: só o que os motores de simulação leem. Pode ser enviado a outros processos."""
+    __slots__ = ("nome", "inicial", "aceitacao", "simbolo_saida")
+
+    def __init__(self, nome, inicial=False, aceitacao=False, simbolo_saida=""):
+        self.nome = nome
+        self.inicial = inicial
+        self.aceitacao = aceitacao
+        self.simbolo_saida = simbolo_saida
+
+class TransicaoModelo:
+    """Transição sem canvas, com os mesmos atributos lidos pelos motores."""
+    __slots__ = ("origem", "destino", "simbolos_entrada", "simbolo_saida", "para_desempilhar", "para_empilhar")
+
+    def __init__(self, origem, destino, simbolos_entrada, simbolo_saida="", para_desempilhar="ε", para_empilhar="ε"):
+        self.origem = origem
+        self.destino = destino
+        self.simbolos_entrada = simbolos_entrada
+        self.simbolo_saida = simbolo_saida
+        self.para_desempilhar = para_desempilhar
+        self.para_empilhar = para_empilhar
+
+def novo_modelo(tipo, lista_estados, lista_transicoes, motor_AFN="conjuntos",
+                limite_cache_determinizacao=LIMITE_CACHE_DETERMINIZACAO, config_AP=None):
+    """O autômato e as opções dos motores num dicionário que pode ser enviado a outros processos."""
+    return {
+        "tipo": tipo,
+        "estados": lista_estados,
+        "transicoes": lista_transicoes,
+        "motor_AFN": motor_AFN,
+        "limite_cache_determinizacao": limite_cache_determinizacao,
+        "config_AP": dict(config_AP or CONFIG_AP_PADRAO),
+    }
+
+def montar_modelo(tipo, dados_estados, dados_transicoes, chave="nome", **opcoes):
+    """
+    Monta o modelo a partir de dicionários no formato do .json (ou de ler_jff, com chave="id").
+    Transições cuja origem ou destino não existe são ignoradas, como no editor.
+    """
+    por_chave = {}
+    for e in dados_estados:
+        por_chave[e[chave]] = EstadoModelo(e["nome"], bool(e.get("inicial")), bool(e.get("aceitacao")), e.get("simbolo_saida", ""))
+    lista_transicoes = []
+    for t in dados_transicoes:
+        origem, destino = por_chave.get(t["origem"]), por_chave.get(t["destino"])
+        if not origem or not destino: continue
+        simbolos = t.get("simbolos_entrada", ["ε"])
+        if isinstance(simbolos, str): simbolos = [s.strip() for s in simbolos.split(',')]
+        lista_transicoes.append(TransicaoModelo(origem, destino, simbolos, t.get("simbolo_saida", ""),
+                                                t.get("para_desempilhar", "ε"), t.get("para_empilhar", "ε")))
+    return novo_modelo(tipo, list(por_chave.values()), lista_transicoes, **opcoes)
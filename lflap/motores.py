@@ -0,0 +1,519 @@
+"""
+Motores de simulação sem interface: tabelas compiladas e execução de AFD, AFN/AFNe, Mealy, Moore e AP.
+Trabalham com qualquer objeto que tenha os atributos lidos aqui (Estado/Transicao do editor ou
+EstadoModelo/TransicaoModelo), então podem ser importados sem tkinter nem PIL.
+"""
+from collections import OrderedDict, deque
+
+MOTORES_AFN = ("conjuntos", "bitset", "preguicoso")
+LIMITE_CACHE_DETERMINIZACAO = 10000 # Máximo de conjuntos guardados pelo motor "preguicoso"
+CONFIG_AP_PADRAO = { # Limites e modo de aceitação do motor do Autômato com Pilha
+    "max_profundidade_pilha": 1000,
+    "max_passos": 200000,
+    "modo_aceitacao": "estado_final", # ou "pilha_vazia"
+    "simbolo_inicial_pilha": "",      # Ex.: "Z"; vazio começa com a pilha vazia
+}
+
+def compilar_fechos_epsilon(lista_estados, lista_transicoes):
+    """
+    Pré-calcula o fecho-ε de cada estado em uma única passada.
+    Usa as componentes fortemente conexas (Tarjan, iterativo) do subgrafo ε:
+    todos os estados de um ciclo ε compartilham o mesmo fecho, e cada componente
+    é fechada depois das que ela alcança, então basta unir fechos já prontos.
+    Retorna {estado: frozenset de estados}.
+    """
+    sucessores = {}
+    for t in lista_transicoes:
+        if "ε" in t.simbolos_entrada:
+            sucessores.setdefault(t.origem, set()).add(t.destino)
+
+    fechos = {}
+    indice, menor = {}, {}
+    pilha, na_pilha = [], set()
+    contador = 0
+    for raiz in lista_estados:
+        if raiz in indice: continue
+        indice[raiz] = menor[raiz] = contador
+        contador += 1
+        pilha.append(raiz)
+        na_pilha.add(raiz)
+        trabalho = [(raiz, iter(sucessores.get(raiz, ())))]
+        while trabalho:
+            v, filhos = trabalho[-1]
+            desceu = False
+            for w in filhos:
+                if w not in indice:
+                    indice[w] = menor[w] = contador
+                    contador += 1
+                    pilha.append(w)
+                    na_pilha.add(w)
+                    trabalho.append((w, iter(sucessores.get(w, ()))))
+                    desceu = True
+                    break
+                elif w in na_pilha:
+                    menor[v] = min(menor[v], indice[w])
+            if desceu: continue
+
+            trabalho.pop()
+            if trabalho:
+                pai = trabalho[-1][0]
+                menor[pai] = min(menor[pai], menor[v])
+            if menor[v] == indice[v]:
+                # v é raiz de uma componente: desempilha e fecha a componente inteira
+                componente = []
+                while True:
+                    w = pilha.pop()
+                    na_pilha.discard(w)
+                    componente.append(w)
+                    if w is v: break
+                fecho = set(componente)
+                for w in componente:
+                    for x in sucessores.get(w, ()):
+                        if x in fechos: fecho |= fechos[x]
+                fecho = frozenset(fecho)
+                for w in componente:
+                    fechos[w] = fecho
+    return fechos
+
+def fecho_de_conjunto(fechos, estados_origem):
+    """O fecho de um conjunto é a união dos fechos (já compilados) de cada estado."""
+    fecho = set()
+    for estado in estados_origem:
+        fecho |= fechos.get(estado) or {estado}
+    return fecho
+
+def compilar_tabela_transicoes(lista_transicoes):
+    """
+    Compila as transições em uma tabela {estado: {símbolo: transição}}.
+    Mantém a semântica da busca linear antiga: vale a primeira transição da lista.
+    """
+    tabela = {}
+    for t in lista_transicoes:
+        linha = tabela.setdefault(t.origem, {})
+        for simbolo in t.simbolos_entrada:
+            linha.setdefault(simbolo, t)
+    return tabela
+
+def executar_AFD(tabela, estado_inicial, palavra):
+    """
+    Simula um AFD sem animação. Cada passo é uma consulta de dicionário.
+    Retorna (aceita, estado_final, simbolo_preso); simbolo_preso é None se a palavra foi lida toda.
+    """
+    estado_atual = estado_inicial
+    linha = tabela.get(estado_atual, {})
+    for simbolo in palavra:
+        transicao = linha.get(simbolo)
+        if transicao is None:
+            return (False, estado_atual, simbolo)
+        estado_atual = transicao.destino
+        linha = tabela.get(estado_atual, {})
+    return (estado_atual.aceitacao, estado_atual, None)
+
+def compilar_indice_AFN(lista_transicoes):
+    """Compila as transições em {estado: {símbolo: [transições]}}, mantendo todas as alternativas."""
+    indice = {}
+    for t in lista_transicoes:
+        linha = indice.setdefault(t.origem, {})
+        for simbolo in t.simbolos_entrada:
+            linha.setdefault(simbolo, []).append(t)
+    return indice
+
+def passo_conjuntos(indice, fechos, estados_atuais, simbolo):
+    """Um passo do método dos conjuntos: destinos lendo 'simbolo', já fechados por ε."""
+    proximos = set()
+    for estado in estados_atuais:
+        for t in indice.get(estado, {}).get(simbolo, ()):
+            proximos.add(t.destino)
+    return fecho_de_conjunto(fechos, proximos) if proximos else proximos
+
+def executar_AFN(indice, fechos, estado_inicial, palavra):
+    """
+    Simula um AFN/AFNe sem animação, pelo método dos conjuntos de estados.
+    Retorna (aceita, estados_finais, simbolo_preso).
+    """
+    estados_atuais = fecho_de_conjunto(fechos, {estado_inicial})
+    for simbolo in palavra:
+        proximos = passo_conjuntos(indice, fechos, estados_atuais, simbolo)
+        if not proximos:
+            return (False, estados_atuais, simbolo)
+        estados_atuais = proximos
+    return (any(e.aceitacao for e in estados_atuais), estados_atuais, None)
+
+class CacheDeterminizacao:
+    """
+    Determinização preguiçosa (sob demanda) de um AFN/AFNe.
+    Memoriza as transições (conjunto, símbolo) -> conjunto descobertas pelo método
+    dos conjuntos, construindo o AFD aos poucos. Guarda no máximo 'limite' conjuntos;
+    ao passar disso, descarta o usado há mais tempo (LRU).
+    """
+    def __init__(self, indice, fechos, limite):
+        self.indice = indice
+        self.fechos = fechos
+        self.limite = limite
+        self.linhas = OrderedDict() # frozenset de estados -> {símbolo: frozenset}
+        self.acertos = 0
+        self.faltas = 0
+        self.descartes = 0
+
+    def transicao(self, conjunto, simbolo):
+        linha = self.linhas.get(conjunto)
+        if linha is None:
+            linha = self.linhas[conjunto] = {}
+            if len(self.linhas) > self.limite:
+                self.linhas.popitem(last=False)
+                self.descartes += 1
+        else:
+            self.linhas.move_to_end(conjunto)
+        destino = linha.get(simbolo)
+        if destino is None:
+            self.faltas += 1
+            destino = linha[simbolo] = frozenset(passo_conjuntos(self.indice, self.fechos, conjunto, simbolo))
+        else:
+            self.acertos += 1
+        return destino
+
+    def executar(self, estado_inicial, palavra):
+        """Retorna (aceita, estados_finais, simbolo_preso), como executar_AFN."""
+        conjunto = frozenset(fecho_de_conjunto(self.fechos, {estado_inicial}))
+        for simbolo in palavra:
+            proximo = self.transicao(conjunto, simbolo)
+            if not proximo:
+                return (False, conjunto, simbolo)
+            conjunto = proximo
+        return (any(e.aceitacao for e in conjunto), conjunto, None)
+
+    def estatisticas(self):
+        total = self.acertos + self.faltas
+        taxa = (100 * self.acertos / total) if total else 0
+        return (f"cache: {len(self.linhas)} conjuntos, {self.acertos} acertos, "
+                f"{self.faltas} faltas ({taxa:.1f}% acertos), {self.descartes} descartes")
+
+class MotorBitsetAFN:
+    """
+    Motor de AFN/AFNe com conjuntos de estados representados como bits de um int.
+    Os estados são numerados 0..n-1 e, para cada símbolo, guarda-se a máscara de
+    sucessores (já fechada por ε) de cada estado; um passo vira alguns OR.
+    """
+    def __init__(self, lista_estados, lista_transicoes, fechos):
+        self.estados = list(lista_estados)
+        self.numero = {estado: i for i, estado in enumerate(self.estados)}
+        self.mascara_fecho = [self.mascara_de(fechos.get(e) or {e}) for e in self.estados]
+        self.mascara_aceitacao = self.mascara_de(e for e in self.estados if e.aceitacao)
+        self.sucessores = {} # símbolo -> [máscara de sucessores de cada estado]
+        vazia = [0] * len(self.estados)
+        for t in lista_transicoes:
+            for simbolo in t.simbolos_entrada:
+                if simbolo == "ε": continue
+                linha = self.sucessores.setdefault(simbolo, list(vazia))
+                linha[self.numero[t.origem]] |= self.mascara_fecho[self.numero[t.destino]]
+
+    def mascara_de(self, conjunto):
+        mascara = 0
+        for estado in conjunto:
+            mascara |= 1 << self.numero[estado]
+        return mascara
+
+    def conjunto_de(self, mascara):
+        conjunto = set()
+        while mascara:
+            bit = mascara & -mascara
+            conjunto.add(self.estados[bit.bit_length() - 1])
+            mascara ^= bit
+        return conjunto
+
+    def passo(self, mascara, simbolo):
+        linha = self.sucessores.get(simbolo)
+        if linha is None: return 0
+        proxima = 0
+        while mascara:
+            bit = mascara & -mascara
+            proxima |= linha[bit.bit_length() - 1]
+            mascara ^= bit
+        return proxima
+
+    def executar(self, estado_inicial, palavra):
+        """Retorna (aceita, mascara_final, simbolo_preso), como executar_AFN."""
+        mascara = self.mascara_fecho[self.numero[estado_inicial]]
+        for simbolo in palavra:
+            proxima = self.passo(mascara, simbolo)
+            if not proxima:
+                return (False, mascara, simbolo)
+            mascara = proxima
+        return (bool(mascara & self.mascara_aceitacao), mascara, None)
+
+def executar_Mealy(tabela, estado_inicial, palavra):
+    """Simula uma Máquina de Mealy sem animação. Retorna (concluida, saida, simbolo_preso)."""
+    estado_atual, saida = estado_inicial, []
+    for simbolo in palavra:
+        transicao = tabela.get(estado_atual, {}).get(simbolo)
+        if transicao is None:
+            return (False, "".join(saida), simbolo)
+        saida.append(transicao.simbolo_saida)
+        estado_atual = transicao.destino
+    return (True, "".join(saida), None)
+
+def executar_Moore(tabela, estado_inicial, palavra):
+    """Simula uma Máquina de Moore sem animação. A saída começa com a do estado inicial."""
+    estado_atual, saida = estado_inicial, [estado_inicial.simbolo_saida]
+    for simbolo in palavra:
+        transicao = tabela.get(estado_atual, {}).get(simbolo)
+        if transicao is None:
+            return (False, "".join(saida), simbolo)
+        estado_atual = transicao.destino
+        saida.append(estado_atual.simbolo_saida)
+    return (True, "".join(saida), None)
+
+TAMANHO_BLOCO_TRANSDUTOR = 1 << 16 # Caracteres lidos (e saída escrita) de cada vez por transduzir_fluxo
+
+def compilar_tabela_transdutor(lista_estados, lista_transicoes, tipo):
+    """
+    Tabela de transições de Mealy/Moore para o modo transdutor: {estado: {símbolo: (linha_destino, saída, destino)}}.
+    'linha_destino' é a própria linha do próximo estado, então cada passo é uma consulta só.
+    A saída é a da transição (Mealy) ou a do estado de destino (Moore). Vale a primeira transição
+    da lista para cada (estado, símbolo), como em compilar_tabela_transicoes.
+    """
+    linhas = {e: {} for e in lista_estados}
+    for t in lista_transicoes:
+        linha = linhas.setdefault(t.origem, {})
+        linha_destino = linhas.setdefault(t.destino, {})
+        saida = t.simbolo_saida if tipo == "Mealy" else t.destino.simbolo_saida
+        for simbolo in t.simbolos_entrada:
+            if simbolo not in linha:
+                linha[simbolo] = (linha_destino, saida, t.destino)
+    return linhas
+
+def transduzir_fluxo(tabela, estado_inicial, entrada, saida, tipo, tamanho_bloco=TAMANHO_BLOCO_TRANSDUTOR,
+                     ignorar="", ao_avancar=None, rastro=None):
+    """
+    Passa o texto de 'entrada' (arquivo aberto) pela Máquina de Mealy/Moore, lendo 'tamanho_bloco'
+    caracteres por vez e escrevendo a saída de cada bloco em 'saida'; a memória usada não depende do
+    tamanho da entrada. Caracteres de 'ignorar' (ex.: "\r\n") são pulados. 'ao_avancar(lidos)' é
+    chamado depois de cada bloco. Com 'rastro' (RastroSimulacao), cada passo também é registrado; na
+    Moore isso inclui o passo 0 (a saída do estado inicial), então crie o rastro com primeiro_passo=0.
+    Retorna (concluida, simbolos_lidos, estado_final, simbolo_preso).
+    """
+    estado, linha, lidos = estado_inicial, tabela.get(estado_inicial, {}), 0
+    if tipo == "Moore":
+        saida.write(estado_inicial.simbolo_saida)
+        if rastro is not None: rastro.registrar(estado_inicial.nome, "", estado_inicial.simbolo_saida, estado_inicial.nome)
+    remover = str.maketrans("", "", ignorar) if ignorar else None
+    while True:
+        bloco = entrada.read(tamanho_bloco)
+        if not bloco: break
+        if remover: bloco = bloco.translate(remover)
+        pedacos = []
+        for simbolo in bloco:
+            passo = linha.get(simbolo)
+            if passo is None:
+                saida.write("".join(pedacos))
+                return (False, lidos + len(pedacos), estado, simbolo)
+            linha, texto_saida, proximo = passo
+            if rastro is not None: rastro.registrar(estado.nome, simbolo, texto_saida, proximo.nome)
+            estado = proximo
+            pedacos.append(texto_saida)
+        saida.write("".join(pedacos))
+        lidos += len(bloco)
+        if ao_avancar: ao_avancar(lidos)
+    return (True, lidos, estado, None)
+
+def _simbolos_pilha(texto):
+    """Converte 'desempilha'/'empilha' em tupla na ordem da pilha (topo no fim). 'AB' significa A no topo."""
+    if texto in ("", "ε", "λ"): return ()
+    return tuple(reversed(texto))
+
+def compilar_tabela_AP(lista_transicoes):
+    """
+    Compila as transições do AP em {estado: {símbolo ou "": [(desempilha, empilha, transição)]}}.
+    A chave "" reúne as transições ε (que não consomem entrada).
+    """
+    tabela = {}
+    for t in lista_transicoes:
+        linha = tabela.setdefault(t.origem, {})
+        regra = (_simbolos_pilha(t.para_desempilhar), _simbolos_pilha(t.para_empilhar), t)
+        for simbolo in t.simbolos_entrada:
+            linha.setdefault("" if simbolo in ("ε", "λ", "") else simbolo, []).append(regra)
+    return tabela
+
+def _eh_ciclo_epsilon_empilhando(nos, indice_pai, estado, posicao, pilha):
+    """
+    Verifica se a configuração (estado, posicao, pilha), gerada por um movimento ε, repete um
+    ancestral na mesma posição com a pilha maior e o fundo intacto: um ciclo ε que só empilha.
+    Serve só para explicar uma poda por profundidade; o ciclo em si pode levar à aceitação
+    (ex.: S → SS | a), então não é motivo para podar o ramo.
+    """
+    altura_minima = len(pilha)
+    i = indice_pai
+    while i is not None:
+        estado_anc, posicao_anc, pilha_anc, pai_anc, _ = nos[i]
+        if posicao_anc != posicao: break # O ciclo precisa ser só de movimentos ε
+        altura = len(pilha_anc)
+        if (estado_anc is estado and altura < len(pilha) and altura <= altura_minima
+                and pilha[:altura] == pilha_anc):
+            return True
+        altura_minima = min(altura_minima, altura)
+        i = pai_anc
+    return False
+
+def simular_AP(tabela, estado_inicial, palavra, config):
+    """
+    Simula um Autômato com Pilha não determinístico por busca em largura sobre as
+    configurações (estado, posição na entrada, pilha). Configurações já vistas são
+    descartadas por um conjunto de hash; ramos que passam de 'max_profundidade_pilha'
+    são podados (o que, com 'vistos', garante o fim da busca); ela também para após 'max_passos'.
+    Aceita por estado final ou por pilha vazia, conforme config["modo_aceitacao"].
+    Retorna (aceita, caminho, info). 'caminho' vai da configuração inicial até a que aceitou
+    (ou até a que leu mais da entrada) como lista de (estado, posicao, pilha, transicao_usada).
+    Se a palavra não foi aceita e houve poda ou limite, info["indeterminada"] é True.
+    """
+    max_profundidade = config["max_profundidade_pilha"]
+    max_passos = config["max_passos"]
+    por_pilha_vazia = config["modo_aceitacao"] == "pilha_vazia"
+    tamanho = len(palavra)
+
+    pilha_inicial = _simbolos_pilha(config["simbolo_inicial_pilha"])
+    nos = [(estado_inicial, 0, pilha_inicial, None, None)] # (estado, posicao, pilha, pai, transicao)
+    vistos = {(estado_inicial, 0, pilha_inicial)}
+    fila = deque([0])
+    info = {"passos": 0, "configuracoes": 1, "ciclo_epsilon": False, "podas_profundidade": 0,
+            "limite_passos": False, "indeterminada": False}
+    melhor = 0
+
+    def caminho_ate(i):
+        caminho = []
+        while i is not None:
+            estado, posicao, pilha, pai, transicao = nos[i]
+            caminho.append((estado, posicao, pilha, transicao))
+            i = pai
+        caminho.reverse()
+        return caminho
+
+    while fila:
+        if info["passos"] >= max_passos:
+            info["limite_passos"] = True
+            break
+        info["passos"] += 1
+        i = fila.popleft()
+        estado, posicao, pilha, _, _ = nos[i]
+        if posicao > nos[melhor][1]: melhor = i
+
+        if posicao == tamanho and ((not pilha) if por_pilha_vazia else estado.aceitacao):
+            return (True, caminho_ate(i), info)
+
+        linha = tabela.get(estado)
+        if not linha: continue
+        movimentos = [(posicao, regra) for regra in linha.get("", ())]
+        if posicao < tamanho:
+            movimentos += [(posicao + 1, regra) for regra in linha.get(palavra[posicao], ())]
+        for nova_posicao, (desempilha, empilha, t) in movimentos:
+            if desempilha:
+                if len(desempilha) > len(pilha) or pilha[-len(desempilha):] != desempilha: continue
+                nova_pilha = pilha[:len(pilha) - len(desempilha)] + empilha
+            else:
+                nova_pilha = pilha + empilha
+            if len(nova_pilha) > max_profundidade:
+                info["podas_profundidade"] += 1
+                # Só para a mensagem: a poda veio de um ciclo ε que empilha sem parar? (verificado uma vez)
+                if not info["ciclo_epsilon"] and nova_posicao == posicao:
+                    info["ciclo_epsilon"] = _eh_ciclo_epsilon_empilhando(nos, i, t.destino, nova_posicao, nova_pilha)
+                continue
+            chave = (t.destino, nova_posicao, nova_pilha)
+            if chave in vistos: continue
+            vistos.add(chave)
+            nos.append((t.destino, nova_posicao, nova_pilha, i, t))
+            fila.append(len(nos) - 1)
+            info["configuracoes"] += 1
+
+    info["indeterminada"] = info["limite_passos"] or info["podas_profundidade"] > 0
+    return (False, caminho_ate(melhor), info)
+
+def descrever_limites_AP(info):
+    """Texto curto explicando por que a busca do AP pode ter sido incompleta."""
+    motivos = []
+    if info["limite_passos"]: motivos.append("limite de passos")
+    if info["podas_profundidade"]:
+        motivos.append("profundidade máxima da pilha" + (" (ciclo ε que só empilha)" if info["ciclo_epsilon"] else ""))
+    return ", ".join(motivos)
+
+class TabelasSimulacao:
+    """
+    Compila sob demanda as tabelas dos motores de um autômato e as guarda em 'cache'.
+    O editor passa o seu cache_simulacao (esvaziado a cada edição); a linha de comando usa um novo.
+    """
+    def __init__(self, lista_estados, lista_transicoes, cache=None, limite_cache_determinizacao=LIMITE_CACHE_DETERMINIZACAO):
+        self.lista_estados = lista_estados
+        self.lista_transicoes = lista_transicoes
+        self.cache = {} if cache is None else cache
+        self.limite_cache_determinizacao = limite_cache_determinizacao
+
+    def _obter(self, chave, compilar):
+        valor = self.cache.get(chave)
+        if valor is None:
+            valor = self.cache[chave] = compilar()
+        return valor
+
+    def fechos_epsilon(self):
+        return self._obter("fechos_epsilon", lambda: compilar_fechos_epsilon(self.lista_estados, self.lista_transicoes))
+
+    def tabela_transicoes(self):
+        return self._obter("tabela_transicoes", lambda: compilar_tabela_transicoes(self.lista_transicoes))
+
+    def indice_AFN(self):
+        return self._obter("indice_afn", lambda: compilar_indice_AFN(self.lista_transicoes))
+
+    def motor_bitset(self):
+        return self._obter("motor_bitset", lambda: MotorBitsetAFN(self.lista_estados, self.lista_transicoes, self.fechos_epsilon()))
+
+    def cache_determinizacao(self):
+        """O cache persiste entre simulações enquanto 'cache' não for esvaziado."""
+        return self._obter("determinizacao", lambda: CacheDeterminizacao(self.indice_AFN(), self.fechos_epsilon(),
+                                                                          self.limite_cache_determinizacao))
+
+    def tabela_AP(self):
+        return self._obter("tabela_ap", lambda: compilar_tabela_AP(self.lista_transicoes))
+
+    def tabela_transdutor(self, tipo):
+        return self._obter(f"transdutor_{tipo}", lambda: compilar_tabela_transdutor(self.lista_estados, self.lista_transicoes, tipo))
+
+def criar_simulador(tipo, estado_inicial, tabelas, motor_AFN="conjuntos", config_AP=None):
+    """
+    Escolhe o motor certo para o tipo de autômato e devolve uma função
+    palavra -> (resultado, saida), sem nenhum acesso ao canvas. As tabelas vêm de 'tabelas' (TabelasSimulacao).
+    Retorna None se o tipo ainda não tiver motor.
+    """
+    if tipo == "AFD":
+        tabela = tabelas.tabela_transicoes()
+        def simular(palavra):
+            aceita, _, _ = executar_AFD(tabela, estado_inicial, palavra)
+            return ("aceita" if aceita else "rejeitada", "")
+    elif tipo in ["AFN", "AFNe"] and motor_AFN == "bitset":
+        motor = tabelas.motor_bitset()
+        def simular(palavra):
+            aceita, _, _ = motor.executar(estado_inicial, palavra)
+            return ("aceita" if aceita else "rejeitada", "")
+    elif tipo in ["AFN", "AFNe"] and motor_AFN == "preguicoso":
+        cache = tabelas.cache_determinizacao()
+        def simular(palavra):
+            aceita, _, _ = cache.executar(estado_inicial, palavra)
+            return ("aceita" if aceita else "rejeitada", "")
+    elif tipo in ["AFN", "AFNe"]:
+        indice, fechos = tabelas.indice_AFN(), tabelas.fechos_epsilon()
+        def simular(palavra):
+            aceita, _, _ = executar_AFN(indice, fechos, estado_inicial, palavra)
+            return ("aceita" if aceita else "rejeitada", "")
+    elif tipo in ["Mealy", "Moore"]:
+        tabela = tabelas.tabela_transicoes()
+        motor = executar_Mealy if tipo == "Mealy" else executar_Moore
+        def simular(palavra):
+            concluida, saida, _ = motor(tabela, estado_inicial, palavra)
+            return ("concluída" if concluida else "rejeitada", saida)
+    elif tipo == "AP":
+        tabela = tabelas.tabela_AP()
+        config = dict(config_AP or CONFIG_AP_PADRAO)
+        def simular(palavra):
+            aceita, _, info = simular_AP(tabela, estado_inicial, palavra, config)
+            if aceita: return ("aceita", "")
+            if info["indeterminada"]: return ("indeterminada", descrever_limites_AP(info))
+            return ("rejeitada", "")
+    else:
+        return None
+    return simular
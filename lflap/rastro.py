@@ -0,0 +1,104 @@
+"""
+Rastro (histórico passo a passo) das simulações de Mealy/Moore, guardado em colunas compactas.
+"""
+from array import array
+
+COLUNAS_RASTRO = ["Passo", "Estado Atual", "Lendo Símbolo", "Saída Gerada", "Próximo Estado"]
+LIMITE_RASTRO_EM_MEMORIA = 8 * 1024 * 1024 # Bytes das colunas em memória antes de passar para o disco
+
+class RastroSimulacao:
+    """
+    Cada passo ocupa 16 bytes: quatro índices (estado atual, símbolo lido, saída gerada, próximo estado)
+    numa tabela de textos internados, cada índice na sua coluna (array "I"). Quando as colunas passam
+    de 'limite_em_memoria' bytes, vão para um arquivo temporário e recomeçam vazias; passos() lê o
+    disco e depois o que ficou em memória, na ordem. Os passos são numerados a partir de 'primeiro_passo'.
+    """
+    def __init__(self, primeiro_passo=1, limite_em_memoria=LIMITE_RASTRO_EM_MEMORIA):
+        self.primeiro_passo = primeiro_passo
+        self.limite_passos = max(1, limite_em_memoria // 16)
+        self.textos = []
+        self._indice_texto = {}
+        self._colunas = [array("I") for _ in range(4)]
+        self._arquivo = None   # Arquivo temporário com os blocos já descarregados
+        self._blocos = []      # Quantidade de passos de cada bloco no arquivo
+        self.total = 0
+
+    def __len__(self):
+        return self.total
+
+    def indice(self, texto):
+        """Índice do texto na tabela de internação (cria se ainda não existir)."""
+        i = self._indice_texto.get(texto)
+        if i is None:
+            i = self._indice_texto[texto] = len(self.textos)
+            self.textos.append(texto)
+        return i
+
+    def registrar(self, estado_atual, simbolo, saida, proximo_estado):
+        """Acrescenta um passo; os quatro argumentos são textos (nomes de estado, símbolo e saída)."""
+        estados_atuais, simbolos, saidas, proximos = self._colunas
+        estados_atuais.append(self.indice(estado_atual))
+        simbolos.append(self.indice(simbolo))
+        saidas.append(self.indice(saida))
+        proximos.append(self.indice(proximo_estado))
+        self.total += 1
+        if len(estados_atuais) >= self.limite_passos:
+            self._descarregar()
+
+    def _descarregar(self):
+        if self._arquivo is None:
+            import tempfile
+            self._arquivo = tempfile.TemporaryFile()
+        for coluna in self._colunas:
+            coluna.tofile(self._arquivo)
+        self._blocos.append(len(self._colunas[0]))
+        self._colunas = [array("I") for _ in range(4)]
+
+    def _colunas_em_ordem(self):
+        """Gera as colunas de cada bloco (primeiro os do disco, depois o da memória)."""
+        if self._arquivo is not None:
+            self._arquivo.seek(0)
+            for quantidade in self._blocos:
+                colunas = [array("I") for _ in range(4)]
+                for coluna in colunas:
+                    coluna.fromfile(self._arquivo, quantidade)
+                yield colunas
+            self._arquivo.seek(0, 2) # Volta ao fim para novos descarregamentos
+        yield self._colunas
+
+    def passos(self):
+        """Gera (passo, estado_atual, simbolo, saida, proximo_estado) de cada passo, em ordem."""
+        textos, numero = self.textos, self.primeiro_passo
+        for estados_atuais, simbolos, saidas, proximos in self._colunas_em_ordem():
+            for i in range(len(estados_atuais)):
+                yield (numero, textos[estados_atuais[i]], textos[simbolos[i]], textos[saidas[i]], textos[proximos[i]])
+                numero += 1
+
+    def saida_completa(self):
+        """A saída da simulação: a concatenação das saídas de todos os passos."""
+        textos = self.textos
+        return "".join(textos[i] for colunas in self._colunas_em_ordem() for i in colunas[2])
+
+    def escrever_csv(self, arquivo, linhas_iniciais=()):
+        """
+        Escreve o relatório no arquivo já aberto (o chamador escolhe 'utf-8-sig' e newline=""):
+        'linhas_iniciais', uma linha em branco, o cabeçalho e um passo por linha, separados por ';'.
+        """
+        import csv
+        writer = csv.writer(arquivo, delimiter=';')
+        writer.writerows(linhas_iniciais)
+        writer.writerow([])
+        writer.writerow(COLUNAS_RASTRO)
+        writer.writerows(self.passos())
+
+    def fechar(self):
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
+        self._blocos = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *erro):
+        self.fechar()
@@ -0,0 +1,34 @@
+"""Regressões do motor do Autômato com Pilha (lflap.motores.simular_AP)."""
+from lflap.modelo import EstadoModelo, TransicaoModelo
+from lflap.motores import CONFIG_AP_PADRAO, compilar_tabela_AP, descrever_limites_AP, simular_AP
+
+def _simular(transicoes, estado_inicial, palavra, **config):
+    config = dict(CONFIG_AP_PADRAO, modo_aceitacao="pilha_vazia", **config)
+    return simular_AP(compilar_tabela_AP(transicoes), estado_inicial, palavra, config)
+
+def test_gramatica_com_ciclo_epsilon_que_empilha():
+    # AP da gramática S → SS | a (um estado, pilha começa com S, aceita por pilha vazia)
+    q = EstadoModelo("q", inicial=True)
+    transicoes = [
+        TransicaoModelo(q, q, ["ε"], para_desempilhar="S", para_empilhar="SS"),
+        TransicaoModelo(q, q, ["ε"], para_desempilhar="S", para_empilhar="a"),
+        TransicaoModelo(q, q, ["a"], para_desempilhar="a", para_empilhar="ε"),
+    ]
+    for palavra in ("a", "aa", "aaa"):
+        aceita, _, info = _simular(transicoes, q, palavra, simbolo_inicial_pilha="S", max_profundidade_pilha=10)
+        assert aceita, (palavra, info)
+    aceita, _, info = _simular(transicoes, q, "", simbolo_inicial_pilha="S", max_profundidade_pilha=10)
+    assert not aceita and info["indeterminada"] and "ciclo ε" in descrever_limites_AP(info)
+
+def test_empilhar_em_ciclo_epsilon_antes_de_ler():
+    # q0 --ε,ε/A--> q0, q0 --ε--> q1, q1 --a,A/ε--> q1: aceita "a" por pilha vazia
+    q0, q1 = EstadoModelo("q0", inicial=True), EstadoModelo("q1")
+    transicoes = [
+        TransicaoModelo(q0, q0, ["ε"], para_empilhar="A"),
+        TransicaoModelo(q0, q1, ["ε"]),
+        TransicaoModelo(q1, q1, ["a"], para_desempilhar="A"),
+    ]
+    aceita, caminho, _ = _simular(transicoes, q0, "a", max_profundidade_pilha=10)
+    assert aceita and caminho[-1][0] is q1
+    assert _simular(transicoes, q0, "aa", max_profundidade_pilha=10)[0]
+    assert not _simular(transicoes, q0, "b", max_profundidade_pilha=10)[0]
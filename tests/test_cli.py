@@ -0,0 +1,114 @@
+"""Linha de comando (python -m lflap): códigos de saída e mensagens de erro."""
+import json
+
+from lflap.__main__ import main
+from lflap.formatos import salvar_binario
+from lflap.modelo import EstadoModelo, TransicaoModelo
+
+class EstadoDesenhado(EstadoModelo):
+    """O .lfab também guarda as coordenadas do estado."""
+    __slots__ = ("x", "y")
+
+class TransicaoDesenhada(TransicaoModelo):
+    """... e os desvios da transição."""
+    __slots__ = ("offset_x", "offset_y")
+
+def _salvar_mealy_lfab(caminho):
+    # Mealy que troca a por b e b por a
+    q0 = EstadoDesenhado("q0", inicial=True)
+    q0.x = q0.y = 10.0
+    transicoes = []
+    for a, b in (("a", "b"), ("b", "a")):
+        t = TransicaoDesenhada(q0, q0, [a], b)
+        t.offset_x = t.offset_y = 0.0
+        transicoes.append(t)
+    salvar_binario(str(caminho), [q0], transicoes, "Mealy")
+
+def test_lfab_truncado_sai_com_erro(tmp_path, capsys):
+    lfab = tmp_path / "maquina.lfab"
+    _salvar_mealy_lfab(lfab)
+    dados = lfab.read_bytes()
+    entrada = tmp_path / "entrada.txt"
+    entrada.write_text("abba", encoding="utf-8")
+    assert main(["transduzir", str(lfab), str(entrada), "-o", str(tmp_path / "saida.txt")]) == 0
+    assert (tmp_path / "saida.txt").read_text(encoding="utf-8") == "baab"
+
+    for tamanho in (len(dados) - 1, len(dados) // 2, 10, 0):
+        lfab.write_bytes(dados[:tamanho])
+        assert main(["transduzir", str(lfab), str(entrada)]) == 1
+        assert "Erro ao carregar" in capsys.readouterr().err
+
+def test_jff_malformado_sai_com_erro(tmp_path, capsys):
+    palavras = tmp_path / "palavras.txt"
+    palavras.write_text("a\n", encoding="utf-8")
+    conteudos = [
+        "<structure><type>fa</type><automaton><state id='0'>",  # XML cortado
+        "<structure><automaton><state id='0' name='q0'><x>esquerda</x></state></automaton></structure>",
+        "não é XML",
+    ]
+    for conteudo in conteudos:
+        jff = tmp_path / "automato.jff"
+        jff.write_text(conteudo, encoding="utf-8")
+        assert main(["simular", str(jff), str(palavras)]) == 1
+        assert "Erro ao carregar" in capsys.readouterr().err
+
+def test_json_fora_do_formato_sai_com_erro(tmp_path, capsys):
+    palavras = tmp_path / "palavras.txt"
+    palavras.write_text("a\n", encoding="utf-8")
+    for conteudo in ('{"estados": [{"nome": "q0"}], "transicoes": []}', "[1, 2]", "{"):
+        automato = tmp_path / "automato.json"
+        automato.write_text(conteudo, encoding="utf-8")
+        assert main(["simular", str(automato), str(palavras)]) == 1
+        assert "Erro ao carregar" in capsys.readouterr().err
+
+def _salvar_json(caminho, estados, transicoes):
+    caminho.write_text(json.dumps({"estados": estados, "transicoes": transicoes}), encoding="utf-8")
+
+def test_simular_codigos_de_saida(tmp_path, capsys):
+    # AFD que aceita as palavras com número par de a
+    automato = tmp_path / "pares.json"
+    _salvar_json(automato, [{"nome": "p", "x": 0, "y": 0, "inicial": True, "aceitacao": True},
+                            {"nome": "i", "x": 50, "y": 0}],
+                 [{"origem": "p", "destino": "i", "simbolos_entrada": ["a"]},
+                  {"origem": "i", "destino": "p", "simbolos_entrada": ["a"]}])
+    palavras = tmp_path / "palavras.txt"
+    palavras.write_text("aa\na\n\nab\n", encoding="utf-8")
+    saida = tmp_path / "resultado.csv"
+    for comando, tipo in (("simular", "--tipo"), ("simulate", "--type")):
+        assert main([comando, str(automato), str(palavras), tipo, "AFD", "-o", str(saida)]) == 0
+        linhas = saida.read_text(encoding="utf-8-sig").splitlines()
+        assert linhas == ["Palavra;Resultado;Saída", "aa;aceita;", "a;rejeitada;", ";aceita;", "ab;rejeitada;"]
+        assert "4 palavras simuladas (2 aceitas/concluídas)" in capsys.readouterr().err
+
+    assert main(["simular", str(automato), str(tmp_path / "nao_existe.txt")]) == 1
+    assert "Erro ao abrir" in capsys.readouterr().err
+    assert main(["simular", str(tmp_path / "nao_existe.json"), str(palavras)]) == 1
+
+    sem_inicial = tmp_path / "sem_inicial.json"
+    _salvar_json(sem_inicial, [{"nome": "p", "x": 0, "y": 0}], [])
+    assert main(["simular", str(sem_inicial), str(palavras)]) == 1
+    assert "não possui estado inicial" in capsys.readouterr().err
+
+def test_transduzir_codigos_de_saida(tmp_path, capsys):
+    lfab = tmp_path / "maquina.lfab"
+    _salvar_mealy_lfab(lfab)
+    entrada = tmp_path / "entrada.txt"
+    entrada.write_text("abab", encoding="utf-8")
+    saida, rastro = tmp_path / "saida.txt", tmp_path / "rastro.csv"
+    assert main(["transduce", str(lfab), str(entrada), "-o", str(saida), "--trace", str(rastro)]) == 0
+    assert saida.read_text(encoding="utf-8") == "baba"
+    linhas = rastro.read_text(encoding="utf-8-sig").splitlines()
+    assert linhas[-4:] == ["1;q0;a;b;q0", "2;q0;b;a;q0", "3;q0;a;b;q0", "4;q0;b;a;q0"]
+    assert "4 símbolos transduzidos" in capsys.readouterr().err
+
+    # Símbolo sem transição: para nele, com o que já foi transduzido na saída
+    entrada.write_text("abca", encoding="utf-8")
+    assert main(["transduzir", str(lfab), str(entrada), "-o", str(saida)]) == 1
+    assert saida.read_text(encoding="utf-8") == "ba"
+    assert "Parou no símbolo 3 ('c')" in capsys.readouterr().err
+
+    # O transdutor é só para Mealy/Moore
+    afd = tmp_path / "afd.json"
+    _salvar_json(afd, [{"nome": "p", "x": 0, "y": 0, "inicial": True}], [])
+    assert main(["transduzir", str(afd), str(entrada)]) == 1
+    assert "Mealy/Moore" in capsys.readouterr().err
@@ -0,0 +1,82 @@
+"""Ida e volta pelos formatos de arquivo (lflap.formatos): .jff do JFLAP e o binário .lfab."""
+import pytest
+
+from lflap.formatos import AutomatoBinario, carregar_modelo, escrever_jff, ler_jff, salvar_binario
+from lflap.modelo import EstadoModelo, TransicaoModelo
+
+class EstadoDesenhado(EstadoModelo):
+    """Os arquivos também guardam as coordenadas do estado."""
+    __slots__ = ("x", "y")
+
+class TransicaoDesenhada(TransicaoModelo):
+    """... e os desvios da transição (só o .lfab)."""
+    __slots__ = ("offset_x", "offset_y")
+
+def _automato(tipo):
+    """Um autômato de cada tipo com os rótulos que o formato precisa preservar."""
+    nomes = ["q0", "q1", "q&<2>"] # O nome com & e <> confere o escape do XML
+    estados = []
+    for i, nome in enumerate(nomes):
+        e = EstadoDesenhado(nome, inicial=i == 0, aceitacao=i == 2, simbolo_saida=["x", "", "yz"][i] if tipo == "Moore" else "")
+        e.x, e.y = 10.0 * i, 20.5 * i
+        estados.append(e)
+    q0, q1, q2 = estados
+    if tipo == "Mealy":
+        rotulos = [(q0, q1, ["a", "b"], "1", "ε", "ε"), (q1, q1, ["a"], "", "ε", "ε"), (q1, q2, ["b"], "<01>", "ε", "ε")]
+    elif tipo == "Moore":
+        rotulos = [(q0, q1, ["a"], "", "ε", "ε"), (q1, q2, ["a", "b"], "", "ε", "ε"), (q2, q0, ["c"], "", "ε", "ε")]
+    else: # AP: pilha com ε, um símbolo e vários símbolos
+        rotulos = [(q0, q0, ["a"], "", "Z", "AZ"), (q0, q1, ["ε"], "", "ε", "ε"), (q1, q1, ["b"], "", "A", "ε"),
+                   (q1, q2, ["ε"], "", "Z", "Z")]
+    transicoes = []
+    for i, (origem, destino, simbolos, saida, desempilha, empilha) in enumerate(rotulos):
+        t = TransicaoDesenhada(origem, destino, simbolos, saida, desempilha, empilha)
+        t.offset_x, t.offset_y = 0.0, 15.0 * i
+        transicoes.append(t)
+    return estados, transicoes
+
+def _assinatura(estados, transicoes):
+    """O que os motores leem, com um símbolo de entrada por item (o .jff separa os símbolos)."""
+    return (
+        sorted((e.nome, e.inicial, e.aceitacao, e.simbolo_saida) for e in estados),
+        sorted((t.origem.nome, t.destino.nome, s, t.simbolo_saida, t.para_desempilhar, t.para_empilhar)
+               for t in transicoes for s in t.simbolos_entrada),
+    )
+
+@pytest.mark.parametrize("tipo", ["Mealy", "Moore", "AP"])
+def test_ida_e_volta_jff(tmp_path, tipo):
+    estados, transicoes = _automato(tipo)
+    caminho = tmp_path / "automato.jff"
+    with open(caminho, "w", encoding="utf-8") as f:
+        escrever_jff(f, estados, transicoes, tipo)
+
+    modelo = carregar_modelo(str(caminho))
+    assert modelo["tipo"] == tipo
+    assert _assinatura(modelo["estados"], modelo["transicoes"]) == _assinatura(estados, transicoes)
+    _, dados_estados, _ = ler_jff(str(caminho))
+    assert [(e["x"], e["y"]) for e in dados_estados] == [(e.x, e.y) for e in estados]
+
+@pytest.mark.parametrize("tipo", ["Mealy", "Moore", "AP"])
+def test_ida_e_volta_lfab(tmp_path, tipo):
+    estados, transicoes = _automato(tipo)
+    caminho = str(tmp_path / "automato.lfab")
+    salvar_binario(caminho, estados, transicoes, tipo)
+
+    modelo = carregar_modelo(caminho)
+    assert modelo["tipo"] == tipo
+    assert _assinatura(modelo["estados"], modelo["transicoes"]) == _assinatura(estados, transicoes)
+    # O .lfab guarda as transições como estão (sem separar símbolos), com as coordenadas e os desvios
+    assert [t.simbolos_entrada for t in modelo["transicoes"]] == [t.simbolos_entrada for t in transicoes]
+    with AutomatoBinario(caminho) as automato:
+        assert list(automato.estado_coords) == [c for e in estados for c in (e.x, e.y)]
+        assert list(automato.trans_desvios) == [d for t in transicoes for d in (t.offset_x, t.offset_y)]
+
+def test_lfab_corrompido_vira_value_error(tmp_path):
+    estados, transicoes = _automato("AP")
+    caminho = tmp_path / "automato.lfab"
+    salvar_binario(str(caminho), estados, transicoes, "AP")
+    dados = caminho.read_bytes()
+    for tamanho in range(0, len(dados), 7):
+        caminho.write_bytes(dados[:tamanho])
+        with pytest.raises(ValueError):
+            carregar_modelo(str(caminho))
@@ -0,0 +1,63 @@
+"""Minimização de AFD (Lflap.minimizar_AFD_hopcroft): mesma linguagem e número mínimo de estados."""
+import itertools
+import random
+
+import pytest
+
+pytest.importorskip("tkinter") # Lflap.py importa o tkinter, mas a interface só é montada quando executado
+from Lflap import minimizar_AFD_hopcroft
+from lflap.modelo import EstadoModelo, TransicaoModelo
+
+def _AFD_aleatorio(semente):
+    """AFD parcial: nem todo símbolo tem transição, e pode haver estados inalcançáveis ou mortos."""
+    aleatorio = random.Random(semente)
+    alfabeto = "abc"[:aleatorio.randint(1, 3)]
+    estados = [EstadoModelo(f"q{i}", inicial=i == 0, aceitacao=aleatorio.random() < 0.4)
+               for i in range(aleatorio.randint(1, 7))]
+    transicoes = [TransicaoModelo(origem, aleatorio.choice(estados), [simbolo])
+                  for origem in estados for simbolo in alfabeto if aleatorio.random() < 0.7]
+    return alfabeto, estados, transicoes
+
+def _funcao_transicao(transicoes):
+    return {(t.origem, s): t.destino for t in transicoes for s in t.simbolos_entrada}
+
+def _aceita(delta, estado, palavra):
+    for simbolo in palavra:
+        estado = delta.get((estado, simbolo))
+        if estado is None: return False
+    return estado.aceitacao
+
+def _classes_de_Myhill_Nerode(delta, estado_inicial, alfabeto, tamanho):
+    """
+    Classes de equivalência dos estados alcançáveis, sem a classe morta (que não aparece no AFD
+    parcial). Com n estados, palavras de até n símbolos bastam para separar dois estados distintos.
+    """
+    alcancaveis, pendentes = {estado_inicial}, [estado_inicial]
+    while pendentes:
+        estado = pendentes.pop()
+        for simbolo in alfabeto:
+            destino = delta.get((estado, simbolo))
+            if destino is not None and destino not in alcancaveis:
+                alcancaveis.add(destino)
+                pendentes.append(destino)
+    palavras = [p for n in range(tamanho + 1) for p in itertools.product(alfabeto, repeat=n)]
+    assinaturas = {tuple(_aceita(delta, e, p) for p in palavras) for e in alcancaveis}
+    assinaturas.discard((False,) * len(palavras))
+    return len(assinaturas)
+
+def test_hopcroft_preserva_a_linguagem_e_e_minimo():
+    for semente in range(150):
+        alfabeto, estados, transicoes = _AFD_aleatorio(semente)
+        blocos, arestas = minimizar_AFD_hopcroft(transicoes, estados[0])
+        assert estados[0] in blocos[0]
+        novos = [EstadoModelo(f"b{i}", aceitacao=bloco[0].aceitacao) for i, bloco in enumerate(blocos)]
+        assert all(e.aceitacao == bloco[0].aceitacao for bloco in blocos for e in bloco)
+        delta, delta_minimo = _funcao_transicao(transicoes), {(novos[o], s): novos[d] for o, s, d in arestas}
+        assert len(delta_minimo) == len(arestas) # Continua determinístico
+
+        for n in range(7):
+            for palavra in itertools.product(alfabeto, repeat=n):
+                assert _aceita(delta, estados[0], palavra) == _aceita(delta_minimo, novos[0], palavra), (semente, palavra)
+        # O bloco inicial existe mesmo quando a linguagem é vazia
+        minimo = _classes_de_Myhill_Nerode(delta, estados[0], alfabeto, len(estados))
+        assert len(blocos) == max(minimo, 1), semente
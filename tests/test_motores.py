@@ -0,0 +1,54 @@
+"""Os três motores de AFN/AFNe (conjuntos, bitset e preguiçoso) contra uma simulação direta."""
+import itertools
+import random
+
+import pytest
+
+from lflap.modelo import EstadoModelo, TransicaoModelo
+from lflap.motores import MOTORES_AFN, TabelasSimulacao, criar_simulador
+
+def _AFNe_aleatorio(semente):
+    """AFNe pequeno com transições ε (inclusive em ciclo) e vários destinos por símbolo."""
+    aleatorio = random.Random(semente)
+    estados = [EstadoModelo(f"q{i}", inicial=i == 0, aceitacao=aleatorio.random() < 0.3)
+               for i in range(aleatorio.randint(1, 6))]
+    transicoes = []
+    for origem in estados:
+        for simbolo in ("a", "b", "ε"):
+            for destino in aleatorio.sample(estados, aleatorio.randint(0, min(2, len(estados)))):
+                transicoes.append(TransicaoModelo(origem, destino, [simbolo]))
+    if len(estados) > 1 and aleatorio.random() < 0.5: # Um ciclo ε explícito
+        transicoes += [TransicaoModelo(estados[0], estados[1], ["ε"]), TransicaoModelo(estados[1], estados[0], ["ε"])]
+    return estados, transicoes
+
+def _aceita(transicoes, estado_inicial, palavra):
+    """Referência: conjuntos de estados com o fecho-ε recalculado a cada passo, sem tabela nenhuma."""
+    def fecho(conjunto):
+        pendentes, vistos = list(conjunto), set(conjunto)
+        while pendentes:
+            estado = pendentes.pop()
+            for t in transicoes:
+                if t.origem is estado and "ε" in t.simbolos_entrada and t.destino not in vistos:
+                    vistos.add(t.destino)
+                    pendentes.append(t.destino)
+        return vistos
+    atuais = fecho({estado_inicial})
+    for simbolo in palavra:
+        atuais = fecho({t.destino for t in transicoes if t.origem in atuais and simbolo in t.simbolos_entrada})
+    return any(e.aceitacao for e in atuais)
+
+@pytest.mark.parametrize("motor", MOTORES_AFN)
+def test_motores_AFNe_concordam_com_a_referencia(motor):
+    palavras = ["".join(p) for n in range(6) for p in itertools.product("ab", repeat=n)]
+    descartes = 0
+    for semente in range(60):
+        estados, transicoes = _AFNe_aleatorio(semente)
+        # Limite pequeno: o motor preguiçoso também passa pelo descarte do cache de determinização
+        tabelas = TabelasSimulacao(estados, transicoes, limite_cache_determinizacao=4)
+        simular = criar_simulador("AFNe", estados[0], tabelas, motor_AFN=motor)
+        for palavra in palavras:
+            esperado = "aceita" if _aceita(transicoes, estados[0], palavra) else "rejeitada"
+            assert simular(palavra) == (esperado, ""), (semente, palavra)
+        if motor == "preguicoso":
+            descartes += tabelas.cache_determinizacao().descartes
+    assert motor != "preguicoso" or descartes > 0
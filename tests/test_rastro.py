@@ -0,0 +1,29 @@
+"""Rastro passo a passo (lflap.rastro.RastroSimulacao) quando parte dele vai para o disco."""
+import io
+
+from lflap.rastro import COLUNAS_RASTRO, RastroSimulacao
+
+def test_passos_em_ordem_depois_de_descarregar():
+    # 16 bytes por passo: com 48 bytes, as colunas vão para o disco a cada 3 passos
+    esperados = [(i, f"q{i % 4}", "ab"[i % 2], str(i), f"q{(i + 1) % 4}") for i in range(10)]
+    with RastroSimulacao(primeiro_passo=0, limite_em_memoria=48) as rastro:
+        for passo in esperados:
+            rastro.registrar(*passo[1:])
+        assert len(rastro) == 10
+        assert rastro._blocos == [3, 3, 3] # Nove passos no disco e um ainda em memória
+        assert list(rastro.passos()) == esperados
+        assert list(rastro.passos()) == esperados # Pode ser lido de novo
+        assert rastro.saida_completa() == "0123456789"
+
+        # Novos passos depois da leitura continuam no fim
+        rastro.registrar("q2", "b", "X", "q3")
+        rastro.registrar("q3", "a", "Y", "q0")
+        assert [p[0] for p in rastro.passos()] == list(range(12))
+        assert rastro.saida_completa() == "0123456789XY"
+
+        arquivo = io.StringIO()
+        rastro.escrever_csv(arquivo, [["Palavra", "abab"]])
+        linhas = arquivo.getvalue().splitlines()
+        assert linhas[:3] == ["Palavra;abab", "", ";".join(COLUNAS_RASTRO)]
+        assert linhas[3] == "0;q0;a;0;q1" and linhas[-1] == "11;q3;a;Y;q0"
+    assert rastro._arquivo is None